@@ -0,0 +1,238 @@
+import os
+import hashlib
+from collections import OrderedDict
+
+from numpy import save, load
+
+class RepresentationCache(object):
+    """
+    Cache of acoustic representations, keyed by the content of the .wav
+    file and the parameters used to compute the representation.
+
+    Representations are kept in memory, and, if a directory is specified,
+    also saved as NumPy arrays on disk so that later analyses of the
+    same recordings can skip computing them.  When the representations
+    in memory or the files on disk exceed the maximum size, the least
+    recently used ones are removed.
+
+    Parameters
+    ----------
+    directory : str, optional
+        Directory to store representations in, if None (default),
+        representations are only cached in memory
+    max_size : int, optional
+        Maximum size in bytes of the representations kept in memory,
+        and separately of those stored on disk, defaults to 500 MB
+
+    Attributes
+    ----------
+    hits : int
+        Number of representations that were found in the cache
+    misses : int
+        Number of representations that had to be computed
+    """
+    def __init__(self, directory = None, max_size = 500 * 1024 * 1024):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._hashes = {}
+        self._sizes = {}
+        if self.directory is not None:
+            if not os.path.exists(self.directory):
+                os.makedirs(self.directory)
+            for f in os.listdir(self.directory):
+                if f.endswith('.npy'):
+                    self._sizes[f] = os.path.getsize(os.path.join(self.directory, f))
+
+    @property
+    def size(self):
+        """Total size in bytes of the representations stored on disk"""
+        return sum(self._sizes.values())
+
+    def file_hash(self, path):
+        """
+        Get a hash of the contents of a file, rehashing it only if the file
+        has been modified
+
+        Parameters
+        ----------
+        path : str
+            Full path to the file
+
+        Returns
+        -------
+        str
+            Hexadecimal digest of the file contents
+        """
+        stat = os.stat(path)
+        try:
+            mtime, size, digest = self._hashes[path]
+            if mtime == stat.st_mtime and size == stat.st_size:
+                return digest
+        except KeyError:
+            pass
+        h = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(65536), b''):
+                h.update(block)
+        digest = h.hexdigest()
+        self._hashes[path] = (stat.st_mtime, stat.st_size, digest)
+        return digest
+
+    def key(self, path, params):
+        """
+        Generate the cache key for a file and set of representation
+        parameters
+
+        Parameters
+        ----------
+        path : str
+            Full path to the .wav file
+        params : dict
+            Parameters used to compute the representation
+
+        Returns
+        -------
+        str
+            Cache key
+        """
+        params = repr(sorted(params.items()))
+        return hashlib.sha1((self.file_hash(path) + params).encode('utf8')).hexdigest()
+
+    def lookup(self, path, params):
+        """
+        Get the cached representation of a .wav file without computing it
+
+        Parameters
+        ----------
+        path : str
+            Full path to the .wav file
+        params : dict
+            Parameters used to compute the representation
+
+        Returns
+        -------
+        2D array or None
+            Representation of the file, or None if it has not been cached
+        """
+        key = self.key(path, params)
+        try:
+            rep = self._memory[key]
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return rep
+        except KeyError:
+            pass
+        filename = key + '.npy'
+        if self.directory is not None and filename in self._sizes:
+            cache_path = os.path.join(self.directory, filename)
+            try:
+                rep = load(cache_path)
+                os.utime(cache_path, None)
+                self._remember(key, rep)
+                self.hits += 1
+                return rep
+            except (OSError, ValueError):
+                del self._sizes[filename]
+        return None
+
+    def get(self, path, to_rep, params):
+        """
+        Get the representation of a .wav file, computing and caching it if
+        it has not been cached
+
+        Parameters
+        ----------
+        path : str
+            Full path to the .wav file
+        to_rep : callable
+            Function that computes the representation from the path
+        params : dict
+            Parameters used by ``to_rep``
+
+        Returns
+        -------
+        2D array
+            Representation of the file
+        """
+        rep = self.lookup(path, params)
+        if rep is not None:
+            return rep
+        self.misses += 1
+        rep = to_rep(path)
+        self.store(self.key(path, params), rep)
+        return rep
+
+    def store(self, key, rep):
+        """
+        Add a representation to the cache
+
+        Parameters
+        ----------
+        key : str
+            Cache key from ``key``
+        rep : 2D array
+            Representation to store
+        """
+        self._remember(key, rep)
+        if self.directory is None:
+            return
+        filename = key + '.npy'
+        cache_path = os.path.join(self.directory, filename)
+        temp_path = cache_path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            save(f, rep)
+        os.replace(temp_path, cache_path)
+        self._sizes[filename] = os.path.getsize(cache_path)
+        self.evict()
+
+    def _remember(self, key, rep):
+        """
+        Keep a representation in memory, dropping the least recently used
+        ones until the representations in memory fit in the maximum size
+        """
+        if key in self._memory:
+            self._memory_size -= self._memory.pop(key).nbytes
+        self._memory[key] = rep
+        self._memory_size += rep.nbytes
+        while self._memory_size > self.max_size and self._memory:
+            self._memory_size -= self._memory.popitem(last = False)[1].nbytes
+
+    def evict(self):
+        """
+        Remove the least recently used representations on disk until they
+        fit in the maximum size
+        """
+        if self.directory is None or self.size <= self.max_size:
+            return
+        def last_used(f):
+            try:
+                return os.path.getmtime(os.path.join(self.directory, f))
+            except OSError:
+                return 0
+        total = self.size
+        for f in sorted(self._sizes, key = last_used):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.directory, f))
+            except OSError:
+                pass
+            total -= self._sizes.pop(f)
+
+    def clear(self):
+        """
+        Remove all cached representations, in memory and on disk
+        """
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        if self.directory is not None:
+            for f in list(self._sizes):
+                try:
+                    os.remove(os.path.join(self.directory, f))
+                except OSError:
+                    pass
+        self._sizes = {}
@@ -1,7 +1,8 @@
-import operator
-from numpy import (zeros, floor, sqrt, sum, correlate, argmax, abs,inf)
+from math import ceil, floor
+from numpy import (zeros, sqrt, sum, correlate, argmax, abs, inf, full,
+                    cumsum, arange, minimum)
 
-from scipy.spatial.distance import euclidean
+from scipy.spatial.distance import cdist
 
 def xcorr_distance(rep_one,rep_two):
     """Computes the cross-correlation distance between two representations
@@ -47,7 +48,7 @@ def xcorr_distance(rep_one,rep_two):
     matchVal = abs(matchSum[maxInd]/num_features)
     return 1/matchVal
 
-def dtw_distance(rep_one, rep_two,norm=True):
+def dtw_distance(rep_one, rep_two,norm=True, band=None):
     """Computes the distance between two representations with the same
     number of filters using Dynamic Time Warping.
 
@@ -59,6 +60,12 @@ def dtw_distance(rep_one, rep_two,norm=True):
     rep_two : 2D array
         Second representation to compare. First dimension is time in frames
         or samples and second dimension is the features.
+    norm : bool, optional
+        If true (default), the distance is normalized by the summed
+        lengths of the representations.
+    band : int, optional
+        Width in frames of a Sakoe-Chiba band around the diagonal to
+        restrict the warping path to, defaults to no restriction.
 
     Returns
     -------
@@ -69,7 +76,7 @@ def dtw_distance(rep_one, rep_two,norm=True):
 
     assert(rep_one.shape[1] == rep_two.shape[1])
     distMat = generate_distance_matrix(rep_one,rep_two)
-    return regularDTW(distMat,norm=norm)
+    return regularDTW(distMat,norm=norm,band=band)
 
 def generate_distance_matrix(source,target):
     """Generates a local distance matrix for use in dynamic time warping.
@@ -87,22 +94,35 @@ def generate_distance_matrix(source,target):
         Local distance matrix.
 
     """
-
-    sLen = source.shape[0]
-    tLen = target.shape[0]
-    distMat = zeros((sLen,tLen))
-    for i in range(sLen):
-        for j in range(tLen):
-            distMat[i,j] = euclidean(source[i,:],target[j,:])
-    return distMat
-
-def regularDTW(distMat,norm=True):
+    return cdist(source, target, 'euclidean')
+
+def _band_limits(k, sLen, tLen, band):
+    """Get the range of rows on the kth anti-diagonal that fall inside a
+    Sakoe-Chiba band."""
+    lo = max(0, k - tLen + 1)
+    hi = min(sLen - 1, k)
+    if band is not None:
+        slope = (tLen - 1) / (sLen - 1)
+        lo = max(lo, int(ceil((k - band) / (1 + slope))))
+        hi = min(hi, int(floor((k + band) / (1 + slope))))
+    return lo, hi
+
+def regularDTW(distMat,norm=True,band=None):
     """Use a local distance matrix to perform dynamic time warping.
 
+    The cumulative distances are computed one anti-diagonal at a time,
+    since every cell on an anti-diagonal only depends on the previous two.
+
     Parameters
     ----------
     distMat : 2D array
         Local distance matrix.
+    norm : bool, optional
+        If true (default), the distance is normalized by the summed
+        dimensions of the local distance matrix.
+    band : int, optional
+        Width in frames of a Sakoe-Chiba band around the diagonal to
+        restrict the warping path to, defaults to no restriction.
 
     Returns
     -------
@@ -112,28 +132,36 @@ def regularDTW(distMat,norm=True):
 
     """
     sLen,tLen = distMat.shape
-    totalDistance = zeros((sLen,tLen))
-    totalDistance[0:sLen,0:tLen] = distMat
-
-    minDirection = zeros((sLen,tLen))
-
-    for i in range(1,sLen):
-        totalDistance[i,0] = totalDistance[i,0] + totalDistance[i-1,0]
-
-    for j in range(1,tLen):
-        totalDistance[0,j] = totalDistance[0,j] + totalDistance[0,j-1]
-
-
-
-    for i in range(1,sLen):
-        for j in range(1,tLen):
-            #direction,minPrevDistance = min(enumerate([totalDistance[i,j],totalDistance[i,j+1],totalDistance[i+1,j]]), key=operator.itemgetter(1))
-            #totalDistance[i+1,j+1] = totalDistance[i+1,j+1] + minPrevDistance
-            #minDirection[i,j] = direction
-            minDirection[i,j],totalDistance[i,j] = min(enumerate([totalDistance[i-1,j-1] + 2*totalDistance[i,j],
-                                                            totalDistance[i-1,j] + totalDistance[i,j],
-                                                            totalDistance[i,j-1] + totalDistance[i,j]]), key=operator.itemgetter(1))
+    if sLen == 1 or tLen == 1:
+        band = None
+    elif band is not None:
+        # The band has to be at least as wide as the slope of the diagonal
+        # for a path to exist
+        band = max(band, 1, int(ceil((tLen - 1) / (sLen - 1))))
+    totalDistance = full((sLen,tLen), inf)
+
+    totalDistance[:,0] = cumsum(distMat[:,0])
+    totalDistance[0,:] = cumsum(distMat[0,:])
+    if band is not None:
+        for k in range(sLen + tLen - 1):
+            lo, hi = _band_limits(k, sLen, tLen, band)
+            if k < sLen and not lo <= k <= hi:
+                totalDistance[k,0] = inf
+            if k < tLen and not lo <= 0 <= hi:
+                totalDistance[0,k] = inf
+
+    for k in range(2, sLen + tLen - 1):
+        lo, hi = _band_limits(k, sLen, tLen, band)
+        lo = max(lo, 1, k - tLen + 1)
+        hi = min(hi, sLen - 1, k - 1)
+        if lo > hi:
+            continue
+        i = arange(lo, hi + 1)
+        j = k - i
+        local = distMat[i,j]
+        totalDistance[i,j] = minimum(minimum(totalDistance[i-1,j-1] + 2*local,
+                                            totalDistance[i-1,j] + local),
+                                    totalDistance[i,j-1] + local)
     if norm:
         return totalDistance[sLen-1,tLen-1] / (sLen+tLen)
     return totalDistance[sLen-1,tLen-1]
-
@@ -1,18 +1,20 @@
 import os
-from numpy import zeros
+from numpy import zeros, eye
+from scipy.spatial.distance import squareform
 
 from functools import partial
+from multiprocessing import Pool
 from corpustools.acousticsim.representations import to_envelopes, to_mfcc
 from corpustools.acousticsim.distance_functions import dtw_distance, xcorr_distance
+from corpustools.acousticsim.cache import RepresentationCache
 
 
 class AcousticSimError(Exception):
     pass
 
-def _build_to_rep(**kwargs):
+def _rep_params(**kwargs):
     rep = kwargs.get('rep', 'mfcc')
 
-
     num_filters = kwargs.get('num_filters',None)
     num_coeffs = kwargs.get('num_coeffs', 20)
 
@@ -28,23 +30,53 @@ def _build_to_rep(**kwargs):
             num_filters = 8
         else:
             num_filters = 26
+    params = {'rep': rep, 'num_filters': num_filters,
+            'freq_lims': tuple(freq_lims)}
+    if rep == 'mfcc':
+        params.update({'num_coeffs': num_coeffs, 'win_len': win_len,
+                    'time_step': time_step, 'use_power': use_power})
+    return params
 
+def _build_to_rep(**kwargs):
+    params = _rep_params(**kwargs)
+    rep = params['rep']
 
     if rep == 'envelopes':
         to_rep = partial(to_envelopes,
-                                num_bands=num_filters,
-                                freq_lims=freq_lims)
+                                num_bands=params['num_filters'],
+                                freq_lims=params['freq_lims'])
     elif rep == 'mfcc':
-        to_rep = partial(to_mfcc,freq_lims=freq_lims,
-                                    num_coeffs=num_coeffs,
-                                    num_filters = num_filters,
-                                    win_len=win_len,
-                                    time_step=time_step,
-                                    use_power = use_power)
+        to_rep = partial(to_mfcc,freq_lims=params['freq_lims'],
+                                    num_coeffs=params['num_coeffs'],
+                                    num_filters = params['num_filters'],
+                                    win_len=params['win_len'],
+                                    time_step=params['time_step'],
+                                    use_power = params['use_power'])
     else:
         return None
     return to_rep
 
+def _build_cache(**kwargs):
+    cache = kwargs.get('cache', None)
+    if isinstance(cache, RepresentationCache):
+        return cache
+    if 'cache_size' in kwargs:
+        return RepresentationCache(cache, kwargs['cache_size'])
+    return RepresentationCache(cache)
+
+def _build_dist_func(**kwargs):
+    """
+    Get the distance function specified by the keyword arguments, and
+    whether it gives the same distance for (x, y) as for (y, x)
+    """
+    match_function = kwargs.get('match_function', 'dtw')
+    if match_function == 'xcorr':
+        return xcorr_distance, True
+    band = kwargs.get('band', None)
+    # Bands are scaled by the ratio of the lengths, so they are only
+    # symmetric when unrestricted
+    return partial(dtw_distance, band = band), band is None
+
 def acoustic_similarity_mapping(path_mapping,**kwargs):
     """Takes in an explicit mapping of full paths to .wav files to have
     acoustic similarity computed.
@@ -65,6 +97,10 @@ def acoustic_similarity_mapping(path_mapping,**kwargs):
         Cross-correlation can be specified with 'xcorr', which computes
         distance as the inverse of a maximum cross-correlation value
         between 0 and 1.
+    band : int, optional
+        Width in frames of a Sakoe-Chiba band to restrict Dynamic Time
+        Warping to, which speeds up long comparisons.  Defaults to no
+        restriction.
     num_filters : int, optional
         The number of frequency filters to use when computing representations.
         Defaults to 8 for amplitude envelopes and 26 for MFCCs.
@@ -82,6 +118,17 @@ def acoustic_similarity_mapping(path_mapping,**kwargs):
     verbose : bool, optional
         If true, command line progress will be displayed after every 50
         mappings have been processed.  Defaults to false.
+    cache : RepresentationCache or str, optional
+        Cache to use for representations, or a directory to store cached
+        representations in.  If not specified, representations are only
+        cached in memory for this call.
+    cache_size : int, optional
+        Maximum size in bytes of representations cached on disk when
+        ``cache`` is a directory.
+    num_cores : int, optional
+        Number of processes to use for computing representations and
+        distances.  Defaults to 1, which computes them in the current
+        process.
 
     Returns
     -------
@@ -95,43 +142,30 @@ def acoustic_similarity_mapping(path_mapping,**kwargs):
     stop_check = kwargs.get('stop_check',None)
     call_back = kwargs.get('call_back',None)
     to_rep = _build_to_rep(**kwargs)
+    params = _rep_params(**kwargs)
 
     num_cores = kwargs.get('num_cores', 1)
     output_sim = kwargs.get('output_sim',False)
 
-    match_function = kwargs.get('match_function', 'dtw')
-    cache = kwargs.get('cache',None)
-    if match_function == 'xcorr':
-        dist_func = xcorr_distance
-    elif match_function == 'dct':
-        dist_func = dct_distance
-    else:
-        dist_func = dtw_distance
-    cache = dict()
+    cache = _build_cache(**kwargs)
+    dist_func, symmetric = _build_dist_func(**kwargs)
+
+    pairs = [pm for pm in path_mapping
+                if all(x.lower().endswith('.wav') for x in pm[:2])]
+    paths = sorted(set(x for pm in pairs for x in pm[:2]))
+
+    reps = _generate_reps(paths, to_rep, cache, params, num_cores,
+                            stop_check, call_back)
+    if reps is None:
+        return
+    distances = _generate_distances(pairs, reps, dist_func, num_cores,
+                            stop_check, call_back)
+    if distances is None:
+        return
+
     asim = dict()
-    if call_back is not None:
-        call_back('Calculating acoustic similarity...')
-        call_back(0,len(path_mapping))
-        cur = 0
-    for i,pm in enumerate(path_mapping):
-        if stop_check is not None and stop_check():
-            return
-        if call_back is not None:
-            cur += 1
-            if cur % 2 == 0:
-                call_back(cur)
+    for pm, dist_val in zip(pairs, distances):
         basetup = tuple(os.path.basename(x) for x in pm)
-        allgood = False
-        for filepath in pm:
-            if not filepath.lower().endswith('.wav'):
-                break
-            if filepath not in cache:
-                cache[os.path.basename(filepath)] = to_rep(filepath)
-        else:
-            allgood = True
-        if not allgood:
-            continue
-        dist_val = dist_func(cache[basetup[0]],cache[basetup[1]])
         if output_sim:
             try:
                 dist_val = 1/dist_val
@@ -142,6 +176,307 @@ def acoustic_similarity_mapping(path_mapping,**kwargs):
         raise(AcousticSimError("The path mapping does not contain any wav files"))
     return asim
 
+_worker_reps = None
+
+def _init_distance_worker(reps):
+    global _worker_reps
+    _worker_reps = reps
+
+def _rep_worker(to_rep, path):
+    return path, to_rep(path)
+
+def _distance_worker(dist_func, block):
+    return block[0], [dist_func(_worker_reps[x], _worker_reps[y])
+                        for x, y in block[1]]
+
+def _blocks(items, num_cores, max_size = 500):
+    size = max(1, min(max_size, len(items) // (num_cores * 8)))
+    for i in range(0, len(items), size):
+        yield i, items[i:i+size]
+
+def _generate_reps(paths, to_rep, cache, params, num_cores,
+                    stop_check = None, call_back = None):
+    """
+    Compute the representations of a set of .wav files, only computing
+    the ones that are not in the cache, across ``num_cores`` processes
+
+    Returns a dictionary of paths to representations, or None if
+    ``stop_check`` ended the computation early.
+    """
+    reps = dict()
+    to_compute = list()
+    for path in paths:
+        rep = cache.lookup(path, params)
+        if rep is None:
+            to_compute.append(path)
+        else:
+            reps[path] = rep
+    cache.misses += len(to_compute)
+    if call_back is not None:
+        call_back('Generating representations...')
+        call_back(0, len(to_compute))
+        cur = 0
+    if num_cores is None or num_cores <= 1 or len(to_compute) <= 1:
+        results = (_rep_worker(to_rep, x) for x in to_compute)
+        pool = None
+    else:
+        pool = Pool(min(num_cores, len(to_compute)))
+        results = pool.imap_unordered(partial(_rep_worker, to_rep), to_compute)
+    try:
+        for path, rep in results:
+            if stop_check is not None and stop_check():
+                return None
+            if call_back is not None:
+                cur += 1
+                call_back(cur)
+            reps[path] = rep
+            cache.store(cache.key(path, params), rep)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    return reps
+
+def _generate_distances(pairs, reps, dist_func, num_cores,
+                        stop_check = None, call_back = None):
+    """
+    Compute the distances between the representations of pairs of
+    files, in blocks across ``num_cores`` processes
+
+    Returns a list of distances in the same order as ``pairs``, or None
+    if ``stop_check`` ended the computation early.
+    """
+    pairs = [tuple(pm[:2]) for pm in pairs]
+    distances = [None] * len(pairs)
+    if call_back is not None:
+        call_back('Calculating acoustic similarity...')
+        call_back(0, len(pairs))
+        cur = 0
+    if num_cores is None or num_cores <= 1 or len(pairs) <= 1:
+        blocks = _blocks(pairs, 1, max_size = 1)
+        results = ((i, [dist_func(reps[x], reps[y]) for x, y in block])
+                        for i, block in blocks)
+        pool = None
+    else:
+        pool = Pool(num_cores, initializer = _init_distance_worker,
+                    initargs = (reps,))
+        results = pool.imap_unordered(partial(_distance_worker, dist_func),
+                                    _blocks(pairs, num_cores))
+    try:
+        for i, block in results:
+            if stop_check is not None and stop_check():
+                return None
+            distances[i:i+len(block)] = block
+            if call_back is not None:
+                cur += len(block)
+                call_back(cur)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    return distances
+
+def _pair_indices(n, symmetric, start, stop):
+    """
+    Generate the indices of the pairs from ``start`` to ``stop`` in the
+    row-major order of the upper triangle of an n by n matrix if
+    ``symmetric``, or of all its off-diagonal cells otherwise
+    """
+    if symmetric:
+        i = 0
+        row_start = 0
+        while row_start + n - 1 - i <= start:
+            row_start += n - 1 - i
+            i += 1
+        j = i + 1 + start - row_start
+    else:
+        i, j = divmod(start, n - 1)
+        if j >= i:
+            j += 1
+    for k in range(start, stop):
+        yield i, j
+        j += 1
+        if j == i and not symmetric:
+            j += 1
+        if j == n:
+            i += 1
+            j = i + 1 if symmetric else 0
+            if j == i:
+                j += 1
+
+def _pairwise_block(dist_func, symmetric, reps, n, block):
+    start, stop = block
+    return start, [dist_func(reps[i], reps[j])
+                    for i, j in _pair_indices(n, symmetric, start, stop)]
+
+def _pairwise_worker(dist_func, symmetric, n, block):
+    return _pairwise_block(dist_func, symmetric, _worker_reps, n, block)
+
+def _index_blocks(total, num_cores, max_size = 500):
+    size = max(1, min(max_size, total // (num_cores * 8)))
+    for i in range(0, total, size):
+        yield i, min(i + size, total)
+
+def pairwise_distances(paths, output = 'matrix', **kwargs):
+    """Computes acoustic distances between every pair of a list of .wav
+    files.
+
+    Pairs are scheduled by their index, so the list of pairs is never
+    stored.  When the distance function is symmetric, only the upper
+    triangle of pairs is computed.
+
+    Parameters
+    ----------
+    paths : list of str
+        Full paths to .wav files.
+    output : {'matrix', 'condensed'}, optional
+        If 'matrix' (default), return a square matrix of distances.  If
+        'condensed', return the upper triangle of the matrix in row-major
+        order, as for ``scipy.spatial.distance.squareform``, which
+        requires a symmetric distance function.
+    **kwargs
+        Any keyword arguments for ``acoustic_similarity_mapping``.
+
+    Returns
+    -------
+    array
+        Distances (or similarities if ``output_sim`` is specified) between
+        the files.  The diagonal of a matrix is zero.
+
+    """
+    stop_check = kwargs.get('stop_check',None)
+    call_back = kwargs.get('call_back',None)
+    num_cores = kwargs.get('num_cores', 1)
+    to_rep = _build_to_rep(**kwargs)
+    params = _rep_params(**kwargs)
+    cache = _build_cache(**kwargs)
+    dist_func, symmetric = _build_dist_func(**kwargs)
+    _check_output(output, symmetric)
+    if len(paths) == 0:
+        raise(AcousticSimError("There are no wav files to compare"))
+
+    reps = _generate_reps(sorted(set(paths)), to_rep, cache, params,
+                            num_cores, stop_check, call_back)
+    if reps is None:
+        return
+    reps = [reps[x] for x in paths]
+    return _pairwise_from_reps(reps, dist_func, symmetric, output, **kwargs)
+
+def _check_output(output, symmetric):
+    if output not in ('matrix', 'condensed'):
+        raise(AcousticSimError("The output must be either 'matrix' or 'condensed'"))
+    if output == 'condensed' and not symmetric:
+        raise(AcousticSimError("A condensed output requires a symmetric distance function"))
+
+def _pairwise_from_reps(reps, dist_func, symmetric, output, **kwargs):
+    """
+    Compute the distances between every pair of a list of representations
+    for ``pairwise_distances``
+    """
+    stop_check = kwargs.get('stop_check',None)
+    call_back = kwargs.get('call_back',None)
+    num_cores = kwargs.get('num_cores', 1)
+    output_sim = kwargs.get('output_sim',False)
+    n = len(reps)
+    if symmetric:
+        total = n * (n - 1) // 2
+    else:
+        total = n * (n - 1)
+    distances = zeros(total)
+
+    if call_back is not None:
+        call_back('Calculating acoustic similarity...')
+        call_back(0, total)
+        cur = 0
+    if num_cores is None or num_cores <= 1 or total <= 1:
+        results = (_pairwise_block(dist_func, symmetric, reps, n, block)
+                        for block in _index_blocks(total, 1, max_size = 20))
+        pool = None
+    else:
+        pool = Pool(num_cores, initializer = _init_distance_worker,
+                    initargs = (reps,))
+        results = pool.imap_unordered(partial(_pairwise_worker, dist_func,
+                                                symmetric, n),
+                                    _index_blocks(total, num_cores))
+    try:
+        for start, block in results:
+            if stop_check is not None and stop_check():
+                return
+            distances[start:start+len(block)] = block
+            if call_back is not None:
+                cur += len(block)
+                call_back(cur)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    if output_sim:
+        nonzero = distances != 0
+        distances[nonzero] = 1 / distances[nonzero]
+        distances[~nonzero] = 1
+    if output == 'condensed':
+        return distances
+    if symmetric:
+        matrix = squareform(distances, checks = False)
+    else:
+        matrix = zeros((n, n))
+        matrix[~eye(n, dtype = bool)] = distances
+    return matrix
+
+def _matrix_to_mapping(paths, matrix):
+    return {(os.path.basename(x), os.path.basename(y)): matrix[i, j]
+                for i, x in enumerate(paths)
+                for j, y in enumerate(paths) if i != j}
+
+def acoustic_similarity_tokens(discourse, tokens, output = 'matrix', **kwargs):
+    """Computes acoustic distances between every pair of a list of word
+    tokens in a discourse.
+
+    The audio of the tokens is read directly from the discourse's .wav
+    file, without writing a file for each token.
+
+    Parameters
+    ----------
+    discourse : Discourse
+        Discourse with an associated .wav file.
+    tokens : list
+        WordTokens, or their begin times, to compare.
+    output : {'matrix', 'condensed'}, optional
+        Format of the distances, see ``pairwise_distances``.
+    **kwargs
+        Any keyword arguments for ``acoustic_similarity_mapping``.
+
+    Returns
+    -------
+    array
+        Distances (or similarities if ``output_sim`` is specified) between
+        the tokens.
+
+    """
+    stop_check = kwargs.get('stop_check',None)
+    call_back = kwargs.get('call_back',None)
+    to_rep = _build_to_rep(**kwargs)
+    dist_func, symmetric = _build_dist_func(**kwargs)
+    _check_output(output, symmetric)
+    if not discourse.has_audio:
+        raise(AcousticSimError("The discourse does not have an associated wav file"))
+    if len(tokens) == 0:
+        raise(AcousticSimError("There are no tokens to compare"))
+
+    sr, signals = discourse.extract_token_audio(tokens)
+    if call_back is not None:
+        call_back('Generating representations...')
+        call_back(0, len(signals))
+    reps = []
+    for i, signal in enumerate(signals):
+        if stop_check is not None and stop_check():
+            return
+        if call_back is not None:
+            call_back(i)
+        reps.append(to_rep((sr, signal)))
+    return _pairwise_from_reps(reps, dist_func, symmetric, output, **kwargs)
+
 def acoustic_similarity_directories(directory_one,directory_two,**kwargs):
     """Computes acoustic similarity across two directories of .wav files.
 
@@ -232,6 +567,26 @@ def acoustic_similarity_directories(directory_one,directory_two,**kwargs):
         return None
 
 def analyze_directories(directories, **kwargs):
+    """Computes acoustic similarity between every pair of .wav files in
+    a list of directories.
+
+    Parameters
+    ----------
+    directories : list of str
+        Full paths of the directories to analyze.
+    output : {'mapping', 'matrix', 'condensed'}, optional
+        If 'mapping' (default), return a dictionary of pairs of file names
+        to distances.  Otherwise, return the list of file paths and the
+        output of ``pairwise_distances``.
+    **kwargs
+        Any keyword arguments for ``acoustic_similarity_mapping``.
+
+    Returns
+    -------
+    dict or tuple
+        Distances (or similarities) between the files.
+
+    """
     stop_check = kwargs.get('stop_check',None)
     call_back = kwargs.get('call_back',None)
 
@@ -254,32 +609,41 @@ def analyze_directories(directories, **kwargs):
         files += [os.path.join(d,x) for x in os.listdir(d) if x.lower().endswith('.wav')]
     if len(files) == 0:
         raise(AcousticSimError("The directory does not contain any wav files"))
+    if len(files) < 2:
+        raise(AcousticSimError("The directory must contain at least two wav files"))
 
-    if call_back is not None:
-        call_back('Mapping directories...')
-        call_back(0,len(files)*len(files))
-        cur = 0
-    path_mapping = list()
-    for x in files:
-        for y in files:
-            if stop_check is not None and stop_check():
-                return
-            if call_back is not None:
-                cur += 1
-                if cur % 20 == 0:
-                    call_back(cur)
-            if not x.lower().endswith('.wav'):
-                continue
-            if not y.lower().endswith('.wav'):
-                continue
-            if x == y:
-                continue
-            path_mapping.append((x,y))
-
-    result = acoustic_similarity_mapping(path_mapping, **kwargs)
-    return result
+    output = kwargs.pop('output', 'mapping')
+    if output == 'mapping':
+        result = pairwise_distances(files, **kwargs)
+    else:
+        result = pairwise_distances(files, output = output, **kwargs)
+    if result is None:
+        return
+    if output == 'mapping':
+        return _matrix_to_mapping(files, result)
+    return files, result
 
 def analyze_directory(directory, **kwargs):
+    """Computes acoustic similarity between every pair of .wav files in
+    a directory, or in its subdirectories if it has no .wav files.
+
+    Parameters
+    ----------
+    directory : str
+        Full path of the directory to analyze.
+    output : {'mapping', 'matrix', 'condensed'}, optional
+        If 'mapping' (default), return a dictionary of pairs of file names
+        to distances.  Otherwise, return the list of file paths and the
+        output of ``pairwise_distances``.
+    **kwargs
+        Any keyword arguments for ``acoustic_similarity_mapping``.
+
+    Returns
+    -------
+    dict or tuple
+        Distances (or similarities) between the files.
+
+    """
     stop_check = kwargs.get('stop_check',None)
     call_back = kwargs.get('call_back',None)
 
@@ -291,30 +655,20 @@ def analyze_directory(directory, **kwargs):
         all_files.append(path)
         if f.lower().endswith('.wav'):
             wavs.append(path)
-        if os.path.isdir(f):
-            directories.append(f)
+        if os.path.isdir(path):
+            directories.append(path)
     if not wavs:
         return analyze_directories(directories, **kwargs)
+    if len(wavs) < 2:
+        raise(AcousticSimError("The directory must contain at least two wav files"))
 
-
-    if call_back is not None:
-        call_back('Mapping files...')
-        call_back(0,len(wavs)*len(wavs))
-        cur = 0
-    path_mapping = list()
-    for x in wavs:
-        for y in wavs:
-            if stop_check is not None and stop_check():
-                return
-            if call_back is not None:
-                cur += 1
-                if cur % 20 == 0:
-                    call_back(cur)
-            if x == y:
-                continue
-            path_mapping.append((x,y))
-    result = acoustic_similarity_mapping(path_mapping, **kwargs)
-    return result
-
-
-
+    output = kwargs.pop('output', 'mapping')
+    if output == 'mapping':
+        result = pairwise_distances(wavs, **kwargs)
+    else:
+        result = pairwise_distances(wavs, output = output, **kwargs)
+    if result is None:
+        return
+    if output == 'mapping':
+        return _matrix_to_mapping(wavs, result)
+    return wavs, result
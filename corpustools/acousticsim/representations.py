@@ -1,8 +1,10 @@
 from numpy import (array, zeros, floor, sqrt, dot, arange, hanning,
                     sin, pi, linspace, log10, round, maximum, minimum,
                     sum, cos, spacing, diag, correlate, argmax, mean, exp,
-                    log, ceil)
-from numpy.fft import fft
+                    log, ceil, ascontiguousarray)
+from numpy.fft import rfft
+from numpy.lib.stride_tricks import as_strided
+from functools import lru_cache
 
 from scipy.signal import filtfilt, butter, hilbert, resample, lfilter
 from scipy.io import wavfile
@@ -13,8 +15,9 @@ def preproc(path,sr=None,alpha=0.97):
 
     Parameters
     ----------
-    path : str
-        Full path to .wav file to load.
+    path : str or tuple
+        Full path to .wav file to load, or a tuple of the sampling rate
+        and samples of audio that has already been loaded.
     sr : int, optional
         Sampling rate to resample at, if specified.
     alpha : float, optional
@@ -28,7 +31,10 @@ def preproc(path,sr=None,alpha=0.97):
         Processed PCM.
 
     """
-    oldsr,sig = wavfile.read(path)
+    if isinstance(path, tuple):
+        oldsr, sig = path
+    else:
+        oldsr,sig = wavfile.read(path)
 
     try:
         sig = sig[:,0]
@@ -46,23 +52,50 @@ def preproc(path,sr=None,alpha=0.97):
         proc = lfilter([1., -alpha],1,proc)
     return sr,proc
 
+def _frames(x, frame_len, step):
+    """Get a strided view of a signal as overlapping frames, centered at
+    every ``step`` samples starting from half the frame length."""
+    num_frames = max(0, (x.shape[0] - frame_len) // step + 1)
+    return as_strided(x, shape = (num_frames, frame_len),
+                        strides = (x.strides[0] * step, x.strides[0]),
+                        writeable = False)
+
 def to_powerspec(x, sr, win_len, time_step):
+    """Generate a power spectrum for each frame of a signal.
+
+    Parameters
+    ----------
+    x : array
+        Signal to process.
+    sr : int
+        Sampling rate of the signal.
+    win_len : float
+        Window length in seconds to use for FFT.
+    time_step : float
+        Time step in seconds for windowing.
+
+    Returns
+    -------
+    2D array
+        Power spectrum for each frame.  The first dimension is the time in
+        frames, the second dimension is the frequency bins.
+
+    """
     nperseg = int(win_len*sr)
     nperstep = int(time_step*sr)
     nfft = int(2**(ceil(log(nperseg)/log(2))))
-    window = hanning(nperseg+2)[1:nperseg+1]
+    frame_len = 2 * int(nperseg/2)
+    window = _hanning(frame_len)
 
-    indices = arange(int(nperseg/2), x.shape[0] - int(nperseg/2) + 1, nperstep)
-    num_frames = len(indices)
+    frames = _frames(ascontiguousarray(x, dtype = float), frame_len, nperstep)
+    return abs(rfft(frames * window, n = nfft, axis = 1))**2
 
-    pspec = zeros((num_frames,int(nfft/2)+1))
-    for i in range(num_frames):
-        X = x[indices[i]-int(nperseg/2):indices[i]+int(nperseg/2)]
-        X = X * window
-        fx = fft(X, n = nfft)
-        power = abs(fx[:int(nfft/2)+1])**2
-        pspec[i,:] = power
-    return pspec
+@lru_cache(maxsize = None)
+def _hanning(frame_len):
+    #Cached arrays are shared between callers, so they are read-only
+    window = hanning(frame_len+2)[1:frame_len+1]
+    window.setflags(write = False)
+    return window
 
 def filter_bank(nfft,nfilt,minFreq,maxFreq,sr):
     """Construct a mel-frequency filter bank.
@@ -140,13 +173,38 @@ def melToFreq(mel):
     return 700*(10**(mel/2595.0)-1)
 
 
+@lru_cache(maxsize = None)
+def dct_matrix(ncep):
+    """Construct the type-III DCT matrix used to convert spectra into
+    cepstra (following HTK).
+
+    Parameters
+    ----------
+    ncep : int
+        Number of points in the spectrum.
+
+    Returns
+    -------
+    2D array
+        DCT matrix to multiply a spectrum by.  The matrix is cached and
+        shared between calls, so it is read-only.
+
+    """
+    dctm = zeros((ncep,ncep))
+    for i in range(ncep):
+        dctm[i,:] = cos(i * arange(1,2*ncep,2)/(2*ncep) * pi) * sqrt(2/ncep)
+    dctm *= 0.230258509299405
+    dctm.setflags(write = False)
+    return dctm
+
 def dct_spectrum(spec):
     """Convert a spectrum into a cepstrum via type-III DCT (following HTK).
 
     Parameters
     ----------
     spec : array
-        Spectrum to perform a DCT on.
+        Spectrum to perform a DCT on, or a 2D array with a spectrum for each
+        frame in the first dimension.
 
     Returns
     -------
@@ -154,21 +212,28 @@ def dct_spectrum(spec):
         Cepstrum of the input spectrum.
 
     """
-    ncep=spec.shape[0]
-    dctm = zeros((ncep,ncep))
-    for i in range(ncep):
-        dctm[i,:] = cos(i * arange(1,2*ncep,2)/(2*ncep) * pi) * sqrt(2/ncep)
-    dctm = dctm * 0.230258509299405
-    cep =  dot(dctm , (10*log10(spec + spacing(1))))
-    return cep
+    dctm = dct_matrix(spec.shape[-1])
+    return dot(10*log10(spec + spacing(1)), dctm.T)
+
+@lru_cache(maxsize = 32)
+def _mfcc_matrices(nfft, num_filters, minHz, maxHz, sr):
+    """Get the filter bank and lifter for a set of MFCC parameters."""
+    L = 22
+    n = arange(num_filters)
+    lift = 1+ (L/2)*sin(pi*n/L)
+    filterbank = filter_bank(nfft,num_filters,minHz,maxHz,sr)
+    lift.setflags(write = False)
+    filterbank.setflags(write = False)
+    return filterbank, lift
 
 def to_mfcc(filename, freq_lims,num_coeffs,win_len,time_step,num_filters = 26, use_power = False,debug=False):
     """Generate MFCCs in the style of HTK from a full path to a .wav file.
 
     Parameters
     ----------
-    filename : str
-        Full path to .wav file to process.
+    filename : str or tuple
+        Full path to .wav file to process, or a tuple of the sampling rate
+        and samples of audio.
     freq_lims : tuple
         Minimum and maximum frequencies in Hertz to use.
     num_coeffs : int
@@ -195,28 +260,16 @@ def to_mfcc(filename, freq_lims,num_coeffs,win_len,time_step,num_filters = 26, u
     minHz = freq_lims[0]
     maxHz = freq_lims[1]
 
-    L = 22
-    n = arange(num_filters)
-    lift = 1+ (L/2)*sin(pi*n/L)
-    lift = diag(lift)
-
     pspec = to_powerspec(proc,sr,win_len,time_step)
 
-    filterbank = filter_bank((pspec.shape[1]-1) * 2,num_filters,minHz,maxHz,sr)
-
-
-    num_frames = pspec.shape[0]
+    filterbank, lift = _mfcc_matrices((pspec.shape[1]-1) * 2, num_filters,
+                                        minHz, maxHz, sr)
 
-    mfccs = zeros((num_frames,num_coeffs))
-    aspec =zeros((num_frames,num_filters))
-    for k in range(num_frames):
-        filteredSpectrum = dot(sqrt(pspec[k,:]), filterbank)**2
-        aspec[k,:] = filteredSpectrum
-        dctSpectrum = dct_spectrum(filteredSpectrum)
-        dctSpectrum = dot(dctSpectrum , lift)
-        if not use_power:
-            dctSpectrum = dctSpectrum[1:]
-        mfccs[k,:] = dctSpectrum[:num_coeffs]
+    aspec = dot(sqrt(pspec), filterbank)**2
+    mfccs = dct_spectrum(aspec) * lift
+    if not use_power:
+        mfccs = mfccs[:,1:]
+    mfccs = mfccs[:,:num_coeffs]
     if debug:
         return mfccs,pspec,aspec
     return mfccs
@@ -228,8 +281,9 @@ def to_envelopes(path,num_bands,freq_lims,downsample=True):
 
     Parameters
     ----------
-    filename : str
-        Full path to .wav file to process.
+    filename : str or tuple
+        Full path to .wav file to process, or a tuple of the sampling rate
+        and samples of audio.
     num_bands : int
         Number of frequency bands to use.
     freq_lims : tuple
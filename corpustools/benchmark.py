@@ -0,0 +1,379 @@
+import os
+import time
+import json
+import shutil
+import platform
+import tempfile
+import warnings
+from collections import OrderedDict
+
+import numpy as np
+from scipy.io import wavfile
+from textgrid import TextGrid, IntervalTier
+
+import corpustools
+from corpustools import lemurian
+from corpustools.utils import generate_keys
+from corpustools.corpus.classes import FeatureMatrix, Attribute, EnvironmentFilter
+from corpustools.corpus.io.binary import save_binary, load_binary
+from corpustools.corpus.io.csv import load_corpus_csv
+from corpustools.corpus.io.textgrid import (inspect_discourse_textgrid,
+                                            load_discourse_textgrid)
+from corpustools.contextmanagers import CanonicalVariantContext
+from corpustools.neighdens.neighborhood_density import neighborhood_density_all_words
+from corpustools.symbolsim.string_similarity import string_similarity
+from corpustools.funcload.functional_load import (minpair_fl, deltah_fl,
+                                                all_pairwise_fls)
+from corpustools.kl.kl import KullbackLeibler
+from corpustools.mutualinfo.mutual_information import all_mis
+from corpustools.prod.pred_of_dist import calc_prod_all_envs
+from corpustools.phonoprob.phonotactic_probability import phonotactic_probability_all_words
+from corpustools.phonosearch.phonosearch import phonological_search
+from corpustools.freqalt.freq_of_alt import calc_freq_of_alt
+from corpustools.acousticsim.main import analyze_directory
+
+#Benchmarks are registered in order as tuples of a setup function and the
+#largest corpus size to run them on by default (None for no limit).  Setup
+#functions take a synthetic Corpus, its size and a scratch directory, and
+#return the callable to time.  Timings depend on the machine, so baselines
+#for comparison should be generated locally with ``pct_benchmark -o``.
+BENCHMARKS = OrderedDict()
+
+DEFAULT_SIZES = [100, 1000, 10000]
+
+def benchmark(name, max_size = None):
+    """
+    Register a benchmark
+
+    Parameters
+    ----------
+    name : str
+        Name of the benchmark
+    max_size : int, optional
+        Largest corpus size to run the benchmark on by default, for
+        benchmarks that scale quadratically with the size of the corpus
+    """
+    def register(function):
+        BENCHMARKS[name] = (function, max_size)
+        return function
+    return register
+
+def _no_progress(*args):
+    pass
+
+_feature_classes = {'consonantal': 'ptkbdgmnrlsfxz',
+                    'sonorant': 'mnrljwieoua',
+                    'continuant': 'rlsfxzjwieoua',
+                    'voice': 'bdgmnrlzjwieoua',
+                    'nasal': 'mn',
+                    'labial': 'pbmfwou',
+                    'coronal': 'tdnrlsz',
+                    'dorsal': 'kgxjwieoua',
+                    'lateral': 'l',
+                    'high': 'iujw',
+                    'low': 'a',
+                    'back': 'kgxwoua',
+                    'syllabic': 'ieoua'}
+
+def lemurian_feature_matrix():
+    """
+    Build a FeatureMatrix for the segments of Lemurian
+
+    Returns
+    -------
+    FeatureMatrix
+        Binary feature specifications for every Lemurian segment
+    """
+    segments = sorted(set(''.join(_feature_classes.values())))
+    entries = []
+    for s in segments:
+        entry = {'symbol': s}
+        for f, members in _feature_classes.items():
+            entry[f] = '+' if s in members else '-'
+        entries.append(entry)
+    return FeatureMatrix('lemurian', entries)
+
+def make_corpus(size, seed = 0):
+    """
+    Generate a synthetic Lemurian corpus with a feature system
+
+    Parameters
+    ----------
+    size : int
+        Number of word types
+    seed : int, optional
+        Seed for the generator
+
+    Returns
+    -------
+    Corpus
+        Synthetic corpus
+    """
+    corpus = lemurian.generate_corpus(size, name = 'lemurian_{}'.format(size),
+                                    seed = seed)
+    corpus.set_feature_matrix(lemurian_feature_matrix())
+    return corpus
+
+def _context(corpus, **kwargs):
+    return CanonicalVariantContext(corpus, 'transcription', 'type', **kwargs)
+
+@benchmark('neighborhood_density', max_size = 1000)
+def _neighborhood_density(corpus, size, directory):
+    attribute = Attribute('neighborhood_density', 'numeric')
+    corpus.add_attribute(attribute, initialize_defaults = True)
+    def run():
+        with _context(corpus, attribute = attribute) as c:
+            neighborhood_density_all_words(c, call_back = _no_progress)
+    return run
+
+def _string_similarity(algorithm):
+    def setup(corpus, size, directory):
+        query = corpus[next(iter(corpus.keys()))]
+        def run():
+            with _context(corpus) as c:
+                string_similarity(c, query, algorithm)
+        return run
+    return setup
+
+for _algorithm in ['khorsi', 'edit_distance', 'phono_edit_distance']:
+    benchmark('string_similarity_{}'.format(_algorithm))(_string_similarity(_algorithm))
+
+@benchmark('minpair_fl', max_size = 1000)
+def _minpair_fl(corpus, size, directory):
+    def run():
+        with _context(corpus) as c:
+            minpair_fl(c, [('t', 'd')])
+    return run
+
+@benchmark('deltah_fl')
+def _deltah_fl(corpus, size, directory):
+    def run():
+        with _context(corpus) as c:
+            deltah_fl(c, [('t', 'd')])
+    return run
+
+@benchmark('all_pairwise_fls', max_size = 100)
+def _all_pairwise_fls(corpus, size, directory):
+    def run():
+        with _context(corpus) as c:
+            all_pairwise_fls(c)
+    return run
+
+@benchmark('kl')
+def _kl(corpus, size, directory):
+    def run():
+        with _context(corpus) as c:
+            KullbackLeibler(c, 't', 'd', 'b')
+    return run
+
+@benchmark('mutual_information')
+def _mutual_information(corpus, size, directory):
+    def run():
+        with _context(corpus) as c:
+            all_mis(c)
+    return run
+
+@benchmark('predictability_of_distribution')
+def _predictability_of_distribution(corpus, size, directory):
+    def run():
+        with _context(corpus) as c:
+            calc_prod_all_envs(c, 't', 'd')
+    return run
+
+@benchmark('phonotactic_probability')
+def _phonotactic_probability(corpus, size, directory):
+    attribute = Attribute('phonotactic_probability', 'numeric')
+    corpus.add_attribute(attribute, initialize_defaults = True)
+    def run():
+        with _context(corpus, attribute = attribute) as c:
+            phonotactic_probability_all_words(c, 'vitevitch')
+    return run
+
+@benchmark('phonological_search')
+def _phonological_search(corpus, size, directory):
+    envs = [EnvironmentFilter(['t', 'd'], None, [['a', 'e', 'i']]),
+            EnvironmentFilter(['n'], [['#']])]
+    def run():
+        phonological_search(corpus, envs)
+    return run
+
+@benchmark('frequency_of_alternation', max_size = 1000)
+def _frequency_of_alternation(corpus, size, directory):
+    def run():
+        with _context(corpus) as c:
+            calc_freq_of_alt(c, 't', 'd', 'edit_distance', max_rel = 2)
+    return run
+
+@benchmark('acoustic_similarity', max_size = 1000)
+def _acoustic_similarity(corpus, size, directory):
+    #Acoustic similarity is pairwise over sound files, so the number of
+    #files grows with the square root of the corpus size
+    wav_directory = os.path.join(directory, 'wavs')
+    os.makedirs(wav_directory)
+    rng = np.random.RandomState(size)
+    sr = 16000
+    for i in range(max(2, int(round(size ** 0.5)))):
+        t = np.arange(int(sr * (0.2 + 0.01 * (i % 10)))) / sr
+        sig = np.sin(2 * np.pi * (200 + 20 * i) * t) + 0.1 * rng.randn(len(t))
+        wavfile.write(os.path.join(wav_directory, '{}.wav'.format(i)), sr,
+                    (sig * 10000).astype(np.int16))
+    def run():
+        analyze_directory(wav_directory)
+    return run
+
+@benchmark('load_csv')
+def _load_csv(corpus, size, directory):
+    path = os.path.join(directory, 'corpus.txt')
+    lemurian.write_csv(path, size, seed = 0)
+    def run():
+        load_corpus_csv('benchmark', path, ',', '.')
+    return run
+
+@benchmark('load_binary')
+def _load_binary(corpus, size, directory):
+    path = os.path.join(directory, 'corpus.corpus')
+    save_binary(corpus, path)
+    def run():
+        load_binary(path)
+    return run
+
+@benchmark('load_textgrid')
+def _load_textgrid(corpus, size, directory):
+    path = os.path.join(directory, 'discourse.TextGrid')
+    tg = TextGrid(maxTime = size)
+    words = IntervalTier('word', 0, size)
+    phones = IntervalTier('phone', 0, size)
+    for i, k in enumerate(generate_keys(corpus, length = size, seed = 0)):
+        word = corpus[k]
+        words.add(i, i + 1, word.spelling)
+        segments = list(word.transcription)
+        step = 1 / len(segments)
+        for j, s in enumerate(segments):
+            phones.add(round(i + j * step, 5), round(i + (j + 1) * step, 5), s)
+    tg.append(words)
+    tg.append(phones)
+    tg.write(path)
+    def run():
+        annotation_types = inspect_discourse_textgrid(path)
+        load_discourse_textgrid('benchmark', path, annotation_types)
+    return run
+
+def run_benchmarks(names = None, sizes = None, repeat = 3, seed = 0,
+                    limit = True, call_back = None):
+    """
+    Time benchmarks over synthetic corpora of increasing size
+
+    Parameters
+    ----------
+    names : list of str, optional
+        Benchmarks to run, defaults to all registered benchmarks
+    sizes : list of int, optional
+        Corpus sizes (number of word types), defaults to ``DEFAULT_SIZES``
+    repeat : int, optional
+        Number of times to time each benchmark, the fastest time is kept
+    seed : int, optional
+        Seed for generating the synthetic corpora
+    limit : bool, optional
+        If True (default), skip sizes above each benchmark's maximum size
+    call_back : callable, optional
+        Function called with the name and size of each benchmark before
+        it is run
+
+    Returns
+    -------
+    dict
+        Description of the environment and a mapping of benchmark names
+        to mappings of sizes to times in seconds
+    """
+    if names is None:
+        names = list(BENCHMARKS.keys())
+    if sizes is None:
+        sizes = DEFAULT_SIZES
+    for name in names:
+        if name not in BENCHMARKS:
+            raise(KeyError('{} is not a benchmark.'.format(name)))
+    results = OrderedDict()
+    for name in names:
+        setup, max_size = BENCHMARKS[name]
+        results[name] = OrderedDict()
+        for size in sizes:
+            if limit and max_size is not None and size > max_size:
+                continue
+            if call_back is not None:
+                call_back(name, size)
+            directory = tempfile.mkdtemp()
+            try:
+                times = []
+                for i in range(repeat):
+                    run = setup(make_corpus(size, seed), size, directory)
+                    begin = time.perf_counter()
+                    run()
+                    times.append(time.perf_counter() - begin)
+                    shutil.rmtree(directory)
+                    os.makedirs(directory)
+            finally:
+                shutil.rmtree(directory, ignore_errors = True)
+            results[name][str(size)] = min(times)
+    return {'version': corpustools.__version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'repeat': repeat,
+            'results': results}
+
+def compare_to_baseline(results, baseline, tolerance = 0.25):
+    """
+    Find benchmarks that are slower than a baseline
+
+    A warning is issued if the baseline was run with a different version
+    of Python or on a different platform, as the timings are unlikely to
+    be comparable.
+
+    Parameters
+    ----------
+    results : dict
+        Output of ``run_benchmarks``
+    baseline : dict
+        Output of ``run_benchmarks`` for the version to compare against
+    tolerance : float, optional
+        Proportion by which a benchmark can be slower than the baseline
+        before it counts as a regression, defaults to 0.25
+
+    Returns
+    -------
+    list of tuples
+        Name, size, baseline time, new time and ratio of the new time
+        to the baseline time for every regression
+    """
+    differences = ['{} {} (baseline {})'.format(key, results.get(key), baseline.get(key))
+                    for key in ['python', 'platform']
+                    if results.get(key) != baseline.get(key)]
+    if differences:
+        warnings.warn('The baseline was run in a different environment: {}'.format(
+                        ', '.join(differences)))
+    regressions = []
+    for name, times in results['results'].items():
+        base_times = baseline['results'].get(name, {})
+        for size, t in times.items():
+            try:
+                base = base_times[size]
+            except KeyError:
+                continue
+            ratio = t / base if base > 0 else float('inf')
+            if ratio > 1 + tolerance:
+                regressions.append((name, int(size), base, t, ratio))
+    return regressions
+
+def save_results(results, path):
+    """
+    Save benchmark results as JSON
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent = 2)
+
+def load_results(path):
+    """
+    Load benchmark results from JSON
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f, object_pairs_hook = OrderedDict)
@@ -0,0 +1,70 @@
+import argparse
+import sys
+import json
+from contextlib import redirect_stdout
+
+from corpustools.benchmark import (BENCHMARKS, DEFAULT_SIZES, run_benchmarks,
+                                compare_to_baseline, save_results, load_results)
+
+
+def main():
+
+    #### Parse command-line arguments
+    parser = argparse.ArgumentParser(description = \
+             'Phonological CorpusTools: benchmark CL interface')
+    parser.add_argument('-b', '--benchmarks', default=None, type=str, help='Comma-separated names of benchmarks to run, defaults to all of them')
+    parser.add_argument('-s', '--sizes', default=None, type=str, help='Comma-separated corpus sizes (number of word types), defaults to {}'.format(','.join(str(x) for x in DEFAULT_SIZES)))
+    parser.add_argument('-r', '--repeat', default=3, type=int, help='Number of times to time each benchmark, the fastest time is reported')
+    parser.add_argument('-e', '--seed', default=0, type=int, help='Seed for generating the synthetic corpora')
+    parser.add_argument('-a', '--all_sizes', action='store_true', help='Run every benchmark on every size, including quadratic benchmarks on large corpora')
+    parser.add_argument('-o', '--outfile', default=None, help='Name of JSON file to write results to, defaults to standard output')
+    parser.add_argument('-c', '--compare', default=None, help='Name of JSON file with baseline results to check for regressions against, generated on the same machine with -o')
+    parser.add_argument('-t', '--tolerance', default=0.25, type=float, help='Proportion by which a benchmark can be slower than the baseline before it is reported as a regression')
+    parser.add_argument('-l', '--list', action='store_true', help='List the available benchmarks and exit')
+
+    args = parser.parse_args()
+
+    ####
+
+    if args.list:
+        for name, (function, max_size) in BENCHMARKS.items():
+            if max_size is None:
+                print(name)
+            else:
+                print('{} (up to {} types by default)'.format(name, max_size))
+        return
+
+    if args.benchmarks is not None:
+        names = [x.strip() for x in args.benchmarks.split(',')]
+    else:
+        names = None
+    if args.sizes is not None:
+        sizes = [int(x) for x in args.sizes.split(',')]
+    else:
+        sizes = None
+
+    def call_back(name, size):
+        print('Running {} on {} types...'.format(name, size), file=sys.stderr)
+
+    #Some analyses print progress, keep it out of the JSON output
+    with redirect_stdout(sys.stderr):
+        results = run_benchmarks(names, sizes, repeat = args.repeat, seed = args.seed,
+                                limit = not args.all_sizes, call_back = call_back)
+
+    if args.outfile is not None:
+        save_results(results, args.outfile)
+    else:
+        print(json.dumps(results, indent = 2))
+
+    if args.compare is not None:
+        regressions = compare_to_baseline(results, load_results(args.compare),
+                                        args.tolerance)
+        for name, size, base, new, ratio in regressions:
+            print('Regression: {} on {} types took {:.4f}s, baseline {:.4f}s ({:.2f}x)'.format(
+                    name, size, new, base, ratio), file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
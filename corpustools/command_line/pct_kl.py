@@ -6,7 +6,7 @@ from codecs import open
 
 from corpustools.corpus.classes import Corpus
 from corpustools.corpus.io import load_binary
-from corpustools.kl.kl import KullbackLeibler
+from corpustools.kl.kl import KullbackLeibler, KullbackLeiblerAllPairs
 from corpustools.contextmanagers import *
 
 def main():
@@ -14,15 +14,18 @@ def main():
     #### Parse command-line arguments
     parser = argparse.ArgumentParser(description = 'Phonological CorpusTools: Kullback-Leibler CL interface')
     parser.add_argument('corpus_file_name', help='Path to corpus file. This can just be the file name if it\'s in the same directory as CorpusTools')
-    parser.add_argument('seg1', help='First segment')
-    parser.add_argument('seg2', help='Second segment')
+    parser.add_argument('seg1', nargs='?', help='First segment (omit when using --all_pairs)')
+    parser.add_argument('seg2', nargs='?', help='Second segment (omit when using --all_pairs)')
     parser.add_argument('side', help='Context to check. Options are \'right\', \'left\' and \'both\'. You can enter just the first letter.')
     parser.add_argument('-s', '--sequence_type', default='transcription', help="The attribute of Words to calculate KL over. Normally this will be the transcription, but it can also be the spelling or a user-specified tier.")
     parser.add_argument('-t', '--type_or_token', default='token', help='Specifies whether entropy is based on type or token frequency.')
     parser.add_argument('-c', '--context_type', type=str, default='Canonical', help="How to deal with variable pronunciations. Options are 'Canonical', 'MostFrequent', 'SeparatedTokens', or 'Weighted'. See documentation for details.")
+    parser.add_argument('-a', '--all_pairs', action='store_true', help='Calculate KL for every pair of segments in the corpus instead of a single pair.')
     parser.add_argument('-o', '--outfile', help='Name of output file (optional)')
     
     args = parser.parse_args()
+    if not args.all_pairs and (args.seg1 is None or args.seg2 is None):
+        parser.error('Two segments are required unless --all_pairs is specified.')
 
     ####
 
@@ -40,6 +43,24 @@ def main():
     elif args.context_type == 'Weighted':
         corpus = WeightedVariantContext(corpus, args.sequence_type, args.type_or_token)
 
+    if args.all_pairs:
+        results = KullbackLeiblerAllPairs(corpus, args.side)
+        outfile = args.outfile
+        if outfile is not None:
+            if not os.path.isfile(outfile):
+                outfile = os.path.join(os.getcwd(), outfile)
+            if not outfile.endswith('.txt'):
+                outfile += '.txt'
+            with open(outfile, mode='w', encoding='utf-8') as f:
+                print('Seg1,Seg2,Seg1 entropy,Seg2 entropy,KL,Possible UR,Spurious UR', file=f)
+                for r in results:
+                    print(','.join([str(x) for x in r]), file=f)
+            print('Done!')
+        else:
+            for r in results:
+                print(r)
+        return
+
     results = KullbackLeibler(corpus, args.seg1, args.seg2, args.side, outfile=None)
 
     outfile = args.outfile
@@ -4,6 +4,9 @@ import collections
 import copy
 import operator
 
+import numpy as np
+from scipy.sparse import csr_matrix
+
 from corpustools.corpus.classes.lexicon import Word
 
 from corpustools.exceptions import PCTContextError
@@ -111,6 +114,48 @@ class BaseCorpusContext(object):
             return_dict = { k:v/freq_base['total'] for k,v in return_dict.items()}
         return return_dict
 
+    def get_in_word_cooccurrence(self):
+        """
+        Generate (and cache) the frequency with which segments occur
+        within words, and co-occur with each other within words.
+
+        A sparse matrix of which segments are present in each word is
+        built once, and the co-occurrence frequencies are calculated
+        from it with a single matrix product.
+
+        Returns
+        -------
+        list
+            Segments, in the order of the rows and columns of the arrays
+        array
+            Summed frequency of words containing each segment
+        array
+            Summed frequency of words containing each pair of segments
+        """
+        if 'in_word' not in self._freq_base:
+            index = {}
+            rows = []
+            cols = []
+            freqs = []
+            for i, word in enumerate(self):
+                freqs.append(word.frequency)
+                for s in set(getattr(word, self.sequence_type)):
+                    try:
+                        col = index[s]
+                    except KeyError:
+                        col = index[s] = len(index)
+                    rows.append(i)
+                    cols.append(col)
+            incidence = csr_matrix((np.ones(len(rows)), (rows, cols)),
+                                    shape = (len(freqs), len(index)))
+            weighted = incidence.multiply(np.array(freqs)[:, np.newaxis]).tocsr()
+            cooccurrence = np.asarray((incidence.T.dot(weighted)).todense())
+            segments = sorted(index, key = lambda x: index[x])
+            self._freq_base['in_word'] = (segments,
+                                        np.diag(cooccurrence).copy(),
+                                        cooccurrence)
+        return self._freq_base['in_word']
+
     def get_phone_probs(self, gramsize = 1, probability = True, preserve_position = True, log_count = True):
         """
         Generate (and cache) phonotactic probabilities for segments in
@@ -5,11 +5,16 @@ import collections
 import operator
 import math
 import locale
+import bisect
 
 from corpustools.exceptions import CorpusIntegrityError
 
 import pdb
 
+#Number of assignments to each attribute name on any Word, so that Corpus
+#attribute indexes can tell when Words have changed since they were built
+_attribute_versions = collections.defaultdict(int)
+
 class Segment(object):
     """
     Class for segment symbols
@@ -918,11 +923,15 @@ class Word(object):
 
         _corpus = None
 
-        self.transcription = None
-        self.spelling = None
-        self.frequency = 0
-        self.wordtokens = []
-        self.descriptors = ['spelling','transcription', 'frequency']
+        #A new Word is not in any Corpus yet, so its attributes are set
+        #without counting them as changes (see __setattr__)
+        attributes = self.__dict__
+        attributes['transcription'] = None
+        attributes['spelling'] = None
+        attributes['frequency'] = 0
+        attributes['wordtokens'] = []
+        attributes['_variants'] = {}
+        attributes['descriptors'] = ['spelling','transcription', 'frequency']
         for key, value in kwargs.items():
             if isinstance(value, tuple):
                 att, value = value
@@ -949,11 +958,16 @@ class Word(object):
                         pass
                 if key not in self.descriptors:
                     self.descriptors.append(key)
-            setattr(self, key, value)
+            attributes[key] = value
         if self.spelling is None and self.transcription is None:
             raise(ValueError('Words must be specified with at least a spelling or a transcription.'))
         if self.spelling is None:
-            self.spelling = ''.join(map(str,self.transcription))
+            attributes['spelling'] = ''.join(map(str,self.transcription))
+
+    def __setattr__(self, name, value):
+        #Keep track of changes for the attribute indexes of Corpus.subset
+        _attribute_versions[name] += 1
+        object.__setattr__(self, name, value)
 
     def __hash__(self):
         return hash((self.spelling,str(self.transcription)))
@@ -962,17 +976,17 @@ class Word(object):
         state = self.__dict__.copy()
         state['wordtokens'] = []
         state['_corpus'] = None
+        state['_variants'] = {}
         #for k,v in state.items():
         #    if (k == 'transcription' or k in self.tiers) and v is not None:
         #        state[k] = [x.symbol for x in v] #Only store string symbols
         return state
 
     def __setstate__(self, state):
-        self.transcription = []
-        self.spelling = ''
-        self.frequency = 0
+        self.__dict__.update(transcription = [], spelling = '', frequency = 0)
         if 'wordtokens' not in state:
             state['wordtokens'] = []
+        state['_variants'] = {}
         if 'descriptors' not in state:
             state['descriptors'] = ['spelling','transcription', 'frequency']
         if 'frequency' not in state['descriptors']:
@@ -1036,6 +1050,7 @@ class Word(object):
             matching_segs = wt.transcription.match_segments(tier_segments)
             new_tier = Transcription(matching_segs)
             setattr(wt,tier_name,new_tier)
+        self.clear_variants(tier_name)
 
 
     def remove_attribute(self, attribute_name):
@@ -1054,6 +1069,7 @@ class Word(object):
         """
         if attribute_name.startswith('_'):
             return
+        self.clear_variants(attribute_name)
         try:
             delattr(self, attribute_name)
         except ValueError:
@@ -1072,8 +1088,38 @@ class Word(object):
         -------
         dict
             Dictionary with keys of Transcriptions and values of their frequencies
+
+        Notes
+        -----
+        Variants are counted once per tier and cached.  The cache is
+        refreshed when the number of WordTokens changes, and should be
+        cleared with ``clear_variants`` if the tier of existing WordTokens
+        is changed.
+        """
+        try:
+            count, variants = self._variants[sequence_type]
+            if count == len(self.wordtokens):
+                return collections.Counter(variants)
+        except KeyError:
+            pass
+        variants = collections.Counter(getattr(x,sequence_type) for x in self.wordtokens)
+        self._variants[sequence_type] = (len(self.wordtokens), dict(variants))
+        return variants
+
+    def clear_variants(self, sequence_type = None):
         """
-        return collections.Counter(getattr(x,sequence_type) for x in self.wordtokens)
+        Clear cached variants of the Word
+
+        Parameters
+        ----------
+        sequence_type : str, optional
+            Tier name to clear variants for, defaults to clearing the
+            variants of all tiers
+        """
+        if sequence_type is None:
+            self._variants = {}
+        else:
+            self._variants.pop(sequence_type, None)
 
     def __repr__(self):
         return '<Word: \'%s\'>' % self.spelling
@@ -1583,6 +1629,41 @@ class Attribute(object):
                 self._range = set(self._range)
             self._range.update([x for x in value])
 
+    def update_ranges(self, values):
+        """
+        Update the range of the Attribute with many values at once,
+        equivalent to calling ``update_range`` for each value
+
+        Parameters
+        ----------
+        values : list
+            Values to update range with, the type depends on the attribute
+            type
+        """
+        values = [x for x in values if x is not None]
+        if not values:
+            return
+        if self.att_type == 'numeric':
+            if any(isinstance(x, str) for x in values):
+                for v in values:
+                    self.update_range(v)
+                    if self.att_type != 'numeric':
+                        return
+                return
+            #NaN values are never part of the range
+            values = [x for x in values if x == x]
+            if not values:
+                return
+            self.update_range(min(values))
+            self.update_range(max(values))
+        elif self.att_type == 'factor':
+            self._range.update(values)
+        elif self.att_type == 'tier':
+            if isinstance(self._range, list):
+                self._range = set(self._range)
+            for v in values:
+                self._range.update(v)
+
 class Inventory(object):
     """
     Inventories contain information about a Corpus' segmental inventory.
@@ -1976,6 +2057,274 @@ class Inventory(object):
                 category.append('Voiceless')
         return category
 
+def _positions_to_mask(positions, size):
+    """
+    Convert a list of row positions into an integer bitmap
+    """
+    bits = bytearray((size >> 3) + 1)
+    for p in positions:
+        bits[p >> 3] |= 1 << (p & 7)
+    return int.from_bytes(bits, 'little')
+
+def _mask_to_positions(mask):
+    """
+    Convert an integer bitmap into a list of row positions
+    """
+    bits = format(mask, 'b')[::-1]
+    positions = []
+    i = bits.find('1')
+    while i != -1:
+        positions.append(i)
+        i = bits.find('1', i + 1)
+    return positions
+
+class AliasTable(object):
+    """
+    Table for drawing indices from a discrete probability distribution
+    in constant time, using Walker's alias method
+
+    Parameters
+    ----------
+    weights : list of float
+        Non-negative weights for each index, which need not sum to one
+    """
+    def __init__(self, weights):
+        size = len(weights)
+        total = float(sum(weights))
+        if size == 0 or not total > 0 or any(w < 0 for w in weights):
+            raise ValueError('Weights must be non-negative and sum to more than zero.')
+        scaled = [w * size / total for w in weights]
+        prob = [1.0] * size
+        alias = list(range(size))
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = (scaled[l] + scaled[s]) - 1
+            if scaled[l] < 1:
+                small.append(l)
+            else:
+                large.append(l)
+        self.size = size
+        self.prob = prob
+        self.alias = alias
+
+    def __len__(self):
+        return self.size
+
+    def draw(self, rng = random):
+        """
+        Draw a random index
+
+        Parameters
+        ----------
+        rng : random.Random, optional
+            Random number generator to use, defaults to the ``random``
+            module
+
+        Returns
+        -------
+        int
+            Index drawn with probability proportional to its weight
+        """
+        i = int(rng.random() * self.size)
+        if rng.random() < self.prob[i]:
+            return i
+        return self.alias[i]
+
+    def sample(self, k, rng = random):
+        """
+        Draw ``k`` random indices with replacement
+
+        Parameters
+        ----------
+        k : int
+            Number of indices to draw
+        rng : random.Random, optional
+            Random number generator to use, defaults to the ``random``
+            module
+
+        Returns
+        -------
+        list of int
+            Indices drawn
+        """
+        size = self.size
+        prob = self.prob
+        alias = self.alias
+        r = rng.random
+        out = []
+        for _ in range(k):
+            i = int(r() * size)
+            out.append(i if r() < prob[i] else alias[i])
+        return out
+
+def _weighted_sample(positions, weights, size, rng, table = None):
+    """
+    Draw ``size`` distinct positions with probability proportional to
+    their weights, as by successive draws without replacement.
+
+    Duplicates drawn from the alias table are rejected, and the table is
+    rebuilt over the remaining positions when rejections start to
+    dominate.
+    """
+    if table is None:
+        table = AliasTable(weights)
+    chosen = []
+    seen = set()
+    misses = 0
+    while len(chosen) < size:
+        p = positions[table.draw(rng)]
+        if p not in seen:
+            seen.add(p)
+            chosen.append(p)
+            continue
+        misses += 1
+        if misses > 2 * len(chosen) + 16:
+            remaining = [(x, w) for x, w in zip(positions, weights)
+                        if x not in seen]
+            positions = [x for x, w in remaining]
+            weights = [w for x, w in remaining]
+            table = AliasTable(weights)
+            misses = 0
+    return chosen
+
+class AttributeIndex(object):
+    """
+    Index of the values of an Attribute for a fixed ordering of the Words
+    in a Corpus, used to evaluate subset filters as bitmaps
+
+    Factor Attributes are indexed as a bitmap per level.  Numeric
+    Attributes are indexed as a sorted array of values, so that range
+    comparisons are a binary search.  Numeric Attributes with non-numeric
+    values are only scanned.
+
+    Parameters
+    ----------
+    attribute : Attribute
+        Attribute to index
+    values : list
+        Values of the Attribute for each Word, in order
+    """
+    _left = {operator.eq: True, operator.ge: True, operator.lt: True,
+            operator.gt: False, operator.le: False}
+
+    def __init__(self, attribute, values):
+        self.att_type = attribute.att_type
+        self.values = values
+        self.size = len(values)
+        self.all = (1 << self.size) - 1
+        self.levels = None
+        self.sorted_values = None
+        self._alias = None
+        if self.att_type == 'factor':
+            levels = dict()
+            for i, v in enumerate(values):
+                levels.setdefault(v, []).append(i)
+            self.levels = {k: _positions_to_mask(v, self.size)
+                            for k, v in levels.items()}
+        elif self.att_type == 'numeric':
+            if not all(isinstance(v, (int, float)) for v in values):
+                return
+            order = sorted((i for i, v in enumerate(values) if v == v),
+                            key = values.__getitem__)
+            self.positions = order
+            self.sorted_values = [values[i] for i in order]
+            self.numeric = _positions_to_mask(order, self.size)
+
+    def weights(self, positions = None):
+        """
+        Get the positions with positive values of a numeric Attribute,
+        along with those values, for use as sampling weights
+
+        Parameters
+        ----------
+        positions : list of int, optional
+            Positions to restrict the weights to, defaults to all
+
+        Returns
+        -------
+        tuple
+            List of positions and list of their weights
+        """
+        if self.sorted_values is None:
+            raise ValueError('Only numeric attributes can be used as weights.')
+        if positions is None:
+            positions = range(self.size)
+        values = self.values
+        positions = [i for i in positions if values[i] > 0]
+        return positions, [values[i] for i in positions]
+
+    def alias_table(self):
+        """
+        Get an AliasTable for drawing positions weighted by the values
+        of a numeric Attribute, along with the positions it draws from
+
+        Returns
+        -------
+        tuple
+            List of positions and the AliasTable over them
+        """
+        if self._alias is None:
+            positions, weights = self.weights()
+            self._alias = positions, weights, AliasTable(weights)
+        return self._alias
+
+    def _range_mask(self, start, end):
+        positions = self.positions
+        if end - start > len(positions) // 2:
+            excluded = positions[:start] + positions[end:]
+            return self.numeric & ~_positions_to_mask(excluded, self.size)
+        return _positions_to_mask(positions[start:end], self.size)
+
+    def mask(self, comparison, value = None):
+        """
+        Get the bitmap of Words that pass a filter
+
+        Parameters
+        ----------
+        comparison : callable or set
+            Set of levels for factor Attributes, or a comparison
+            function from the ``operator`` module for numeric
+            Attributes
+        value : object
+            Value to compare numeric Attributes to
+
+        Returns
+        -------
+        int
+            Bitmap with a bit set for each Word that passes
+        """
+        if self.att_type == 'factor':
+            mask = 0
+            for level in comparison:
+                mask |= self.levels.get(level, 0)
+            return mask
+        if self.att_type != 'numeric':
+            return self.all
+        if self.sorted_values is not None and isinstance(value, (int, float)) \
+                and value == value:
+            if comparison is operator.ne:
+                return self.all & ~self.mask(operator.eq, value)
+            if comparison in self._left:
+                left = bisect.bisect_left(self.sorted_values, value)
+                right = bisect.bisect_right(self.sorted_values, value)
+                end = len(self.sorted_values)
+                if comparison is operator.eq:
+                    return self._range_mask(left, right)
+                if comparison is operator.gt:
+                    return self._range_mask(right, end)
+                if comparison is operator.ge:
+                    return self._range_mask(left, end)
+                if comparison is operator.lt:
+                    return self._range_mask(0, left)
+                return self._range_mask(0, right)
+        return _positions_to_mask([i for i, v in enumerate(self.values)
+                                    if comparison(v, value)], self.size)
+
 class Corpus(object):
     """
     Lexicon to store information about Words, such as transcriptions,
@@ -2024,6 +2373,11 @@ class Corpus(object):
         self._attributes = [Attribute('spelling','spelling'),
                             Attribute('transcription','tier'),
                             Attribute('frequency','numeric')]
+        self._homograph_counts = dict()
+        self._spelling_index = dict()
+        self._word_index = dict()
+        self._attribute_indexes = dict()
+        self._index_order = None
 
     @property
     def has_transcription(self):
@@ -2040,42 +2394,158 @@ class Corpus(object):
         return True
 
     def __iadd__(self, other):
+        self.merge(other)
+        return self
+
+    def merge(self, other):
+        """
+        Fold the Words of another Corpus into this one.
+
+        Words with the same spelling and transcription as a Word already
+        in the Corpus are combined with it: their frequencies are summed,
+        attributes left at their defaults are filled in, and their
+        WordTokens are moved to the existing Word.  Other Words are added
+        to the Corpus as by ``add_words``.  Words are looked up by hash,
+        so merging takes time linear in the size of ``other``, and
+        lexicons built separately (for instance, in parallel) can be
+        merged into one in any grouping with the same result as long as
+        they are merged in the same order.
+
+        Parameters
+        ----------
+        other : Corpus
+            Corpus to merge into this one
+        """
         for a in other.attributes:
             if a not in self.attributes:
-                self.add_attribute(a)
+                self.add_attribute(a, initialize_defaults = True)
+        merged = []
+        new_words = []
+        pending = {}
         for w in other:
-            try:
-                sw = self.find(w.spelling)
-                sw.frequency += w.frequency
-                for a in self.attributes:
-                    if getattr(sw, a.name) == a.default_value and getattr(w, a.name) != a.default_value:
-                        setattr(sw, a.name, getattr(w, a.name))
-                sw.wordtokens += w.wordtokens
-            except KeyError:
-                self.add_word(w)
+            index_key = self._index_key(w.spelling, w.transcription)
+            key = self._word_index.get(index_key)
+            if key is not None:
+                sw = self.wordlist[key]
+            else:
+                sw = pending.get(index_key)
+            if sw is None:
+                pending[index_key] = w
+                new_words.append(w)
+                continue
+            sw.frequency += w.frequency
+            for a in self.attributes:
+                if getattr(sw, a.name, a.default_value) == a.default_value \
+                        and getattr(w, a.name, a.default_value) != a.default_value:
+                    setattr(sw, a.name, getattr(w, a.name))
+            for wt in w.wordtokens:
+                wt.wordtype = sw
+            sw.wordtokens.extend(w.wordtokens)
+            merged.append(sw)
+        self.add_words(new_words)
+        if merged:
+            for a in self.attributes:
+                a.update_ranges([getattr(w, a.name) for w in merged])
+            self.invalidate_attribute_indexes()
         if self.specifier is None and other.specifier is not None:
             self.set_feature_matrix(other.specifier)
-        return self
 
     def key(self, word):
-        key = word.spelling
-        if self[key] == word:
+        key = self._word_index.get(self._index_key(word.spelling, word.transcription))
+        if key is not None and self.wordlist[key] == word:
             return key
-        count = 0
-        while True:
-            count += 1
-            key = '{} ({})'.format(word.spelling,count)
-            try:
-                if self[key] == word:
-                    return key
-            except KeyError:
-                break
+        for key in self._spelling_index.get(word.spelling, []):
+            if self.wordlist[key] == word:
+                return key
 
 
     def keys(self):
         for k in sorted(self.wordlist.keys()):
             yield k
 
+    def _ordered_keys(self):
+        """
+        Get the list of keys that the Attribute indexes are positioned
+        against
+        """
+        if self._index_order is None:
+            self._index_order = list(self.wordlist.keys())
+            self._attribute_indexes = dict()
+        return self._index_order
+
+    def _attribute_index(self, attribute):
+        """
+        Get the index of an Attribute, building it if necessary or if the
+        Attribute has been set on any Word since the index was built
+        """
+        self._ordered_keys()
+        version = _attribute_versions[attribute.name]
+        try:
+            built, index = self._attribute_indexes[attribute.name]
+            if built == version:
+                return index
+        except KeyError:
+            pass
+        values = [getattr(self.wordlist[k], attribute.name, None)
+                    for k in self._index_order]
+        index = AttributeIndex(attribute, values)
+        self._attribute_indexes[attribute.name] = (version, index)
+        return index
+
+    def invalidate_attribute_indexes(self, name = None):
+        """
+        Discard the Attribute indexes used by ``subset``
+
+        Indexes are discarded automatically when Words are added or
+        removed, Attributes are changed through the Corpus, or Attribute
+        values are assigned on Words, but code that modifies values in
+        place (for instance, the segments of a Transcription) should call
+        this before filtering the Corpus again.
+
+        Parameters
+        ----------
+        name : str, optional
+            Name of the Attribute whose index should be discarded,
+            if None (default), all indexes are discarded
+        """
+        if name is None:
+            self._attribute_indexes = dict()
+            self._index_order = None
+        else:
+            self._attribute_indexes.pop(name, None)
+
+    def subset_keys(self, filters):
+        """
+        Get the keys of the Words in the corpus that match filters,
+        without building a new Corpus.
+
+        See ``subset`` for the format of filters.  Filters are evaluated
+        against per-Attribute indexes that are built on first use and
+        kept until the Corpus changes, so repeated queries (for instance,
+        a sweep over frequency thresholds) only pay for the comparisons.
+
+        Parameters
+        ----------
+        filters : list of tuples
+            See ``subset`` for format
+
+        Returns
+        -------
+        list of str
+            Keys of the matching Words, in the order the Words were
+            added to the Corpus
+        """
+        order = self._ordered_keys()
+        mask = (1 << len(order)) - 1
+        for f in filters:
+            if not mask:
+                break
+            if f[0].att_type == 'numeric':
+                mask &= self._attribute_index(f[0]).mask(f[1], f[2])
+            elif f[0].att_type == 'factor':
+                mask &= self._attribute_index(f[0]).mask(f[1])
+        return [order[i] for i in _mask_to_positions(mask)]
+
     def subset(self, filters):
         """
         Generate a subset of the corpus based on filters.
@@ -2104,17 +2574,7 @@ class Corpus(object):
         new_corpus = Corpus('')
         new_corpus._attributes = [Attribute(x.name, x.att_type, x.display_name)
                     for x in self.attributes]
-        for word in self:
-            for f in filters:
-                if f[0].att_type == 'numeric':
-                    op = f[1]
-                    if not op(getattr(word,f[0].name), f[2]):
-                        break
-                elif f[0].att_type == 'factor':
-                    if getattr(word,f[0].name) not in f[1]:
-                        break
-            else:
-                new_corpus.add_word(word)
+        new_corpus.add_words([self.wordlist[k] for k in self.subset_keys(filters)])
         return new_corpus
 
     @property
@@ -2125,6 +2585,23 @@ class Corpus(object):
     def words(self):
         return sorted(list(self.wordlist.keys()))
 
+    def variant_table(self, sequence_type = 'transcription'):
+        """
+        Get the pronunciation variants of every Word in the Corpus
+
+        Parameters
+        ----------
+        sequence_type : str, optional
+            Tier name to get variants
+
+        Returns
+        -------
+        dict
+            Dictionary with keys of Word identifiers and values of
+            dictionaries of variants and their frequencies
+        """
+        return {k: w.variants(sequence_type) for k, w in self.wordlist.items()}
+
     def features_to_segments(self, feature_description):
         """
         Given a feature description, return the segments in the inventory
@@ -2199,6 +2676,7 @@ class Corpus(object):
                 break
         else:
             self._attributes.append(attribute)
+        self.invalidate_attribute_indexes(attribute.name)
         for word in self:
             word.add_abstract_tier(attribute.name,spec)
             attribute.update_range(getattr(word,attribute.name))
@@ -2222,6 +2700,7 @@ class Corpus(object):
                 break
         else:
             self._attributes.append(attribute)
+        self.invalidate_attribute_indexes(attribute.name)
         if initialize_defaults:
             for word in self:
                 word.add_attribute(attribute.name,attribute.default_value)
@@ -2254,6 +2733,7 @@ class Corpus(object):
                 break
         else:
             self._attributes.append(attribute)
+        self.invalidate_attribute_indexes(attribute.name)
         if isinstance(spec, str):
             tier_segs = self.features_to_segments(spec)
         else:
@@ -2287,6 +2767,7 @@ class Corpus(object):
                 break
         else:
             self._attributes.append(attribute)
+        self.invalidate_attribute_indexes(attribute.name)
         if isinstance(spec, str):
             tier_segs = self.features_to_segments(spec)
         else:
@@ -2307,9 +2788,14 @@ class Corpus(object):
             Identifier to use to remove the Word
         """
         try:
-            del self.wordlist[word_key]
+            word = self.wordlist.pop(word_key)
         except KeyError:
-            pass
+            return
+        self._unindex(word_key, word)
+        #Free up the homograph key for the next word with this spelling
+        n = self._homograph_number(word_key, word.spelling)
+        if n is not None and n < self._homograph_counts.get(word.spelling, 1):
+            self._homograph_counts[word.spelling] = n
 
     def remove_attribute(self, attribute):
         """
@@ -2334,9 +2820,14 @@ class Corpus(object):
             return
         for word in self:
             word.remove_attribute(name)
+        self.invalidate_attribute_indexes(name)
 
     def __getstate__(self):
         state = self.__dict__.copy()
+        #Indexes are rebuilt on loading
+        for k in ['_homograph_counts', '_spelling_index', '_word_index',
+                    '_attribute_indexes', '_index_order']:
+            state.pop(k, None)
         return state
 
     def __setstate__(self,state):
@@ -2364,7 +2855,6 @@ class Corpus(object):
                 except KeyError:
                     pass
             self.__dict__.update(state)
-            self._specify_features()
             #Backwards compatability
             for k,w in self.wordlist.items():
                 w._corpus = self
@@ -2379,6 +2869,10 @@ class Corpus(object):
                             print(k)
                             print(w.__dict__)
                             raise(e)
+            #Index keys use the string form of transcriptions, so they have
+            #to be built after legacy transcriptions have been converted
+            self._rebuild_indexes()
+            self._specify_features()
         except Exception as e:
             raise(e)
             raise(CorpusIntegrityError("An error occurred while loading the corpus: {}.\nPlease redownload or recreate the corpus.".format(str(e))))
@@ -2442,7 +2936,93 @@ class Corpus(object):
         self.specifier = matrix
         self._specify_features()
 
-    def get_random_subset(self, size, new_corpus_name='randomly_generated'):
+    def sample_keys(self, size, weight = None, stratify = None, seed = None):
+        """
+        Draw a random sample of Word keys without replacement
+
+        Parameters
+        ----------
+        size : int
+            Number of keys to draw
+        weight : Attribute or str, optional
+            Numeric Attribute (such as 'frequency') to weight Words by,
+            if None (default), every Word is equally likely.  Words with
+            weights that are zero, negative or missing are never drawn
+        stratify : Attribute or str, optional
+            Attribute to stratify by, if specified, each value of the
+            Attribute is represented in proportion to its number of Words
+        seed : int or random.Random, optional
+            Seed for the random number generator, or a generator to use,
+            so that samples can be reproduced
+
+        Returns
+        -------
+        list of str
+            Keys of the Words drawn, in the order drawn
+
+        Raises
+        ------
+        ValueError
+            If the Corpus does not have enough Words to draw from
+        """
+        if isinstance(seed, random.Random):
+            rng = seed
+        else:
+            rng = random.Random(seed)
+        order = self._ordered_keys()
+        if size < 0:
+            raise ValueError('Sample size cannot be negative.')
+        if size > len(order):
+            raise ValueError('Sample size is larger than the corpus.')
+        if size == 0:
+            return []
+        if weight is not None:
+            if isinstance(weight, str):
+                weight = self.attributes[self.attributes.index(weight)]
+            weights = self._attribute_index(weight)
+        if stratify is None:
+            if weight is None:
+                return rng.sample(order, size)
+            positions, values, table = weights.alias_table()
+            if size > len(positions):
+                raise ValueError('Sample size is larger than the number '
+                                'of words with positive weights.')
+            return [order[i] for i in
+                    _weighted_sample(positions, values, size, rng, table)]
+
+        if isinstance(stratify, str):
+            stratify = self.attributes[self.attributes.index(stratify)]
+        strata = dict()
+        for i, v in enumerate(self._attribute_index(stratify).values):
+            strata.setdefault(v, []).append(i)
+        if weight is not None:
+            strata = {k: weights.weights(v)[0] for k, v in strata.items()}
+        levels = sorted(strata, key = str)
+        total = sum(len(strata[k]) for k in levels)
+        if size > total:
+            raise ValueError('Sample size is larger than the number '
+                            'of words with positive weights.')
+        #Largest remainder allocation of the sample across strata
+        quotas = {k: size * len(strata[k]) // total for k in levels}
+        remainder = size - sum(quotas.values())
+        by_fraction = sorted(levels, reverse = True,
+                        key = lambda k: (size * len(strata[k])) % total)
+        for k in by_fraction[:remainder]:
+            quotas[k] += 1
+        keys = []
+        for k in levels:
+            if not quotas[k]:
+                continue
+            if weight is None:
+                drawn = rng.sample(strata[k], quotas[k])
+            else:
+                positions, values = weights.weights(strata[k])
+                drawn = _weighted_sample(positions, values, quotas[k], rng)
+            keys.extend(order[i] for i in drawn)
+        return keys
+
+    def get_random_subset(self, size, new_corpus_name='randomly_generated',
+                        weight = None, stratify = None, seed = None):
         """Get a new corpus consisting a random selection from the current corpus
 
         Parameters
@@ -2452,18 +3032,116 @@ class Corpus(object):
 
         new_corpus_name : str
 
+        weight : Attribute or str, optional
+            Numeric Attribute to weight Words by, see ``sample_keys``
+
+        stratify : Attribute or str, optional
+            Attribute to stratify the sample by, see ``sample_keys``
+
+        seed : int or random.Random, optional
+            Seed for the random number generator
+
         Returns
         -------
         new_corpus : Corpus
             New corpus object with len(new_corpus) == size
         """
         new_corpus = Corpus(new_corpus_name)
-        while len(new_corpus) < size:
-            word = self.random_word()
-            new_corpus.add_word(word, allow_duplicates=False)
+        keys = self.sample_keys(size, weight = weight, stratify = stratify,
+                                seed = seed)
+        new_corpus.add_words([self.wordlist[k] for k in keys])
         new_corpus.specifier = self.specifier
         return new_corpus
 
+    def _add_key(self, word, allow_duplicates=True):
+        """
+        Add a Word to the wordlist under a key for its spelling.  Words
+        with the same spelling as an existing word get the lowest free key
+        of '<spelling> (1)', '<spelling> (2)', and so on.
+
+        Returns the key, or None if the spelling is already used and
+        duplicates are not allowed.
+        """
+        spelling = word.spelling
+        exists = spelling in self.wordlist or '{} (1)'.format(spelling) in self.wordlist
+        if exists and not allow_duplicates:
+            return None
+        if not exists:
+            key = spelling
+            count = 1
+        else:
+            #Every homograph key below the stored count is taken
+            count = max(self._homograph_counts.get(spelling, 1), 1)
+            key = '{} ({})'.format(spelling, count)
+            while key in self.wordlist:
+                count += 1
+                key = '{} ({})'.format(spelling, count)
+            count += 1
+        self._homograph_counts[spelling] = count
+        self.wordlist[key] = word
+        self._index(key, word)
+        if spelling is not None and not self.has_spelling:
+            self.has_spelling = True
+        return key
+
+    @staticmethod
+    def _index_key(spelling, transcription):
+        if transcription is not None:
+            transcription = str(transcription)
+        return spelling, transcription
+
+    def _index(self, key, word):
+        """
+        Add a key to the indexes of keys by spelling and of keys by
+        spelling and transcription
+        """
+        self.invalidate_attribute_indexes()
+        self._spelling_index.setdefault(word.spelling, []).append(key)
+        self._word_index.setdefault(self._index_key(word.spelling,
+                                            word.transcription), key)
+
+    def _unindex(self, key, word):
+        """
+        Remove a key from the indexes of keys by spelling and of keys by
+        spelling and transcription
+        """
+        self.invalidate_attribute_indexes()
+        keys = self._spelling_index.get(word.spelling, [])
+        if key in keys:
+            keys.remove(key)
+        if not keys:
+            self._spelling_index.pop(word.spelling, None)
+        index_key = self._index_key(word.spelling, word.transcription)
+        if self._word_index.get(index_key) == key:
+            del self._word_index[index_key]
+            for k in keys:
+                if self._index_key(self.wordlist[k].spelling,
+                            self.wordlist[k].transcription) == index_key:
+                    self._word_index[index_key] = k
+                    break
+
+    @staticmethod
+    def _homograph_number(key, spelling):
+        """
+        Return the number n of a '<spelling> (n)' key, or None for other keys
+        """
+        if spelling is None or key == spelling:
+            return None
+        try:
+            return int(key[len(spelling)+2:-1])
+        except ValueError:
+            return None
+
+    def _rebuild_indexes(self):
+        self.invalidate_attribute_indexes()
+        self._spelling_index = dict()
+        self._word_index = dict()
+        #Homograph keys are searched from '<spelling> (1)' on the next addition
+        self._homograph_counts = dict()
+        #Index homographs in the order of their keys
+        for key in sorted(self.wordlist.keys(), key = lambda x: (len(x), x)):
+            self._index(key, self.wordlist[key])
+
     def add_word(self, word, allow_duplicates=True):
         """Add a word to the Corpus.
         If allow_duplicates is True, then words with identical spelling can
@@ -2482,32 +3160,8 @@ class Corpus(object):
 
         """
         word._corpus = self
-        #If the word doesn't exist, add it
-        try:
-            check = self.find(word.spelling, keyerror=True)
-            if allow_duplicates:
-                #Some words have more than one entry in a corpus, e.g. "live" and "live"
-                #so they need to be assigned unique keys
-
-                n = 0
-                while True:
-                    n += 1
-                    #key = '{} ({})'.format(word.spelling.lower(),n)
-                    key = '{} ({})'.format(word.spelling,n)
-                    try:
-                        check = self.find(key, keyerror=True)
-                    except KeyError:
-                    #if isinstance(check, EmptyWord):
-                        self.wordlist[key] = word
-                        break
-            else:
-                return
-        except KeyError:
-            self.wordlist[word.spelling] = word
-            if word.spelling is not None:
-                #self.orthography.update(word.spelling)
-                if not self.has_spelling:
-                    self.has_spelling = True
+        if self._add_key(word, allow_duplicates) is None:
+            return
 
         if word.transcription is not None:
             self.update_inventory(word.transcription)
@@ -2525,6 +3179,68 @@ class Corpus(object):
                 word.add_attribute(a.name, a.default_value)
             a.update_range(getattr(word,a.name))
 
+    def add_words(self, words, allow_duplicates=True):
+        """Add many words to the Corpus at once.
+
+        Words are added as by ``add_word``, but the inventory, the
+        Attributes of the Corpus and their ranges are only updated once
+        all the words have been added.
+
+        Parameters
+        ----------
+        words : iterable of Words
+            Word objects to be added
+
+        allow_duplicates : bool
+            If False, duplicate Words with the same spelling as an existing
+            word in the corpus will not be added
+
+        """
+        added = []
+        segments = set()
+        stress_patterns = []
+        for word in words:
+            word._corpus = self
+            if self._add_key(word, allow_duplicates) is None:
+                continue
+            added.append(word)
+            if word.transcription is not None:
+                segments.update(x for x in word.transcription._list
+                                if isinstance(x, str))
+                if word.transcription.stress_pattern:
+                    stress_patterns.append(word.transcription)
+
+        for s in sorted(segments):
+            if s not in self.inventory:
+                self.inventory[s] = Segment(s)
+        for t in stress_patterns:
+            for k,v in t.stress_pattern.items():
+                self.inventory.stresses[v].add(t[k])
+        symbols = {s: self.inventory[s].symbol for s in segments}
+
+        descriptors = set(x.name for x in self.attributes)
+        for word in added:
+            if word.transcription is not None:
+                word.transcription._list = [symbols[x] for x in word.transcription._list]
+            for d in word.descriptors:
+                if d in descriptors:
+                    continue
+                descriptors.add(d)
+                if isinstance(getattr(word,d),str):
+                    self._attributes.append(Attribute(d,'factor'))
+                elif isinstance(getattr(word,d),Transcription):
+                    self._attributes.append(Attribute(d,'tier'))
+                elif isinstance(getattr(word,d),(int, float)):
+                    self._attributes.append(Attribute(d,'numeric'))
+
+        for a in self.attributes:
+            values = []
+            for word in added:
+                if not hasattr(word,a.name):
+                    word.add_attribute(a.name, a.default_value)
+                values.append(getattr(word,a.name))
+            a.update_ranges(values)
+
     def update_inventory(self, transcription):
         """
         Update the inventory of the Corpus to ensure it contains all
@@ -2569,21 +3285,79 @@ class Corpus(object):
         except KeyError:
             return None
 
-        words = self.find_all(spelling)
+        word = self.find_word(**kwargs)
+        if word is None:
+            word = Word(**kwargs)
+            self.add_word(word)
+        return word
+
+    def find_word(self, **kwargs):
+        """
+        Get the Word object that has the spelling, transcription and any
+        other attribute values specified, if it is in the Corpus
+
+        Parameters
+        ----------
+        kwargs
+            Attribute values to match, as for ``get_or_create_word``
+
+        Returns
+        -------
+        Word or None
+            Matching Word, or None if there is no such Word
+        """
+        try:
+            spelling = kwargs['spelling']
+            if isinstance(spelling,tuple):
+                spelling = spelling[1]
+        except KeyError:
+            return None
+        if 'transcription' in kwargs:
+            transcription = kwargs['transcription']
+            if isinstance(transcription,tuple):
+                transcription = transcription[1]
+            if isinstance(transcription,list):
+                transcription = Transcription(transcription)
+            key = self._word_index.get(self._index_key(spelling, transcription))
+            if key is not None:
+                word = self.match_word([self.wordlist[key]], **kwargs)
+                if word is not None or len(kwargs) == 2:
+                    return word
+            elif len(kwargs) == 2:
+                return None
+        return self.match_word(self.find_all(spelling), **kwargs)
+
+    @staticmethod
+    def match_word(words, **kwargs):
+        """
+        Find the first Word that has all of the attribute values specified
+
+        Parameters
+        ----------
+        words : list of Words
+            Words to search
+        kwargs
+            Attribute values to match, as for ``get_or_create_word``
+
+        Returns
+        -------
+        Word or None
+            Matching Word, or None if none of the Words match
+        """
+        values = {}
+        for k,v in kwargs.items():
+            if isinstance(v,tuple):
+                v = v[1]
+            if isinstance(v,list):
+                v = Transcription(v)
+            values[k] = v
         for w in words:
-            for k,v in kwargs.items():
-                if isinstance(v,tuple):
-                    v = v[1]
-                if isinstance(v,list):
-                    v = Transcription(v)
+            for k,v in values.items():
                 if getattr(w,k) != v:
                     break
             else:
                 return w
-        else:
-            word = Word(**kwargs)
-            self.add_word(word)
-        return word
+        return None
 
     def random_word(self):
         """Return a randomly selected Word
@@ -2593,7 +3367,7 @@ class Corpus(object):
         Word
             Random Word
         """
-        word = random.choice(list(self.wordlist.keys()))
+        word = random.choice(self._ordered_keys())
         return self.wordlist[word]
 
     def get_features(self):
@@ -2662,19 +3436,7 @@ class Corpus(object):
         list of Words
             Words that have the specified spelling
         """
-        words = list()
-        try:
-            words.append(self.wordlist[spelling])
-            count = 0
-            while True:
-                count += 1
-                try:
-                    words.append(self.wordlist['{} ({})'.format(spelling,count)])
-                except KeyError:
-                    break
-        except KeyError:
-            pass
-        return words
+        return [self.wordlist[k] for k in self._spelling_index.get(spelling, [])]
 
     def __contains__(self,item):
         return self.wordlist.__contains__(item)
@@ -2683,7 +3445,10 @@ class Corpus(object):
         return len(self.wordlist)
 
     def __setitem__(self,item,value):
+        if item in self.wordlist:
+            self._unindex(item, self.wordlist[item])
         self.wordlist[item] = value
+        self._index(item, value)
 
     def __getitem__(self,item):
         return self.wordlist[item]
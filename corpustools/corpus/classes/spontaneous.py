@@ -1,12 +1,14 @@
 
 from collections import OrderedDict
+from bisect import bisect_left, insort
 
-from .lexicon import Transcription, Corpus, Attribute
+from .lexicon import Transcription, Corpus, Attribute, Word
 
 import os
-import wave
 import math
 
+from scipy.io import wavfile
+
 class Speaker(object):
     """
     Speaker objects contain information about the producers of WordTokens
@@ -118,7 +120,11 @@ class SpontaneousSpeechCorpus(object):
             Discourse to be added
         """
         self.discourses[str(discourse)] = discourse
-        #self.lexicon += discourse.lexicon
+        if discourse.lexicon is not self.lexicon:
+            if len(discourse.lexicon) > 0:
+                self.lexicon.merge(discourse.lexicon)
+            #Tokens now point at the merged Words, so share the lexicon
+            discourse.lexicon = self.lexicon
 
 class Discourse(object):
     """
@@ -157,10 +163,24 @@ class Discourse(object):
                             Attribute('end','numeric', 'End')]
 
         self.words = dict()
+        self._begins = []
+        self._clear_indexes()
 
         self.lexicon = Corpus(self.name + ' lexicon')
         self.lexicon.has_wordtokens = True
 
+    def _clear_indexes(self):
+        self._wordtype_index = None
+        self._ngram_counts = {}
+
+    def _build_wordtype_index(self):
+        if self._wordtype_index is None:
+            index = {}
+            for i, b in enumerate(self._begins):
+                index.setdefault(self.words[b].wordtype, []).append(i)
+            self._wordtype_index = index
+        return self._wordtype_index
+
     @property
     def attributes(self):
         return self._attributes
@@ -174,10 +194,10 @@ class Discourse(object):
         list
             List of begin times or indices of WordTokens in the Discourse
         """
-        return sorted(self.words.keys())
+        return list(self._begins)
 
     def __len__(self):
-        return len(self.words.keys())
+        return len(self._begins)
 
     def __eq__(self, other):
         if not isinstance(other,Discourse):
@@ -216,7 +236,14 @@ class Discourse(object):
             WordToken to be added
         """
         wordtoken.discourse = self
-        self.words[wordtoken.begin] = wordtoken
+        begin = wordtoken.begin
+        if begin not in self.words:
+            if not self._begins or begin > self._begins[-1]:
+                self._begins.append(begin)
+            else:
+                insort(self._begins, begin)
+        self.words[begin] = wordtoken
+        self._clear_indexes()
         for a in self.attributes:
             if not hasattr(wordtoken,a.name):
                 wordtoken.add_attribute(a.name, a.default_value)
@@ -248,12 +275,62 @@ class Discourse(object):
 
     def __getitem__(self, key):
         if isinstance(key, float) or isinstance(key, int):
-            #Find the word token at a given time
-            keys = filter(lambda x: x >= key,self.words.keys())
-            t = min(keys,key = lambda x: x - key)
-            return self.words[t]
+            #Find the first word token beginning at or after a given time
+            try:
+                return self.words[key]
+            except KeyError:
+                pass
+            i = bisect_left(self._begins, key)
+            if i == len(self._begins):
+                raise(KeyError(key))
+            return self.words[self._begins[i]]
         raise(TypeError)
 
+    def token_at(self, time):
+        """
+        Get the WordToken that is being produced at a given time
+
+        Parameters
+        ----------
+        time : float
+            Time in the Discourse
+
+        Returns
+        -------
+        WordToken or None
+            WordToken that begins at or before the time and ends after
+            it, or None if no WordToken spans the time
+        """
+        i = bisect_left(self._begins, time)
+        if i < len(self._begins) and self._begins[i] == time:
+            return self.words[time]
+        if i == 0:
+            return None
+        wt = self.words[self._begins[i - 1]]
+        if wt.end is not None and wt.end > time:
+            return wt
+        return None
+
+    def tokens_between(self, begin, end):
+        """
+        Get the WordTokens that begin within a time range
+
+        Parameters
+        ----------
+        begin : float
+            Beginning of the range
+        end : float
+            End of the range (exclusive)
+
+        Returns
+        -------
+        list of WordTokens
+            WordTokens beginning in the range, in order
+        """
+        lo = bisect_left(self._begins, begin)
+        hi = bisect_left(self._begins, end)
+        return [self.words[b] for b in self._begins[lo:hi]]
+
     @property
     def has_audio(self):
         """
@@ -269,47 +346,75 @@ class Discourse(object):
             return True
         return False
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_wordtype_index', None)
+        state.pop('_ngram_counts', None)
+        return state
+
     def __setstate__(self,state):
         if 'wav_path' not in state:
             state['wav_path'] = None
+        if '_begins' not in state:
+            state['_begins'] = sorted(state['words'].keys())
         self.__dict__.update(state)
+        self._clear_indexes()
         if hasattr(self,'lexicon'):
             self.lexicon.has_wordtokens = True
         for wt in self:
             wt.wordtype.wordtokens.append(wt)
 
     def __iter__(self):
-        for k in sorted(self.words.keys()):
+        for k in self._begins:
             yield self.words[k]
 
+    def extract_token_audio(self, tokens):
+        """
+        Get the audio of WordTokens from the Discourse's .wav file
+
+        The .wav file is memory-mapped once, and the audio for each
+        WordToken is a view of it, so samples are neither copied nor
+        written to new files.
+
+        Parameters
+        ----------
+        tokens : list
+            WordTokens, or their begin times, to get the audio of
+
+        Returns
+        -------
+        int
+            Sampling rate of the .wav file
+        list of arrays
+            Samples of the first channel for each WordToken
+        """
+        if not self.has_audio:
+            return None
+        sr, data = wavfile.read(self.wav_path, mmap = True)
+        if data.ndim > 1:
+            data = data[:,0]
+        signals = []
+        for t in tokens:
+            if not isinstance(t, WordToken):
+                t = self[t]
+            signals.append(data[int(t.begin * sr):int(t.end * sr)])
+        return sr, signals
+
     def _extract_tokens(self, tokens, output_dir):
-        if not self.has_audio():
+        if not self.has_audio:
             return
+        tokens = [t if isinstance(t, WordToken) else self[t] for t in tokens]
+        sr, signals = self.extract_token_audio(tokens)
         filenames = []
-        with wave.open(self.wav_path,'r') as w_in:
-            sr = w_in.getframerate()
-            bitdepth = w_in.getsampwidth()
-            for t in tokens:
-                wt = self[t]
-                name = '{}_{}.wav'.format(self.name,wt.begin)
-                wt.wav_path = os.path.join(output_dir,name)
-                filenames.append(wt.wav_path)
-                if os.path.exists(wt.wav_path):
-                    continue
-
-                begpos = int(wt.begin * sr)
-                endpos = int(wt.end * sr)
-                duration = endpos - begpos
-                w_in.setpos(begpos)
-                data = w_in.readframes(duration)
-                with wave.open(wt.wav_path,'w') as w_out:
-                    w_out.setnchannels(1)
-                    w_out.setframerate(sr)
-                    w_out.setsampwidth(bitdepth)
-                    w_out.writeframes(data)
+        for wt, signal in zip(tokens, signals):
+            name = '{}_{}.wav'.format(self.name,wt.begin)
+            wt.wav_path = os.path.join(output_dir,name)
+            filenames.append(wt.wav_path)
+            if os.path.exists(wt.wav_path):
+                continue
+            wavfile.write(wt.wav_path, sr, signal)
         return filenames
 
-
     def create_lexicon(self):
         """
         Create a Corpus object from the Discourse
@@ -323,11 +428,18 @@ class Discourse(object):
         """
         corpus = Corpus(self.name + ' lexicon')
         corpus.has_wordtokens = True
+        words = {}
         for token in self:
-            word = corpus.get_or_create_word(token.wordtype.spelling,token.wordtype.transcription)
+            wordtype = token.wordtype
+            key = (wordtype.spelling, str(wordtype.transcription))
+            try:
+                word = words[key]
+            except KeyError:
+                word = words[key] = Word(spelling = wordtype.spelling,
+                                        transcription = wordtype.transcription)
             word.frequency += 1
-            token.wordtype = word
             word.wordtokens.append(token)
+        corpus.add_words(words.values())
         return corpus
 
     def find_wordtype(self, wordtype):
@@ -344,23 +456,31 @@ class Discourse(object):
         list of WordTokens
             List of the given Word's WordTokens in this Discourse
         """
-        return list(x for x in self if x.wordtype == wordtype)
+        positions = self._build_wordtype_index().get(wordtype, [])
+        return [self.words[self._begins[i]] for i in positions]
 
     def _calc_frequency(self,query):
+        try:
+            return self._ngram_counts[query]
+        except KeyError:
+            pass
         if isinstance(query, tuple):
             count = 0
-            base = query[0]
-            for x in self.find_wordtype(base):
-                cur = query[0]
+            positions = self._build_wordtype_index().get(query[0], [])
+            for p in positions:
+                if p + len(query) > len(self._begins):
+                    break
                 for i in range(1,len(query)):
-                    if cur.following_token != query[i]:
+                    if self.words[self._begins[p + i]].wordtype != query[i]:
                         break
-                    cur = cur.following_token
                 else:
                     count += 1
-            return count
         elif isinstance(query, Word):
-            return len(self.find_wordtype(query))
+            count = len(self._build_wordtype_index().get(query, []))
+        else:
+            return None
+        self._ngram_counts[query] = count
+        return count
 
 class WordToken(object):
     """
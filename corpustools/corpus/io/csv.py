@@ -2,6 +2,9 @@ from csv import DictReader, DictWriter
 import collections
 import re
 import os
+from itertools import islice
+from functools import partial
+from multiprocessing import Pool
 
 from corpustools.corpus.classes import Corpus, FeatureMatrix, Word, Attribute
 from corpustools.corpus.io.binary import save_binary, load_binary
@@ -10,7 +13,6 @@ from .helper import parse_transcription, AnnotationType
 
 from corpustools.exceptions import DelimiterError, PCTError, CorpusIntegrityError
 
-import time
 
 def inspect_csv(path, num_lines = 10, coldelim = None, transdelim = None):
     """
@@ -47,13 +49,13 @@ def inspect_csv(path, num_lines = 10, coldelim = None, transdelim = None):
     with open(path,'r', encoding='utf-8') as f:
         lines = []
         head = f.readline().strip()
-        for line in f.readlines():
-            lines.append(line.strip())
-        #for i in range(num_lines):
-        #    line = f.readline()
-        #    if not line:
-        #        break
-        #    lines.append(line)
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            lines.append(line)
+            if len(lines) >= num_lines:
+                break
 
     best = ''
     num = 1
@@ -89,14 +91,56 @@ def inspect_csv(path, num_lines = 10, coldelim = None, transdelim = None):
 
     return atts, best
 
+def _parse_csv_lines(lines, annotation_types, delimiter):
+    """
+    Parse lines of a column-delimited file into Words
+
+    Returns a list of Words and whether any transcription had more than
+    one segment.
+    """
+    words = []
+    trans_check = False
+    for line in lines:
+        line = line.strip()
+        if not line: #blank or just a newline
+            continue
+        d = {}
+        for k,v in zip(annotation_types,line.split(delimiter)):
+            v = v.strip()
+            if k.attribute.att_type == 'tier':
+                trans = parse_transcription(v, k)
+                if not trans_check and len(trans) > 1:
+                    trans_check = True
+                d[k.attribute.name] = (k.attribute, trans)
+            else:
+                d[k.attribute.name] = (k.attribute, v)
+        word = Word(**d)
+        if word.transcription:
+            #transcriptions can have phonetic symbol delimiters which is a period
+            if not word.spelling:
+                word.spelling = ''.join(map(str,word.transcription))
+        words.append(word)
+    return words, trans_check
+
+def _read_chunks(f, chunk_size):
+    while True:
+        chunk = list(islice(f, chunk_size))
+        if not chunk:
+            break
+        yield chunk
+
 def load_corpus_csv(corpus_name, path, delimiter,
-                    trans_delimiter,
+                    trans_delimiter = None,
                     annotation_types = None,
                     feature_system_path = None,
+                    num_cores = -1, chunk_size = 10000,
                     stop_check = None, call_back = None):
     """
     Load a corpus from a column-delimited text file
 
+    The file is read in chunks of lines, which are parsed in parallel if
+    multiple cores are specified, and then added to the corpus together.
+
     Parameters
     ----------
     corpus_name : str
@@ -105,12 +149,18 @@ def load_corpus_csv(corpus_name, path, delimiter,
         Full path to text file
     delimiter : str
         Character to use for spliting lines into columns
-    trans_delimiter : str
-        Character to use for spliting transcriptions into segments
+    trans_delimiter : str, optional
+        Character to use for spliting transcriptions into segments, will
+        autodetect if not supplied
     annotation_types : list of AnnotationType, optional
         List of AnnotationType specifying how to parse text files
     feature_system_path : str
         Full path to pickled FeatureMatrix to use with the Corpus
+    num_cores : int, optional
+        Number of processes to parse lines with, -1 (default) parses
+        them in the current process
+    chunk_size : int, optional
+        Number of lines to read and parse at a time
     stop_check : callable, optional
         Optional function to check whether to gracefully terminate early
     call_back : callable, optional
@@ -122,14 +172,13 @@ def load_corpus_csv(corpus_name, path, delimiter,
         Corpus object generated from the text file
 
     """
-    #begin = time.time()
     corpus = Corpus(corpus_name)
     if feature_system_path is not None and os.path.exists(feature_system_path):
         feature_matrix = load_binary(feature_system_path)
         corpus.set_feature_matrix(feature_matrix)
 
     if annotation_types is None:
-        annotation_types, best_delimiter = inspect_csv(path, coldelim = delimiter, transdelim=trans_delimiter)
+        annotation_types, delimiter = inspect_csv(path, coldelim = delimiter, transdelim=trans_delimiter)
     else:
         for a in annotation_types:
             if a.attribute.name == 'transcription' and a.attribute.att_type != 'tier':
@@ -142,40 +191,49 @@ def load_corpus_csv(corpus_name, path, delimiter,
     for a in annotation_types:
         a.reset()
 
+    if call_back is not None:
+        call_back('Reading file...')
+        with open(path, 'rb') as f:
+            num_lines = sum(x.count(b'\n') for x in iter(lambda: f.read(1 << 20), b''))
+        call_back(0, num_lines)
+        cur = 0
+
     with open(path, encoding='utf-8') as f:
         headers = f.readline()
-        headers = headers.split(best_delimiter)
+        headers = headers.split(delimiter)
         if len(headers)==1:
             e = DelimiterError(('Could not parse the corpus.\n\Check '
                                 'that the delimiter you typed in matches '
                                 'the one used in the file.'))
             raise(e)
-        headers = annotation_types
-        for a in headers:
+        for a in annotation_types:
             corpus.add_attribute(a.attribute)
         trans_check = False
 
-        for line in f.readlines():
-            line = line.strip()
-            if not line: #blank or just a newline
-                continue
-            d = {}
-            for k,v in zip(headers,line.split(best_delimiter)):
-                v = v.strip()
-                if k.attribute.att_type == 'tier':
-                    trans = parse_transcription(v, k)
-                    if not trans_check and len(trans) > 1:
-                        trans_check = True
-                    d[k.attribute.name] = (k.attribute, trans)
-                else:
-                    d[k.attribute.name] = (k.attribute, v)
-            word = Word(**d)
-            if word.transcription:
-                #transcriptions can have phonetic symbol delimiters which is a period
-                if not word.spelling:
-                    word.spelling = ''.join(map(str,word.transcription))
-
-            corpus.add_word(word)
+        parse = partial(_parse_csv_lines, annotation_types = annotation_types,
+                        delimiter = delimiter)
+        chunks = _read_chunks(f, chunk_size)
+        pool = None
+        if num_cores > 1:
+            pool = Pool(num_cores)
+            results = pool.imap(parse, chunks)
+        else:
+            results = map(parse, chunks)
+        words = []
+        try:
+            for chunk_words, chunk_check in results:
+                if stop_check is not None and stop_check():
+                    return
+                if call_back is not None:
+                    cur = min(cur + chunk_size, num_lines)
+                    call_back(cur)
+                words.extend(chunk_words)
+                trans_check = trans_check or chunk_check
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+    corpus.add_words(words)
     if corpus.has_transcription and not trans_check:
         e = DelimiterError(('Could not parse transcriptions with that delimiter. '
                             '\n\Check that the transcription delimiter you typed '
@@ -2,8 +2,11 @@ import re
 import os
 import string
 import logging
+from functools import partial
+from multiprocessing import Pool
 
-from corpustools.corpus.classes import Discourse, Attribute, Corpus, Word, WordToken
+from corpustools.corpus.classes import (Discourse, Attribute, Corpus, Word,
+                                        WordToken, Transcription)
 from corpustools.exceptions import DelimiterError
 
 NUMBER_CHARACTERS = set(string.digits)
@@ -346,6 +349,15 @@ def log_annotation_types(annotation_types):
     for a in annotation_types:
         logging.info(a.pretty_print())
 
+def _word_key(word_kwargs):
+    key = []
+    for k in sorted(word_kwargs.keys()):
+        att, v = word_kwargs[k]
+        if att.att_type == 'tier' or isinstance(v, list):
+            v = str(Transcription(v))
+        key.append((k, v))
+    return tuple(key)
+
 def data_to_discourse(data, lexicon = None):
     attribute_mapping = data.mapping()
     d = Discourse(name = data.name, wav_path = data.wav_path)
@@ -362,6 +374,9 @@ def data_to_discourse(data, lexicon = None):
         if not a.token and v not in d.lexicon.attributes:
             lexicon.add_attribute(v, initialize_defaults = True)
 
+    #Words not yet in the lexicon are added together at the end
+    new_words = {}
+    new_word_list = []
     for level in data.word_levels:
         for i, s in enumerate(data[level]):
             word_kwargs = {'spelling':(attribute_mapping[level], s.label)}
@@ -390,7 +405,14 @@ def data_to_discourse(data, lexicon = None):
                     else:
                         word_kwargs[att.name] = (att, seq)
 
-            word = lexicon.get_or_create_word(**word_kwargs)
+            word = lexicon.find_word(**word_kwargs)
+            if word is None:
+                pending_key = _word_key(word_kwargs)
+                word = lexicon.match_word(new_words.get(pending_key, []), **word_kwargs)
+            if word is None:
+                word = Word(**word_kwargs)
+                new_words.setdefault(pending_key, []).append(word)
+                new_word_list.append(word)
             word_token_kwargs['word'] = word
             if 'begin' not in word_token_kwargs:
                 word_token_kwargs['begin'] = ind
@@ -400,4 +422,75 @@ def data_to_discourse(data, lexicon = None):
             word.wordtokens.append(wordtoken)
             d.add_word(wordtoken)
             ind += 1
+    lexicon.add_words(new_word_list)
     return d
+
+def _file_to_data(to_data, find_wav, job):
+    name, paths = job
+    data = to_data(*paths)
+    if data is None:
+        return None
+    data.name = name
+    if find_wav:
+        data.wav_path = find_wav_path(paths[0])
+    return data
+
+def files_to_corpus(corpus, jobs, to_data, find_wav = False, num_cores = -1,
+                    stop_check = None, call_back = None):
+    """
+    Parse files into DiscourseData and add them as Discourses to a
+    SpontaneousSpeechCorpus
+
+    Files are parsed independently (in separate processes if ``num_cores``
+    is greater than 1), and their words are merged into the corpus lexicon
+    in the order of ``jobs``, so the resulting corpus does not depend on
+    the number of processes used.
+
+    Parameters
+    ----------
+    corpus : SpontaneousSpeechCorpus
+        Corpus to add Discourses to
+    jobs : list of tuples
+        Name of each Discourse and a tuple of the paths to parse it from
+    to_data : callable
+        Function taking the paths of a job and returning a DiscourseData
+    find_wav : bool, optional
+        Flag for looking for a .wav file next to the first path of a job
+    num_cores : int, optional
+        Number of processes to parse files with, -1 (default) parses
+        them in the current process
+    stop_check : callable, optional
+        Optional function to check whether to gracefully terminate early
+    call_back : callable, optional
+        Optional function to supply progress information during the loading
+
+    Returns
+    -------
+    SpontaneousSpeechCorpus
+        The corpus with the Discourses added, or None if stopped early
+    """
+    if call_back is not None:
+        call_back('Parsing files...')
+        call_back(0, len(jobs))
+    parse = partial(_file_to_data, to_data, find_wav)
+    pool = None
+    if num_cores > 1 and len(jobs) > 1:
+        pool = Pool(min(num_cores, len(jobs)))
+        results = pool.imap(parse, jobs)
+    else:
+        results = map(parse, jobs)
+    try:
+        for i, data in enumerate(results):
+            if stop_check is not None and stop_check():
+                return
+            if data is None:
+                return
+            if call_back is not None:
+                call_back('Parsing file {} of {}...'.format(i + 1, len(jobs)))
+                call_back(i + 1)
+            corpus.add_discourse(data_to_discourse(data, corpus.lexicon))
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    return corpus
@@ -2,12 +2,14 @@
 import os
 import re
 import sys
+from functools import partial
 
 FILLERS = set(['uh','um','okay','yes','yeah','oh','heh','yknow','um-huh',
                 'uh-uh','uh-huh','uh-hum','mm-hmm'])
 
 from corpustools.corpus.classes import SpontaneousSpeechCorpus
-from .helper import DiscourseData,data_to_discourse, AnnotationType, Annotation, BaseAnnotation, find_wav_path
+from .helper import (DiscourseData,data_to_discourse, AnnotationType, Annotation,
+                    BaseAnnotation, find_wav_path, files_to_corpus)
 
 from corpustools.corpus.io.binary import load_binary
 
@@ -142,6 +144,7 @@ def multiple_files_to_data(word_path, phone_path, dialect, annotation_types = No
 def load_directory_multiple_files(corpus_name, path, dialect,
                                     annotation_types = None,
                                     feature_system_path = None,
+                                    num_cores = -1,
                                     stop_check = None, call_back = None):
     """
     Loads a directory of corpus standard files (separated into words files
@@ -160,6 +163,9 @@ def load_directory_multiple_files(corpus_name, path, dialect,
         Auto-generated based on dialect.
     feature_system_path : str, optional
         File path of FeatureMatrix binary to specify segments
+    num_cores : int, optional
+        Number of processes to parse files with, -1 (default) parses
+        them in the current process
     stop_check : callable or None
         Optional function to check whether to gracefully terminate early
     call_back : callable or None
@@ -181,18 +187,8 @@ def load_directory_multiple_files(corpus_name, path, dialect,
             if not (filename.lower().endswith('.words') or filename.lower().endswith('.wrd')):
                 continue
             file_tuples.append((root, filename))
-    if call_back is not None:
-        call_back('Parsing files...')
-        call_back(0,len(file_tuples))
-        cur = 0
-    corpus = SpontaneousSpeechCorpus(corpus_name, path)
-    for i, t in enumerate(file_tuples):
-        if stop_check is not None and stop_check():
-            return
-        if call_back is not None:
-            call_back('Parsing file {} of {}...'.format(i+1, len(file_tuples)))
-            call_back(i)
-        root, filename = t
+    jobs = []
+    for root, filename in file_tuples:
         name,ext = os.path.splitext(filename)
         if ext == '.words':
             phone_ext = '.phones'
@@ -200,11 +196,15 @@ def load_directory_multiple_files(corpus_name, path, dialect,
             phone_ext = '.phn'
         word_path = os.path.join(root,filename)
         phone_path = os.path.splitext(word_path)[0] + phone_ext
-        d = load_discourse_multiple_files(name, word_path, phone_path,
-                                            dialect, annotation_types,
-                                            corpus.lexicon, None,
-                                            stop_check, None)
-        corpus.add_discourse(d)
+        jobs.append((name, (word_path, phone_path)))
+    corpus = SpontaneousSpeechCorpus(corpus_name, path)
+    to_data = partial(multiple_files_to_data, dialect = dialect,
+                        annotation_types = annotation_types)
+    corpus = files_to_corpus(corpus, jobs, to_data, find_wav = True,
+                            num_cores = num_cores, stop_check = stop_check,
+                            call_back = call_back)
+    if corpus is None:
+        return
 
     if feature_system_path is not None:
         feature_matrix = load_binary(feature_system_path)
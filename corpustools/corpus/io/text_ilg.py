@@ -1,6 +1,7 @@
 
 import os
 import re
+from functools import partial
 from collections import Counter
 
 from corpustools.corpus.classes import SpontaneousSpeechCorpus
@@ -13,7 +14,7 @@ from corpustools.exceptions import (DelimiterError, ILGError, ILGLinesMismatchEr
 
 from .helper import (compile_digraphs, parse_transcription,
                     DiscourseData, AnnotationType,data_to_discourse,
-                    Annotation, BaseAnnotation)
+                    Annotation, BaseAnnotation, files_to_corpus)
 
 def calculate_lines_per_gloss(lines):
     line_counts = [len(x[1]) for x in lines]
@@ -240,7 +241,7 @@ def load_discourse_ilg(corpus_name, path, annotation_types,
     return discourse
 
 def load_directory_ilg(corpus_name, path, annotation_types,
-                        feature_system_path = None,
+                        feature_system_path = None, num_cores = -1,
                         stop_check = None, call_back = None):
     """
     Loads a directory of interlinear gloss text files
@@ -256,6 +257,9 @@ def load_directory_ilg(corpus_name, path, annotation_types,
         Can be generated through ``inspect_discourse_ilg``.
     feature_system_path : str, optional
         File path of FeatureMatrix binary to specify segments
+    num_cores : int, optional
+        Number of processes to parse files with, -1 (default) parses
+        them in the current process
     stop_check : callable or None
         Optional function to check whether to gracefully terminate early
     call_back : callable or None
@@ -275,24 +279,14 @@ def load_directory_ilg(corpus_name, path, annotation_types,
             if not filename.lower().endswith('.txt'):
                 continue
             file_tuples.append((root, filename))
-    if call_back is not None:
-        call_back('Parsing files...')
-        call_back(0,len(file_tuples))
-        cur = 0
+    jobs = [(os.path.splitext(filename)[0], (os.path.join(root, filename),))
+                for root, filename in file_tuples]
     corpus = SpontaneousSpeechCorpus(corpus_name, path)
-    for i, t in enumerate(file_tuples):
-        if stop_check is not None and stop_check():
-            return
-        if call_back is not None:
-            call_back('Parsing file {} of {}...'.format(i+1,len(file_tuples)))
-            call_back(i)
-        root, filename = t
-        name = os.path.splitext(filename)[0]
-        d = load_discourse_ilg(name, os.path.join(root,filename),
-                                    annotation_types, corpus.lexicon,
-                                    None,
-                                    stop_check, call_back)
-        corpus.add_discourse(d)
+    to_data = partial(ilg_to_data, annotation_types = annotation_types)
+    corpus = files_to_corpus(corpus, jobs, to_data, num_cores = num_cores,
+                            stop_check = stop_check, call_back = call_back)
+    if corpus is None:
+        return
 
     if feature_system_path is not None:
         feature_matrix = load_binary(feature_system_path)
@@ -1,4 +1,5 @@
 import os
+from functools import partial
 
 from corpustools.corpus.classes import SpontaneousSpeechCorpus, Corpus, Word, Discourse, WordToken
 
@@ -6,7 +7,8 @@ from corpustools.exceptions import DelimiterError, PCTOSError
 from .binary import load_binary
 
 from .helper import (DiscourseData, Annotation, BaseAnnotation,
-                        data_to_discourse, AnnotationType, text_to_lines)
+                        data_to_discourse, AnnotationType, text_to_lines,
+                        files_to_corpus)
 
 def inspect_discourse_spelling(path, support_corpus_path = None):
     """
@@ -107,6 +109,7 @@ def spelling_text_to_data(path, annotation_types = None,
 
 def load_directory_spelling(corpus_name, path, annotation_types = None,
                             support_corpus_path = None, ignore_case = False,
+                            num_cores = -1,
                             stop_check = None, call_back = None):
     """
     Loads a directory of orthographic texts
@@ -123,6 +126,9 @@ def load_directory_spelling(corpus_name, path, annotation_types = None,
         File path of corpus binary to load transcriptions from
     ignore_case : bool, optional
         Specifies whether lookups in the support corpus should ignore case
+    num_cores : int, optional
+        Number of processes to parse files with, -1 (default) parses
+        them in the current process
     stop_check : callable, optional
         Optional function to check whether to gracefully terminate early
     call_back : callable, optional
@@ -142,26 +148,14 @@ def load_directory_spelling(corpus_name, path, annotation_types = None,
             if not filename.lower().endswith('.txt'):
                 continue
             file_tuples.append((root, filename))
-
-    if call_back is not None:
-        call_back('Parsing files...')
-        call_back(0,len(file_tuples))
-        cur = 0
+    jobs = [(os.path.splitext(filename)[0], (os.path.join(root, filename),))
+                for root, filename in file_tuples]
     corpus = SpontaneousSpeechCorpus(corpus_name, path)
-    for i, t in enumerate(file_tuples):
-        if stop_check is not None and stop_check():
-            return
-        if call_back is not None:
-            call_back('Parsing file {} of {}...'.format(i+1, len(file_tuples)))
-            call_back(i)
-        root, filename = t
-        name = os.path.splitext(filename)[0]
-        d = load_discourse_spelling(name, os.path.join(root,filename),
-                                    annotation_types, corpus.lexicon,
-                                    support_corpus_path, ignore_case,
-                                    stop_check, call_back)
-        corpus.add_discourse(d)
-    return corpus
+    to_data = partial(spelling_text_to_data, annotation_types = annotation_types,
+                        support_corpus_path = support_corpus_path,
+                        ignore_case = ignore_case)
+    return files_to_corpus(corpus, jobs, to_data, num_cores = num_cores,
+                            stop_check = stop_check, call_back = call_back)
 
 def load_discourse_spelling(corpus_name, path, annotation_types = None,
                             lexicon = None,
@@ -1,5 +1,6 @@
 import os
 import re
+from functools import partial
 
 from corpustools.corpus.classes import SpontaneousSpeechCorpus, Corpus, Word, Discourse, WordToken, Attribute
 
@@ -7,7 +8,7 @@ from corpustools.exceptions import DelimiterError, PCTOSError
 
 from .helper import (compile_digraphs, parse_transcription, DiscourseData,
                     data_to_discourse, AnnotationType, text_to_lines,
-                    Annotation, BaseAnnotation)
+                    Annotation, BaseAnnotation, files_to_corpus)
 
 from .binary import load_binary
 
@@ -124,7 +125,7 @@ def transcription_text_to_data(path, annotation_types = None,
     return data
 
 def load_directory_transcription(corpus_name, path, annotation_types = None,
-                                feature_system_path = None,
+                                feature_system_path = None, num_cores = -1,
                                 stop_check = None, call_back = None):
     """
     Loads a directory of transcribed texts.
@@ -139,6 +140,9 @@ def load_directory_transcription(corpus_name, path, annotation_types = None,
         List of AnnotationType specifying how to parse text files
     feature_system_path : str, optional
         File path of FeatureMatrix binary to specify segments
+    num_cores : int, optional
+        Number of processes to parse files with, -1 (default) parses
+        them in the current process
     stop_check : callable, optional
         Optional function to check whether to gracefully terminate early
     call_back : callable, optional
@@ -158,26 +162,13 @@ def load_directory_transcription(corpus_name, path, annotation_types = None,
             if not filename.lower().endswith('.txt'):
                 continue
             file_tuples.append((root, filename))
-
-    if call_back is not None:
-        call_back('Parsing files...')
-        call_back(0,len(file_tuples))
-        cur = 0
+    jobs = [(os.path.splitext(filename)[0], (os.path.join(root, filename),))
+                for root, filename in file_tuples]
     corpus = SpontaneousSpeechCorpus(corpus_name, path)
-    for i, t in enumerate(file_tuples):
-        if stop_check is not None and stop_check():
-            return
-        if call_back is not None:
-            call_back('Parsing file {} of {}...'.format(i+1,len(file_tuples)))
-            call_back(i)
-        root, filename = t
-        name = os.path.splitext(filename)[0]
-        d = load_discourse_transcription(name, os.path.join(root,filename),
-                                    annotation_types,
-                                    corpus.lexicon, None,
-                                    stop_check, call_back)
-        corpus.add_discourse(d)
-    return corpus
+    to_data = partial(transcription_text_to_data,
+                        annotation_types = annotation_types)
+    return files_to_corpus(corpus, jobs, to_data, num_cores = num_cores,
+                            stop_check = stop_check, call_back = call_back)
 
 
 def load_discourse_transcription(corpus_name, path, annotation_types = None,
@@ -1,6 +1,8 @@
 import os
 import string
 import re
+from bisect import bisect_left
+from functools import partial
 
 from textgrid import TextGrid, IntervalTier
 from textgrid.textgrid import readFile, Interval, Point, PointTier, _getMark
@@ -12,7 +14,7 @@ from corpustools.corpus.io.binary import load_binary
 
 from .helper import (compile_digraphs, parse_transcription, DiscourseData,
                     AnnotationType,data_to_discourse, find_wav_path,
-                    Annotation, BaseAnnotation)
+                    Annotation, BaseAnnotation, files_to_corpus)
 
 class PCTTextGrid(TextGrid):
     def read(self, f):
@@ -160,6 +162,53 @@ def guess_tiers(tg):
 
     return spelling_tiers, segment_tiers, attribute_tiers
 
+def _tier_lookup(tier):
+    max_times = [x.maxTime for x in tier]
+    def lookup(time):
+        i = bisect_left(max_times, time)
+        if i == len(max_times) or tier[i].minTime > time:
+            return None
+        return tier[i]
+    return lookup
+
+def _align_tier(tier, cursor, si, annotation_type):
+    """
+    Get the annotations of a tier overlapping an interval, starting from
+    a cursor into the tier that is advanced past the intervals that end
+    before the interval begins
+    """
+    while cursor < len(tier) and tier[cursor].maxTime <= si.minTime:
+        cursor += 1
+    tier_elements = list()
+    for i in range(cursor, len(tier)):
+        ti = tier[i]
+        if ti.minTime >= si.maxTime:
+            break
+        #if not ti.mark:
+        #    continue
+
+        phoneBegin = ti.minTime
+        phoneEnd = ti.maxTime
+
+        if phoneBegin < si.minTime:
+            phoneBegin = si.minTime
+        if phoneEnd > si.maxTime:
+            phoneEnd = si.maxTime
+        if annotation_type.delimited:
+            parsed = parse_transcription(ti.mark, annotation_type)
+            if len(parsed) > 0:
+                parsed[0].begin = phoneBegin
+                parsed[-1].end = phoneEnd
+                tier_elements.extend(parsed)
+        else:
+            if ti.mark == '':
+                ti.mark = '#'
+            a = parse_transcription(ti.mark, annotation_type)[0]
+            a.begin = phoneBegin
+            a.end = phoneEnd
+            tier_elements.append(a)
+    return cursor, tier_elements
+
 def textgrid_to_data(path, annotation_types, stop_check = None,
                             call_back = None):
     tg = load_textgrid(path)
@@ -168,62 +217,34 @@ def textgrid_to_data(path, annotation_types, stop_check = None,
     for a in annotation_types:
         a.reset()
     data = DiscourseData(name, annotation_types)
+    base_levels = data.base_levels
+    attribute_types = [at for at in annotation_types
+                        if not (at.ignored or at.base or at.anchor)]
+    lookups = {at.name: _tier_lookup(tg.getFirst(at.name))
+                for at in attribute_types}
     for word_name in data.word_levels:
         spelling_tier = tg.getFirst(word_name)
+        bases = [n for n in base_levels
+                    if data[word_name].speaker == data[n].speaker
+                        or data[n].speaker is None]
+        tiers = {n: tg.getFirst(n) for n in bases}
+        cursors = {n: 0 for n in bases}
 
         for si in spelling_tier:
             annotations = dict()
             word = Annotation(si.mark)
-            for n in data.base_levels:
-                if data[word_name].speaker != data[n].speaker \
-                            and data[n].speaker is not None:
-                    continue
-                t = tg.getFirst(n)
-                tier_elements = list()
-                for ti in t:
-                    if ti.maxTime <= si.minTime:
-                        continue
-                    if ti.minTime >= si.maxTime:
-                        break
-                    #if not ti.mark:
-                    #    continue
-
-                    phoneBegin = ti.minTime
-                    phoneEnd = ti.maxTime
-
-                    if phoneBegin < si.minTime:
-                        phoneBegin = si.minTime
-                    if phoneEnd > si.maxTime:
-                        phoneEnd = si.maxTime
-                    if data[n].delimited:
-                        parsed = parse_transcription(ti.mark, data[n])
-                        if len(parsed) > 0:
-                            parsed[0].begin = phoneBegin
-                            parsed[-1].end = phoneEnd
-                            tier_elements.extend(parsed)
-                    else:
-                        if ti.mark == '':
-                            ti.mark = '#'
-                        a = parse_transcription(ti.mark, data[n])[0]
-                        a.begin = phoneBegin
-                        a.end = phoneEnd
-                        tier_elements.append(a)
+            for n in bases:
+                cursors[n], tier_elements = _align_tier(tiers[n], cursors[n],
+                                                        si, data[n])
                 level_count = data.level_length(n)
                 word.references.append(n)
                 word.begins.append(level_count)
                 word.ends.append(level_count + len(tier_elements))
                 annotations[n] = tier_elements
 
-            mid_point = si.minTime + (si.maxTime - si.minTime)
-            for at in annotation_types:
-                if at.ignored:
-                    continue
-                if at.base:
-                    continue
-                if at.anchor:
-                    continue
-                t = tg.getFirst(at.name)
-                ti = t.intervalContaining(mid_point)
+            mid_point = si.minTime + (si.maxTime - si.minTime) / 2
+            for at in attribute_types:
+                ti = lookups[at.name](mid_point)
 
                 if ti is None:
                     value = None
@@ -231,8 +252,6 @@ def textgrid_to_data(path, annotation_types, stop_check = None,
                     value = ti.mark
                     if at.delimited:
                         value = parse_transcription(ti.mark, at)
-                    elif at.ignored:
-                        value = ''.join(x for x in value if x not in at.ignored)
                 if at.token:
                     word.token[at.name] = value
                 else:
@@ -284,7 +303,7 @@ def load_discourse_textgrid(corpus_name, path, annotation_types,
     return discourse
 
 def load_directory_textgrid(corpus_name, path, annotation_types,
-                            feature_system_path = None,
+                            feature_system_path = None, num_cores = -1,
                             stop_check = None, call_back = None):
     """
     Loads a directory of TextGrid files
@@ -300,6 +319,9 @@ def load_directory_textgrid(corpus_name, path, annotation_types,
         Can be generated through ``inspect_discourse_textgrid``.
     feature_system_path : str, optional
         File path of FeatureMatrix binary to specify segments
+    num_cores : int, optional
+        Number of processes to parse files with, -1 (default) parses
+        them in the current process
     stop_check : callable or None
         Optional function to check whether to gracefully terminate early
     call_back : callable or None
@@ -321,24 +343,15 @@ def load_directory_textgrid(corpus_name, path, annotation_types,
             if not filename.lower().endswith('.textgrid'):
                 continue
             file_tuples.append((root, filename))
-    if call_back is not None:
-        call_back('Parsing files...')
-        call_back(0,len(file_tuples))
-        cur = 0
+    jobs = [(os.path.splitext(filename)[0], (os.path.join(root, filename),))
+                for root, filename in file_tuples]
     corpus = SpontaneousSpeechCorpus(corpus_name, path)
-    for i, t in enumerate(file_tuples):
-        if stop_check is not None and stop_check():
-            return
-        if call_back is not None:
-            call_back('Parsing file {} of {}...'.format(i+1, len(file_tuples)))
-            call_back(i)
-        root, filename = t
-        name = os.path.splitext(filename)[0]
-        d = load_discourse_textgrid(name, os.path.join(root,filename),
-                                    annotation_types, corpus.lexicon,
-                                    None,
-                                    stop_check, call_back)
-        corpus.add_discourse(d)
+    to_data = partial(textgrid_to_data, annotation_types = annotation_types)
+    corpus = files_to_corpus(corpus, jobs, to_data, find_wav = True,
+                            num_cores = num_cores, stop_check = stop_check,
+                            call_back = call_back)
+    if corpus is None:
+        return
 
     if feature_system_path is not None:
         feature_matrix = load_binary(feature_system_path)
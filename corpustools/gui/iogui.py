@@ -775,6 +775,8 @@ class LoadCorpusDialog(PCTDialog):
                     'isDirectory':self.isDirectory,
                     'text_type': self.textType}
         kwargs['annotation_types'] = [x.value() for x in reversed(self.columnFrame.columns)]
+        if self.isDirectory or self.textType == 'csv':
+            kwargs['num_cores'] = self.settings['num_cores']
         if self.textType == 'csv':
             kwargs['delimiter'] = codecs.getdecoder("unicode_escape")(
                                         self.columnDelimiterEdit.text()
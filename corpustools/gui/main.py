@@ -333,6 +333,10 @@ class MainWindow(QMainWindow):
         dialog = PreferencesDialog(self, self.settings)
         if dialog.exec_():
             self.settings = dialog.settings
+            if self.corpusModel is not None:
+                self.corpusModel.resetDisplayCache()
+            if self.textWidget.model() is not None:
+                self.textWidget.model().resetDisplayCache()
 
     @check_for_empty_corpus
     @check_for_transcription
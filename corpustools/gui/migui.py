@@ -2,7 +2,7 @@
 
 from collections import OrderedDict
 
-from corpustools.mutualinfo.mutual_information import pointwise_mi
+from corpustools.mutualinfo.mutual_information import pointwise_mis
 
 from .imports import *
 from .widgets import (BigramWidget, RadioSelectWidget, TierWidget, ContextWidget)
@@ -31,15 +31,13 @@ class MIWorker(FunctionWorker):
             cm = WeightedVariantContext
         with cm(kwargs['corpus'], kwargs['sequence_type'], kwargs['type_token']) as c:
             try:
-                for pair in kwargs['segment_pairs']:
-                    res = pointwise_mi(c, pair,
-                            halve_edges = kwargs['halve_edges'],
-                            in_word = kwargs['in_word'],
-                            stop_check = kwargs['stop_check'],
-                            call_back = kwargs['call_back'])
-                    if self.stopped:
-                        break
-                    self.results.append(res)
+                res = pointwise_mis(c, kwargs['segment_pairs'],
+                        halve_edges = kwargs['halve_edges'],
+                        in_word = kwargs['in_word'],
+                        stop_check = kwargs['stop_check'],
+                        call_back = kwargs['call_back'])
+                if res is not None:
+                    self.results = res
             except PCTError as e:
                 self.errorEncountered.emit(e)
                 return
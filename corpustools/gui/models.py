@@ -1,5 +1,6 @@
 import os
-from collections import Counter, defaultdict
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict, OrderedDict
 
 from .imports import *
 
@@ -84,6 +85,9 @@ class BaseCorpusTableModel(BaseTableModel):
     rows = []
     allData = []
 
+    #: Maximum number of formatted cells kept for display
+    displayCacheSize = 10000
+
     def __init__(self, corpus, settings, parent = None):
         BaseTableModel.__init__(self, settings, parent)
         self.corpus = corpus
@@ -93,26 +97,247 @@ class BaseCorpusTableModel(BaseTableModel):
         self.rows = self.corpus.words
 
         self.allData = self.rows
+        self.resetCaches()
+
+    def resetCaches(self):
+        """
+        Clear the cached sort keys and display strings, for use when the
+        values of a column change for many rows at once
+        """
+        self.sortColumn = None
+        self.sortOrder = Qt.AscendingOrder
+        self._sortValues = {}
+        self._coerced = set()
+        self.resetDisplayCache()
+        self.invalidateSearch()
+
+    def invalidateSearch(self):
+        """
+        Clear the search index, for use when rows are added, removed or
+        reordered
+        """
+        self._searchIndex = None
+
+    def searchIndex(self):
+        """
+        Get the search index of the model, building it if necessary
+
+        The index is the lowercased text of the spelling, tier and factor
+        columns of every row, concatenated in row order, along with the
+        offset of each row in the text, so that searching for a substring
+        is a single string search rather than a scan over every cell.
+
+        Returns
+        -------
+        str
+            Text of all rows
+        list of int
+            Offset of each row in the text
+        """
+        if self._searchIndex is None:
+            names = [c.name for c in self.columns
+                        if c.att_type in ('spelling', 'tier', 'factor')]
+            offsets = []
+            texts = []
+            pos = 0
+            for key in self.rows:
+                item = self.corpus[key]
+                text = '\t'.join(str(getattr(item, n)) for n in names).lower() + '\n'
+                offsets.append(pos)
+                texts.append(text)
+                pos += len(text)
+            self._searchIndex = (''.join(texts), offsets)
+        return self._searchIndex
+
+    def search(self, text, start = 0):
+        """
+        Find the first row at or after a given row that contains some
+        text in its spelling, tier or factor columns, wrapping around to
+        the beginning if there is no such row after it
+
+        Parameters
+        ----------
+        text : str
+            Text to search for, ignoring case
+        start : int, optional
+            Row to begin searching from
+
+        Returns
+        -------
+        int or None
+            Matching row, or None if no row matches
+        """
+        text = text.lower()
+        if not text or '\t' in text or '\n' in text:
+            return None
+        index, offsets = self.searchIndex()
+        if not offsets:
+            return None
+        if start >= len(offsets):
+            start = 0
+        pos = index.find(text, offsets[start])
+        if pos == -1:
+            pos = index.find(text)
+        if pos == -1:
+            return None
+        return bisect_right(offsets, pos) - 1
+
+    def resetDisplayCache(self):
+        """
+        Clear the cached display strings, for use when display settings
+        change
+        """
+        self._display = OrderedDict()
+
+    def invalidateColumn(self, name):
+        """
+        Remove the cached sort keys and display strings for a column,
+        resorting the rows if they were sorted by it
+
+        Parameters
+        ----------
+        name : str
+            Name of the column's Attribute
+        """
+        self._sortValues.pop(name, None)
+        self._coerced.discard(name)
+        self.resetDisplayCache()
+        self.invalidateSearch()
+        if name != self.sortColumn:
+            return
+        for i, c in enumerate(self.columns):
+            if c.name == name:
+                self.sort(i, self.sortOrder)
+                return
+        self.layoutAboutToBeChanged.emit()
+        self.sortColumn = None
+        self.sortOrder = Qt.AscendingOrder
+        self.allData = sorted(self.allData)
+        self.rows = self.filterRows(self.allData)
+        self.invalidateSearch()
+        self.layoutChanged.emit()
+
+    def invalidateRow(self, key):
+        """
+        Remove the cached sort keys and display strings for a row
+
+        Parameters
+        ----------
+        key : str or float
+            Key of the row in the corpus
+        """
+        for values in self._sortValues.values():
+            values.pop(key, None)
+        for c in self.columns:
+            self._display.pop((key, c.name), None)
+        self.invalidateSearch()
+
+    def sortValues(self, name):
+        """
+        Get the values of a column to sort rows by, computing them for
+        rows that don't have them yet
+        """
+        values = self._sortValues.get(name)
+        if values is None:
+            values = {x: getattr(self.corpus[x], name) for x in self.allData}
+            self._sortValues[name] = values
+            if name in self._coerced:
+                self.coerceValues(name)
+        elif len(values) < len(self.allData):
+            for x in self.allData:
+                if x not in values:
+                    self.sortValue(name, x)
+        return values
+
+    def sortValue(self, name, key):
+        values = self._sortValues[name]
+        try:
+            return values[key]
+        except KeyError:
+            value = getattr(self.corpus[key], name)
+            if name in self._coerced:
+                value = self.coerce_to_float(value)
+            values[key] = value
+            return value
+
+    def coerceValues(self, name):
+        self._coerced.add(name)
+        values = self._sortValues[name]
+        for k, v in values.items():
+            values[k] = self.coerce_to_float(v)
+
+    def sortKey(self, key):
+        if self.sortColumn is None:
+            return key
+        return (self.sortValue(self.sortColumn, key), key)
+
+    def rowPosition(self, rows, key):
+        """
+        Find the position of a row in a list of rows in the current sort
+        order by binary search
+
+        Parameters
+        ----------
+        rows : list
+            Keys of rows in the current sort order
+        key : str or float
+            Key of the row to find
+
+        Returns
+        -------
+        int
+            Position of the row if it is in ``rows``, otherwise the
+            position to insert it at
+        """
+        target = self.sortKey(key)
+        descending = self.sortOrder == Qt.DescendingOrder
+        lo, hi = 0, len(rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k = self.sortKey(rows[mid])
+            if (k > target) if descending else (k < target):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def findRow(self, rows, key):
+        """
+        Find the position of a row in a list of rows in the current sort
+        order, raising a ValueError if it is not there
+        """
+        row = self.rowPosition(rows, key)
+        if row == len(rows) or rows[row] != key:
+            row = rows.index(key)
+        return row
 
     def sort(self, col, order):
         """sort table by given column number col"""
         self.layoutAboutToBeChanged.emit()
+        name = self.columns[col].name
+        values = self.sortValues(name)
+        self.sortColumn = name
+        self.sortOrder = order
+        #Sorting by key and then stably by value orders rows by
+        #(value, key) without building a tuple per row
+        reverse = order == Qt.DescendingOrder
+        rows = sorted(self.allData, reverse = reverse)
         try:
-            self.rows = sorted(self.rows,
-                    key=lambda x: getattr(self.corpus[x],
-                                        self.columns[col].name))
+            self.allData = sorted(rows, key = values.__getitem__, reverse = reverse)
         except TypeError:
-            self.rows = sorted(self.rows,
-                    key=lambda x: getattr(self.corpus[x],
-                                self.coerce_to_float(self.columns[col].name)))
-        if order == Qt.DescendingOrder:
-            self.rows.reverse()
+            self.coerceValues(name)
+            self.allData = sorted(rows, key = values.__getitem__, reverse = reverse)
+        self.rows = self.filterRows(self.allData)
+        self.invalidateSearch()
         self.layoutChanged.emit()
 
+    def filterRows(self, rows):
+        return rows
+
     def coerce_to_float(self, val):
         try:
             return float(val)
-        except ValueError:
+        except (TypeError, ValueError):
             return 0.0
 
     def data(self, index, role=None):
@@ -120,14 +345,22 @@ class BaseCorpusTableModel(BaseTableModel):
             return None
         elif role != Qt.DisplayRole:
             return None
-        row = index.row()
-        col = index.column()
-        data = getattr(self.corpus[self.rows[row]],self.columns[col].name)
+        key = (self.rows[index.row()], self.columns[index.column()].name)
+        try:
+            data = self._display[key]
+            self._display.move_to_end(key)
+            return data
+        except KeyError:
+            pass
+        data = getattr(self.corpus[key[0]], key[1])
 
         if isinstance(data,float):
             data = str(round(data,self.settings['sigfigs']))
         elif not isinstance(data,str):
             data = str(data)
+        self._display[key] = data
+        if len(self._display) > self.displayCacheSize:
+            self._display.popitem(last = False)
         return data
 
     def headerData(self, col, orientation, role):
@@ -298,6 +531,8 @@ class DiscourseModel(BaseCorpusTableModel):
         self.corpus = discourse
         self.columns = self.corpus.attributes
         self.rows = self.corpus.keys()
+        self.allData = self.rows
+        self.resetCaches()
         #self.posToTime = []
         #self.timeToPos = {}
         #for w in self.discourse:
@@ -313,7 +548,12 @@ class DiscourseModel(BaseCorpusTableModel):
         return [self.rows[x] for x in rows]
 
     def timesToRows(self, times):
-        return [i for i,x in enumerate(self.rows) if x in times]
+        rows = []
+        for t in sorted(set(times)):
+            i = bisect_left(self.rows, t)
+            if i < len(self.rows) and self.rows[i] == t:
+                rows.append(i)
+        return rows
 
     def hasAudio(self):
         return self.corpus.has_audio
@@ -333,23 +573,66 @@ class CorpusModel(BaseCorpusTableModel):
     def hideNonLexical(self, b):
         self.nonLexHidden = b
         self.layoutAboutToBeChanged.emit()
-        self.rows = self.allData
-        if b:
-            self.rows = [x for x in self.rows if str(self.corpus[x].transcription) != '']
+        self.rows = self.filterRows(self.allData)
+        self.invalidateSearch()
         self.layoutChanged.emit()
 
+    def filterRows(self, rows):
+        if not self.nonLexHidden:
+            return rows
+        return [x for x in rows if self.isLexical(x)]
+
+    def isLexical(self, key):
+        return str(self.corpus[key].transcription) != ''
+
     def wordObject(self,row):
         return self.corpus[self.rows[row]]
 
+    def wordRow(self, word):
+        """
+        Find the row of a Word in the table
+
+        Parameters
+        ----------
+        word : Word
+            Word to find
+
+        Returns
+        -------
+        int or None
+            Row of the Word, or None if it is not shown
+        """
+        key = self.corpus.key(word)
+        if key is None:
+            return None
+        try:
+            return self.findRow(self.rows, key)
+        except ValueError:
+            return None
+
     def headerData(self, col, orientation, role):
         if orientation == Qt.Horizontal and role == Qt.DisplayRole:
             return self.columns[col].display_name
         return None
 
     def addWord(self, word):
-        self.beginInsertRows(QModelIndex(),self.rowCount(),self.rowCount())
         self.corpus.add_word(word)
-        self.rows = self.corpus.words
+        key = self.corpus.key(word)
+        if key is None:
+            return
+        self.invalidateRow(key)
+        ind = self.rowPosition(self.allData, key)
+        if self.rows is self.allData:
+            row = ind
+        elif self.isLexical(key):
+            row = self.rowPosition(self.rows, key)
+        else:
+            self.allData.insert(ind, key)
+            return
+        self.beginInsertRows(QModelIndex(),row,row)
+        self.allData.insert(ind, key)
+        if self.rows is not self.allData:
+            self.rows.insert(row, key)
         self.endInsertRows()
 
     def replaceWord(self, row, word):
@@ -357,11 +640,23 @@ class CorpusModel(BaseCorpusTableModel):
         self.addWord(word)
 
     def removeWord(self, word_key):
-        row = self.rows.index(word_key)
-        self.beginRemoveRows(QModelIndex(),row,row)
+        ind = self.findRow(self.allData, word_key)
+        if self.rows is self.allData:
+            row = ind
+        else:
+            try:
+                row = self.findRow(self.rows, word_key)
+            except ValueError:
+                row = None
+        if row is not None:
+            self.beginRemoveRows(QModelIndex(),row,row)
+            if self.rows is not self.allData:
+                del self.rows[row]
+        del self.allData[ind]
+        self.invalidateRow(word_key)
         self.corpus.remove_word(word_key)
-        self.rows = self.corpus.words
-        self.endRemoveRows()
+        if row is not None:
+            self.endRemoveRows()
 
     def addTier(self,attribute, segList):
         if attribute not in self.columns:
@@ -371,6 +666,7 @@ class CorpusModel(BaseCorpusTableModel):
             end = False
         self.corpus.add_tier(attribute, segList)
         self.columns = [x for x in self.corpus.attributes]
+        self.invalidateColumn(attribute.name)
         if end:
             self.endInsertColumns()
 
@@ -382,15 +678,18 @@ class CorpusModel(BaseCorpusTableModel):
             end = False
         return end
 
-    def endAddColumn(self, end = False):
+    def endAddColumn(self, end = False, attribute = None):
         self.columns = [x for x in self.corpus.attributes]
+        if attribute is not None:
+            self.invalidateColumn(attribute.name)
+            self.corpus.invalidate_attribute_indexes(attribute.name)
         if end:
             self.endInsertColumns()
 
     def addColumn(self, attribute):
         end = self.beginAddColumn(attribute)
         self.corpus.add_attribute(attribute,initialize_defaults=True)
-        self.endAddColumn(end)
+        self.endAddColumn(end, attribute)
 
     def addCountColumn(self, attribute, sequenceType, segList):
         if attribute not in self.columns:
@@ -400,6 +699,7 @@ class CorpusModel(BaseCorpusTableModel):
             end = False
         self.corpus.add_count_attribute(attribute, sequenceType, segList)
         self.columns = [x for x in self.corpus.attributes]
+        self.invalidateColumn(attribute.name)
         if end:
             self.endInsertColumns()
 
@@ -412,6 +712,7 @@ class CorpusModel(BaseCorpusTableModel):
             end = False
         self.corpus.add_abstract_tier(attribute, segList)
         self.columns = [x for x in self.corpus.attributes]
+        self.invalidateColumn(attribute.name)
         if end:
             self.endInsertColumns()
 
@@ -427,6 +728,7 @@ class CorpusModel(BaseCorpusTableModel):
             self.beginRemoveColumns(QModelIndex(),ind,ind)
             self.corpus.remove_attribute(att)
             self.columns = [x for x in self.corpus.attributes]
+            self.invalidateColumn(att.name)
             self.endRemoveColumns()
 
 class SegmentPairModel(BaseTableModel):
@@ -71,7 +71,7 @@ class NDWorker(FunctionWorker):
                                                 num_cores = kwargs['num_cores'],
                                                 stop_check = kwargs['stop_check'],
                                                 call_back = kwargs['call_back'])
-                    end = kwargs['corpusModel'].endAddColumn(end)
+                    end = kwargs['corpusModel'].endAddColumn(end, att)
             except PCTError as e:
                 self.errorEncountered.emit(e)
                 return
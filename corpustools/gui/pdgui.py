@@ -7,7 +7,7 @@ from .widgets import (EnvironmentSelectWidget,
 from .windows import FunctionWorker, FunctionDialog
 import itertools
 
-from corpustools.prod.pred_of_dist import (calc_prod, calc_prod_all_envs)
+from corpustools.prod.pred_of_dist import (calc_prod_multiple, calc_prod_all_envs)
 
 from corpustools.exceptions import PCTError, PCTPythonError
 
@@ -33,24 +33,24 @@ class PDWorker(FunctionWorker):
         with cm(kwargs['corpus'], kwargs['sequence_type'], kwargs['type_token']) as c:
             try:
                 envs = kwargs.pop('envs', None)
-                for pair in kwargs['segment_pairs']:
-                    if envs is not None:
-                        for env in envs:
-                            env.middle = set(pair)
-                        res = calc_prod(c,
-                                envs,
-                                kwargs['strict'],
-                                all_info = True,
-                                stop_check = kwargs['stop_check'],
-                                call_back = kwargs['call_back'])
-                    else:
+                if envs is not None:
+                    res = calc_prod_multiple(c,
+                            [(pair, envs) for pair in kwargs['segment_pairs']],
+                            kwargs['strict'],
+                            all_info = True,
+                            stop_check = kwargs['stop_check'],
+                            call_back = kwargs['call_back'])
+                    if res is not None:
+                        self.results = res
+                else:
+                    for pair in kwargs['segment_pairs']:
                         res = calc_prod_all_envs(c, pair[0], pair[1],
                             all_info = True,
                             stop_check = kwargs['stop_check'],
                             call_back = kwargs['call_back'])
-                    if self.stopped:
-                        break
-                    self.results.append(res)
+                        if self.stopped:
+                            break
+                        self.results.append(res)
             except PCTError as e:
                 self.errorEncountered.emit(e)
                 return
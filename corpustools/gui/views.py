@@ -125,35 +125,24 @@ class LexiconView(QWidget):
             row = curSelection[-1].row() + 1
         else:
             row = 0
-        start = model.index(row,0)
-        matches = model.match(start, Qt.DisplayRole, text, 1, Qt.MatchContains)
-        if matches:
-            index = matches[0]
-            self.table.selectionModel().select(index,
-                    QItemSelectionModel.SelectCurrent|QItemSelectionModel.Rows)
-            self.table.scrollTo(index,QAbstractItemView.PositionAtCenter)
-        else:
-            start = model.index(0,0)
-            matches = model.match(start, Qt.DisplayRole, text, 1, Qt.MatchContains)
-            if matches:
-                index = matches[0]
-                self.table.selectionModel().select(index,
-                    QItemSelectionModel.SelectCurrent|QItemSelectionModel.Rows)
-                self.table.scrollTo(index,QAbstractItemView.PositionAtCenter)
-            else:
-                self.table.selectionModel().clear()
+        row = model.search(text, row)
+        if row is None:
+            self.table.selectionModel().clear()
+            return
+        index = model.index(row,0)
+        self.table.selectionModel().select(index,
+                QItemSelectionModel.SelectCurrent|QItemSelectionModel.Rows)
+        self.table.scrollTo(index,QAbstractItemView.PositionAtCenter)
 
     def highlightType(self,wordtype):
         if self.table.model() is None:
             return
         model = self.table.model()
         self.table.selectionModel().clear()
-        for i,r in enumerate(model.rows):
-            if model.corpus[r] == wordtype:
-                index = model.index(i,0)
-                break
-        else:
+        row = model.wordRow(wordtype)
+        if row is None:
             return
+        index = model.index(row,0)
         self.table.selectionModel().select(index,
                     QItemSelectionModel.SelectCurrent|QItemSelectionModel.Rows)
         self.table.scrollTo(index,QAbstractItemView.PositionAtCenter)
@@ -620,23 +609,14 @@ class DiscourseView(QWidget):
             row = curSelection[-1].row() + 1
         else:
             row = 0
-        start = model.index(row,0)
-        matches = model.match(start, Qt.DisplayRole, text, 1, Qt.MatchContains)
-        if matches:
-            index = matches[0]
-            curview.selectionModel().select(index,
-                    QItemSelectionModel.SelectCurrent|QItemSelectionModel.Rows)
-            curview.scrollTo(index,QAbstractItemView.PositionAtCenter)
-        else:
-            start = model.index(0,0)
-            matches = model.match(start, Qt.DisplayRole, text, 1, Qt.MatchContains)
-            if matches:
-                index = matches[0]
-                curview.selectionModel().select(index,
-                    QItemSelectionModel.SelectCurrent|QItemSelectionModel.Rows)
-                curview.scrollTo(index,QAbstractItemView.PositionAtCenter)
-            else:
-                curview.selectionModel().clear()
+        row = model.search(text, row)
+        if row is None:
+            curview.selectionModel().clear()
+            return
+        index = model.index(row,0)
+        curview.selectionModel().select(index,
+                QItemSelectionModel.SelectCurrent|QItemSelectionModel.Rows)
+        curview.scrollTo(index,QAbstractItemView.PositionAtCenter)
 
     def findType(self, index):
         curview = self.table
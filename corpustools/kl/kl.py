@@ -5,8 +5,12 @@ from collections import defaultdict
 import os
 from codecs import open
 
+import numpy as np
+
 from corpustools.exceptions import KLError
 
+SIDES = ('right', 'left', 'both')
+
 class Context(object):
 
     def __init__(self):
@@ -164,3 +168,212 @@ def check_spurious(ur, sr, corpus_context):
             return 'Yes' #something else is more similar
 
     return 'Maybe' #nothing else is more similar
+
+
+def context_counts(corpus_context, stop_check = None, call_back = None):
+    """
+    Count the frequency of every segment in every context, for all
+    three context types, in a single pass over the corpus.
+
+    Contexts are defined the same way as in ``KullbackLeibler``.
+
+    Parameters
+    ----------
+    corpus_context : CorpusContext
+        Context manager for a corpus
+    stop_check : callable or None
+        Optional function to check whether to gracefully terminate early
+    call_back : callable or None
+        Optional function to supply progress information during the function
+
+    Returns
+    -------
+    list
+        Segment symbols, in the row order of the count matrices
+    dict
+        Keys are 'right', 'left' and 'both', values are tuples of a list
+        of contexts and a segment by context array of frequencies
+    """
+    seg_index = {}
+    ctx_index = {s: {} for s in SIDES}
+    cells = {s: defaultdict(float) for s in SIDES}
+
+    if call_back is not None:
+        call_back('Counting contexts...')
+        call_back(0, len(corpus_context))
+        cur = 0
+    for word in corpus_context:
+        if stop_check is not None and stop_check():
+            return
+        if call_back is not None:
+            cur += 1
+            if cur % 100 == 0:
+                call_back(cur)
+        tier = getattr(word, corpus_context.sequence_type)
+        symbols = tier.with_word_boundaries()
+        for pos in range(1, len(symbols)-1):
+            seg = symbols[pos]
+            try:
+                row = seg_index[seg]
+            except KeyError:
+                row = seg_index[seg] = len(seg_index)
+            both = (symbols[pos-1],symbols[pos+1])
+            for side, thisc in zip(SIDES, (both[0], both[1], both)):
+                index = ctx_index[side]
+                try:
+                    col = index[thisc]
+                except KeyError:
+                    col = index[thisc] = len(index)
+                cells[side][row, col] += word.frequency
+
+    segments = sorted(seg_index, key = lambda x: seg_index[x])
+    counts = {}
+    for side in SIDES:
+        index = ctx_index[side]
+        matrix = np.zeros((len(segments), len(index)))
+        if cells[side]:
+            rows, cols = zip(*cells[side].keys())
+            matrix[rows, cols] = list(cells[side].values())
+        contexts = sorted(index, key = lambda x: index[x])
+        counts[side] = (contexts, matrix)
+    return segments, counts
+
+
+def kl_matrix(counts):
+    """
+    Calculate the entropy of every segment and the KL divergence of every
+    pair of segments from a segment by context count matrix.
+
+    The smoothing and entropy calculations are the same as in
+    ``KullbackLeibler``.
+
+    Parameters
+    ----------
+    counts : array
+        Segment by context array of frequencies
+
+    Returns
+    -------
+    array
+        Entropy of each segment
+    array
+        Symmetric segment by segment array of KL divergences
+    """
+    totalC = counts.shape[1]
+    P = (counts + 1) / (counts.sum(axis = 1) + totalC)[:, np.newaxis]
+    logP = np.log(P)
+    entropies = (P * (logP + log(totalC))).sum(axis = 1)
+    cross = P.dot(logP.T)
+    self_info = np.diag(cross)
+    divergences = self_info[:, np.newaxis] + self_info[np.newaxis, :] - cross - cross.T
+    return entropies, divergences
+
+
+def _feature_differences(first, second):
+    """
+    Vectorized version of the feature difference used by ``check_spurious``,
+    which compares the sorted feature values of two segments.
+    """
+    values = {}
+    def encode(feature_dicts):
+        encoded = [[values.setdefault(v, len(values)) for v in sorted(f.values())]
+                    for f in feature_dicts]
+        width = max([len(x) for x in encoded] + [0])
+        codes = np.full((len(encoded), width), -1)
+        for i, x in enumerate(encoded):
+            codes[i, :len(x)] = x
+        return codes
+    first = encode(first)
+    second = encode(second)
+    width = min(first.shape[1], second.shape[1])
+    first = first[:, np.newaxis, :width]
+    second = second[np.newaxis, :, :width]
+    mismatch = (first != second) & (first != -1) & (second != -1)
+    return mismatch.sum(axis = 2)
+
+
+def KullbackLeiblerAllPairs(corpus_context, side, segments = None,
+                        stop_check = None, call_back = None):
+    """
+    Calculates KL distances between every pair of segments in some context.
+
+    Context counts for every segment are gathered in a single pass over
+    the corpus, so this is much faster than calling ``KullbackLeibler``
+    for each pair, and gives the same results.
+
+    Parameters
+    ----------
+    corpus_context : CorpusContext
+        Context manager for a corpus
+    side : str
+        One of 'right', 'left' or 'both'
+    segments : list or None
+        Segments to compare, defaults to every segment that occurs
+        in the corpus
+    stop_check : callable or None
+        Optional function to check whether to gracefully terminate early
+    call_back : callable or None
+        Optional function to supply progress information during the function
+
+    Returns
+    -------
+    list of tuples
+        For each pair of segments, a tuple of the first segment, the second
+        segment, the first segment's entropy, the second segment's entropy,
+        the KL divergence, the possible UR and whether it is spurious
+    """
+    if segments is not None:
+        for x in segments:
+            if x not in corpus_context.inventory:
+                raise ValueError('Segment \'{}\' does not exist in this corpus.'.format(x))
+
+    res = context_counts(corpus_context, stop_check, call_back)
+    if res is None:
+        return
+    found, counts = res
+    if side.startswith('r'):
+        contexts, counts = counts['right']
+    elif side.startswith('l'):
+        contexts, counts = counts['left']
+    else:
+        contexts, counts = counts['both']
+
+    if segments is None:
+        segments = sorted(found)
+    else:
+        segments = [str(x) for x in segments]
+        missing = [x for x in segments if x not in found]
+        if missing:
+            found = found + missing
+            counts = np.vstack([counts, np.zeros((len(missing), counts.shape[1]))])
+    rows = [found.index(x) for x in segments]
+    entropies, divergences = kl_matrix(counts[rows, :])
+
+    if call_back is not None:
+        call_back('Checking for spurious allophones...')
+        call_back(0, 0)
+    if corpus_context.specifier is not None:
+        seg_features = [corpus_context.corpus.segment_to_features(x).features
+                        for x in segments]
+        seg_diffs = _feature_differences(seg_features, seg_features)
+        inv_diffs = _feature_differences(seg_features,
+                                [x.features for x in corpus_context.inventory])
+        closest = inv_diffs.min(axis = 1)
+
+    results = []
+    for i in range(len(segments)):
+        for j in range(i + 1, len(segments)):
+            ur, sr = (i, j) if entropies[i] < entropies[j] else (j, i)
+            if corpus_context.specifier is None:
+                is_spurious = 'Maybe'
+            elif seg_diffs[ur, sr] == 1:
+                is_spurious = 'No'
+            elif closest[ur] < seg_diffs[ur, sr]:
+                is_spurious = 'Yes'
+            else:
+                is_spurious = 'Maybe'
+            results.append((segments[i], segments[j],
+                            float(entropies[i]), float(entropies[j]),
+                            float(divergences[i, j]),
+                            segments[ur], is_spurious))
+    return results
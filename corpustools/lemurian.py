@@ -1,6 +1,11 @@
 import random
 import os
 import itertools
+import argparse
+import math
+
+from corpustools.corpus.classes.lexicon import Corpus, Word, AliasTable
+from corpustools.corpus.io.binary import save_binary
 
 #general phonotactics
 #max syllable is C1C2VC3
@@ -199,11 +204,260 @@ def make_corpus(lexicon):
     return corpus
 
 
+#Scalable generation
+#Words are generated by decoding distinct integer codes into syllables, so
+#every type has a unique transcription without keeping track of the types
+#already generated.  Syllabification of the phonotactics above is
+#unambiguous: medial onsets are never empty, and a nasal coda can only be
+#followed by a consonant that is not a glide.  To keep codes distinct after
+#the phonological processes apply, fricative+stop onsets only use voiceless
+#stops (the voiced ones would be devoiced anyway), and words with back
+#harmony start with a back vowel rather than the neutral /a/.
+
+voiceless_stops = ['p','t','k']
+initial_onsets = ([()] + [(c,) for c in cons] +
+                [(c, g) for c in cons for g in glides] +
+                [(f, s) for f in fricatives for s in voiceless_stops] +
+                [(f, n) for f in fricatives for n in nasals])
+medial_onsets = [(c,) for c in cons] + [(c, g) for c in cons for g in glides]
+codas = [()] + [(n,) for n in nasals]
+back_initial_vowels = ['o','u']
+
+front_initial_count = len(initial_onsets) * len(front) * len(codas)
+back_initial_count = len(initial_onsets) * len(back_initial_vowels) * len(codas)
+initial_count = front_initial_count + back_initial_count
+medial_count = len(medial_onsets) * len(front) * len(codas)
+
+default_syllable_weights = [0.25, 0.4, 0.25, 0.1]
+
+def _decode_syllable(index, onsets, vowels):
+    index, coda = divmod(index, len(codas))
+    onset, vowel = divmod(index, len(vowels))
+    return onsets[onset], vowels[vowel], codas[coda]
+
+def decode_word(code, num_syllables):
+    """
+    Convert an integer code into a Lemurian word
+
+    Parameters
+    ----------
+    code : int
+        Code of the word, less than ``num_codes(num_syllables)``
+    num_syllables : int
+        Number of syllables in the word
+
+    Returns
+    -------
+    tuple
+        Spelling of the word and list of segments in its transcription
+    """
+    code, first = divmod(code, initial_count)
+    if first < front_initial_count:
+        harmony = front
+        syllables = [_decode_syllable(first, initial_onsets, front)]
+    else:
+        harmony = back
+        syllables = [_decode_syllable(first - front_initial_count,
+                                    initial_onsets, back_initial_vowels)]
+    for i in range(num_syllables - 1):
+        code, medial = divmod(code, medial_count)
+        syllables.append(_decode_syllable(medial, medial_onsets, harmony))
+
+    segments = []
+    spelling = []
+    for i, (onset, vowel, coda) in enumerate(syllables):
+        if i > 0 and onset == ('s',) and not syllables[i - 1][2]:
+            onset = ('z',)
+        for j, seg in enumerate(onset):
+            segments.append(seg)
+            if j == len(onset) - 1 and (seg, vowel) in [('j','i'), ('w','u')]:
+                continue
+            spelling.append('h' if seg == 'x' else seg)
+        segments.append(vowel)
+        spelling.append(vowel)
+        for seg in coda:
+            segments.append(seg)
+            spelling.append('N')
+    return ''.join(spelling), segments
+
+def num_codes(num_syllables):
+    """
+    Get the number of distinct Lemurian words with a given number of
+    syllables
+    """
+    return initial_count * medial_count ** (num_syllables - 1)
+
+def _affine_permutation(size, rng):
+    #Multiplying by a number coprime to the size and adding an offset
+    #permutes the codes without storing them
+    a = rng.randrange(1, size) if size > 1 else 1
+    while math.gcd(a, size) != 1:
+        a = rng.randrange(1, size)
+    b = rng.randrange(size)
+    return lambda x: (a * x + b) % size
+
+def generate_words(num_types, seed = None, syllable_weights = None,
+                zipf_exponent = 1.0, max_frequency = 100000,
+                homograph_rate = 0.0):
+    """
+    Lazily generate distinct Lemurian words with Zipfian frequencies
+
+    Parameters
+    ----------
+    num_types : int
+        Number of words to generate
+    seed : int, optional
+        Seed for the random number generator
+    syllable_weights : list of float, optional
+        Relative proportions of words with one, two, three, etc.
+        syllables, defaults to 0.25, 0.4, 0.25 and 0.1 for one to
+        four syllables.  When all the words of a length have been
+        generated, longer words are used instead
+    zipf_exponent : float, optional
+        Exponent of the Zipfian distribution of frequencies, defaults to 1
+    max_frequency : int, optional
+        Frequency of the most frequent word, defaults to 100000
+    homograph_rate : float, optional
+        Proportion of words that reuse the spelling of a recently
+        generated word with a different transcription, in addition to
+        the homographs created by the spelling rules, defaults to 0
+
+    Returns
+    -------
+    generator
+        Generator of tuples of spelling, list of segments and frequency
+    """
+    rng = random.Random(seed)
+    if syllable_weights is None:
+        syllable_weights = default_syllable_weights
+    lengths = AliasTable(syllable_weights)
+    permutations = {}
+    counts = {}
+    ranks = _affine_permutation(num_types, rng) if num_types > 0 else None
+    recent = []
+    for i in range(num_types):
+        n = lengths.draw(rng) + 1
+        while counts.get(n, 0) >= num_codes(n):
+            n += 1
+        if n not in permutations:
+            permutations[n] = _affine_permutation(num_codes(n), rng)
+        code = permutations[n](counts.get(n, 0))
+        counts[n] = counts.get(n, 0) + 1
+        spelling, segments = decode_word(code, n)
+        if recent and rng.random() < homograph_rate:
+            spelling = rng.choice(recent)
+        elif len(recent) < 1000:
+            recent.append(spelling)
+        else:
+            recent[rng.randrange(1000)] = spelling
+        rank = ranks(i) + 1
+        frequency = max(1, int(round(max_frequency / rank ** zipf_exponent)))
+        yield spelling, segments, frequency
+
+def generate_corpus(num_types, name = 'lemurian', **kwargs):
+    """
+    Generate a Corpus of Lemurian words
+
+    Parameters
+    ----------
+    num_types : int
+        Number of words in the Corpus
+    name : str, optional
+        Name of the Corpus
+    kwargs
+        Keyword arguments for ``generate_words``
+
+    Returns
+    -------
+    Corpus
+        Generated Corpus
+    """
+    corpus = Corpus(name)
+    chunk = []
+    for spelling, segments, frequency in generate_words(num_types, **kwargs):
+        chunk.append(Word(spelling = spelling, transcription = segments,
+                        frequency = frequency))
+        if len(chunk) >= 100000:
+            corpus.add_words(chunk)
+            chunk = []
+    corpus.add_words(chunk)
+    return corpus
+
+def write_csv(path, num_types, delimiter = ',', trans_delimiter = '.', **kwargs):
+    """
+    Write Lemurian words directly to a column-delimited file that can be
+    loaded with ``load_corpus_csv``
+
+    Parameters
+    ----------
+    path : str
+        Path to write to
+    num_types : int
+        Number of words to write
+    delimiter : str, optional
+        Column delimiter, defaults to ``,``
+    trans_delimiter : str, optional
+        Segment delimiter, defaults to ``.``
+    kwargs
+        Keyword arguments for ``generate_words``
+    """
+    with open(path, mode='w', encoding='utf-8') as f:
+        f.write(delimiter.join(['Transcription','Spelling','Frequency']) + '\n')
+        lines = []
+        for spelling, segments, frequency in generate_words(num_types, **kwargs):
+            lines.append(delimiter.join([trans_delimiter.join(segments),
+                            spelling, str(frequency)]))
+            if len(lines) >= 10000:
+                f.write('\n'.join(lines) + '\n')
+                lines = []
+        if lines:
+            f.write('\n'.join(lines) + '\n')
+
+def write_binary(path, num_types, name = None, **kwargs):
+    """
+    Generate a Corpus of Lemurian words and save it in the binary corpus
+    format
+
+    Parameters
+    ----------
+    path : str
+        Path to write to
+    num_types : int
+        Number of words in the Corpus
+    name : str, optional
+        Name of the Corpus, defaults to the file name
+    kwargs
+        Keyword arguments for ``generate_words``
+    """
+    if name is None:
+        name = os.path.splitext(os.path.basename(path))[0]
+    save_binary(generate_corpus(num_types, name = name, **kwargs), path)
+
+def main():
+    parser = argparse.ArgumentParser(description = \
+             'Phonological CorpusTools: Lemurian corpus generator')
+    parser.add_argument('num_types', type=int, nargs='?', default=30, help='Number of word types to generate, defaults to 30')
+    parser.add_argument('-c', '--csv', default=None, help='Path of CSV file to write')
+    parser.add_argument('-b', '--binary', default=None, help='Path of binary corpus file to write')
+    parser.add_argument('-s', '--seed', type=int, default=None, help='Seed for the random number generator')
+    parser.add_argument('-z', '--zipf_exponent', type=float, default=1.0, help='Exponent of the Zipfian frequency distribution')
+    parser.add_argument('-m', '--max_frequency', type=int, default=100000, help='Frequency of the most frequent word')
+    parser.add_argument('-l', '--syllable_weights', default=None, help='Comma-separated proportions of words with 1, 2, 3... syllables')
+    parser.add_argument('-H', '--homograph_rate', type=float, default=0.0, help='Proportion of words that reuse an existing spelling')
+
+    args = parser.parse_args()
+
+    kwargs = {'seed': args.seed, 'zipf_exponent': args.zipf_exponent,
+            'max_frequency': args.max_frequency,
+            'homograph_rate': args.homograph_rate}
+    if args.syllable_weights is not None:
+        kwargs['syllable_weights'] = [float(x) for x in args.syllable_weights.split(',')]
+    if args.csv is None and args.binary is None:
+        args.csv = os.path.join(os.getcwd(),'lemurian.txt')
+    if args.csv is not None:
+        write_csv(args.csv, args.num_types, **kwargs)
+    if args.binary is not None:
+        write_binary(args.binary, args.num_types, **kwargs)
+
 if __name__ == '__main__':
-    lexicon = generate_lexicon(15, 3, 15)#base lexicon size, max syllable length, number of minimal pairs to add to base lexicon
-    lexicon = allophones(lexicon)
-    corpus = make_corpus(lexicon)
-    with open(os.path.join(os.getcwd(),'lemurian.txt'), mode='w', encoding='utf-8') as f:
-        f.write('Transcription,Spelling,Frequency\n')
-        for word in corpus:
-            print(word, file=f)
\ No newline at end of file
+    main()
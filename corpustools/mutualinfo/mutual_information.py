@@ -7,6 +7,8 @@ from corpustools.corpus.classes.lexicon import CorpusIntegrityError
 
 import time
 
+import numpy as np
+
 from corpustools.exceptions import MutualInfoError
 
 def pointwise_mi(corpus_context, query, halve_edges = False, in_word = False,
@@ -60,7 +62,7 @@ def pointwise_mi(corpus_context, query, halve_edges = False, in_word = False,
     try:
         prob_bg = bigram_dict[query]
     except KeyError:
-        raise MutualInfoError('The bigram {} was not found in the corpus using {}s'.format(''.join(query),sequence_type))
+        raise MutualInfoError('The bigram {} was not found in the corpus using {}s'.format(''.join(query),corpus_context.sequence_type))
 
 
     if unigram_dict[query[0]] == 0.0:
@@ -75,41 +77,234 @@ def pointwise_mi(corpus_context, query, halve_edges = False, in_word = False,
 
 
 def get_in_word_unigram_frequencies(corpus_context, query):
-    totals = [0 for x in query]
-    for word in corpus_context:
-        for i, q in enumerate(query):
-            if q in getattr(word, corpus_context.sequence_type):
-                totals[i] += word.frequency
+    segments, unigrams, cooccurrence = corpus_context.get_in_word_cooccurrence()
+    totals = [unigrams[segments.index(q)] if q in segments else 0 for q in query]
     return {k: totals[i] / len(corpus_context) for i, k in enumerate(query)}
 
 def get_in_word_bigram_frequency(corpus_context, query):
-    total = 0
+    segments, unigrams, cooccurrence = corpus_context.get_in_word_cooccurrence()
+    if all(x in segments for x in query):
+        total = cooccurrence[segments.index(query[0]), segments.index(query[1])]
+    else:
+        total = 0
+    return {query: total / len(corpus_context)}
+
+def _ngram_counts(corpus_context, labels, stop_check = None, call_back = None):
+    """
+    Count unigrams and bigrams of the specified segments in a single pass
+    over the corpus, returning arrays indexed by position in ``labels``
+    along with the total unigram and bigram counts.
+    """
+    index = {s: i for i, s in enumerate(labels)}
+    num_segs = len(labels)
+
+    if call_back is not None:
+        call_back("Generating probabilities...")
+        call_back(0, len(corpus_context))
+        cur = 0
+    unigram_ids = []
+    unigram_weights = []
+    bigram_ids = []
+    bigram_weights = []
+    unigram_total = 0
+    bigram_total = 0
     for word in corpus_context:
+        if stop_check is not None and stop_check():
+            return
+        if call_back is not None:
+            cur += 1
+            if cur % 100 == 0:
+                call_back(cur)
         tier = getattr(word, corpus_context.sequence_type)
-        if all(x in tier for x in query):
-            total += word.frequency
-    return {query: total / len(corpus_context)}
+        if corpus_context.sequence_type == 'spelling':
+            seq = ['#'] + [x for x in tier] + ['#']
+        else:
+            seq = tier.with_word_boundaries()
+        unigram_total += word.frequency * len(seq)
+        bigram_total += word.frequency * (len(seq) - 1)
+        ids = [index.get(x, -1) for x in seq]
+        for i in ids:
+            if i >= 0:
+                unigram_ids.append(i)
+                unigram_weights.append(word.frequency)
+        for i, j in zip(ids, ids[1:]):
+            if i >= 0 and j >= 0:
+                bigram_ids.append(i * num_segs + j)
+                bigram_weights.append(word.frequency)
+
+    unigrams = np.bincount(unigram_ids, weights = unigram_weights,
+                            minlength = num_segs).astype(float)
+    bigrams = np.bincount(bigram_ids, weights = bigram_weights,
+                            minlength = num_segs ** 2).astype(float)
+    bigrams = bigrams.reshape((num_segs, num_segs))
+    return unigrams, bigrams, unigram_total, bigram_total
+
+def _mi_from_counts(labels, unigrams, bigrams, unigram_total, bigram_total,
+                    halve_edges = False):
+    if halve_edges and '#' in labels:
+        edge = labels.index('#')
+        if unigrams[edge] > 0:
+            unigrams = unigrams.copy()
+            unigrams[edge] = (unigrams[edge] / 2) + 1
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        expected = np.outer(unigrams / unigram_total, unigrams / unigram_total)
+        mis = np.log2((bigrams / bigram_total) / expected)
+    mis[(bigrams == 0) | (expected == 0)] = np.nan
+    return mis
+
+def _in_word_mi(corpus_context, labels):
+    segments, unigrams, cooccurrence = corpus_context.get_in_word_cooccurrence()
+    index = {s: i for i, s in enumerate(segments)}
+    word_unigrams = np.zeros(len(labels))
+    word_bigrams = np.zeros((len(labels), len(labels)))
+    found = [(i, index[s]) for i, s in enumerate(labels) if s in index]
+    if found:
+        rows, cols = [list(x) for x in zip(*found)]
+        word_unigrams[rows] = unigrams[cols]
+        word_bigrams[np.ix_(rows, rows)] = cooccurrence[np.ix_(cols, cols)]
+    total = len(corpus_context)
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        expected = np.outer(word_unigrams / total, word_unigrams / total)
+        mis = np.log2((word_bigrams / total) / expected)
+    mis[(word_bigrams == 0) | (expected == 0)] = np.nan
+    return word_unigrams, word_bigrams, mis
+
+def mi_matrix(corpus_context, segments = None, halve_edges = False, in_word = False,
+                stop_check = None, call_back = None):
+    """
+    Calculate the mutual information for every bigram of a set of segments.
+
+    Unigram and bigram counts are gathered in a single pass over the corpus
+    and all mutual information values are calculated at once, giving the
+    same values as ``pointwise_mi``.  When ``in_word`` is True, the
+    co-occurrence frequencies cached by the corpus context are used.
+
+    Parameters
+    ----------
+    corpus_context : CorpusContext
+        Context manager for a corpus
+    segments : list or None
+        Segments to calculate mutual information for, defaults to
+        the corpus inventory (including word boundaries)
+    halve_edges : bool
+        Flag whether to only count word boundaries once per word rather than
+        twice, defaults to False
+    in_word : bool
+        Flag to calculate non-local, non-ordered mutual information,
+        defaults to False
+    stop_check : callable or None
+        Optional function to check whether to gracefully terminate early
+    call_back : callable or None
+        Optional function to supply progress information during the function
+
+    Returns
+    -------
+    list
+        Segment labels for the rows and columns of the array
+    array
+        Array where the value at row i and column j is the mutual information
+        of the bigram of the ith and jth segments, or NaN if the bigram or
+        either unigram does not occur in the corpus
+    """
+    if segments is None:
+        segments = [s.symbol for s in corpus_context.inventory]
+    labels = [str(s) for s in segments]
+    if in_word:
+        return labels, _in_word_mi(corpus_context, labels)[2]
+    counts = _ngram_counts(corpus_context, labels, stop_check, call_back)
+    if counts is None:
+        return
+    return labels, _mi_from_counts(labels, *counts, halve_edges = halve_edges)
+
+def pointwise_mis(corpus_context, queries, halve_edges = False, in_word = False,
+                stop_check = None, call_back = None):
+    """
+    Calculate the mutual information for several bigrams, sharing a single
+    pass over the corpus.
+
+    Parameters
+    ----------
+    corpus_context : CorpusContext
+        Context manager for a corpus
+    queries : list
+        List of tuples of two strings, each a segment/letter
+    halve_edges : bool
+        Flag whether to only count word boundaries once per word rather than
+        twice, defaults to False
+    in_word : bool
+        Flag to calculate non-local, non-ordered mutual information,
+        defaults to False
+    stop_check : callable or None
+        Optional function to check whether to gracefully terminate early
+    call_back : callable or None
+        Optional function to supply progress information during the function
+
+    Returns
+    -------
+    list of floats
+        Mutual information of each bigram, in the order of the queries
+    """
+    labels = sorted(set(s for query in queries for s in query))
+    if in_word:
+        unigrams, bigrams, mis = _in_word_mi(corpus_context, labels)
+    else:
+        counts = _ngram_counts(corpus_context, labels, stop_check, call_back)
+        if counts is None:
+            return
+        unigrams, bigrams = counts[0], counts[1]
+        mis = _mi_from_counts(labels, *counts, halve_edges = halve_edges)
+    results = []
+    for query in queries:
+        i, j = labels.index(query[0]), labels.index(query[1])
+        if unigrams[i] == 0:
+            raise MutualInfoError('Warning! Mutual information could not be calculated because the unigram {} is not in the corpus.'.format(query[0]))
+        if unigrams[j] == 0:
+            raise MutualInfoError('Warning! Mutual information could not be calculated because the unigram {} is not in the corpus.'.format(query[1]))
+        if bigrams[i, j] == 0:
+            raise MutualInfoError('Warning! Mutual information could not be calculated because the bigram {} is not in the corpus.'.format(str(query)))
+        results.append(float(mis[i, j]))
+    return results
+
 
 def all_mis(corpus_context,
             halve_edges = False, in_word = False,
             stop_check = None, call_back = None):
+    """
+    Calculate the mutual information for all ordered pairs of segments
+    in the inventory.
+
+    Bigrams that do not occur in the corpus are not included.
+
+    Parameters
+    ----------
+    corpus_context : CorpusContext
+        Context manager for a corpus
+    halve_edges : bool
+        Flag whether to only count word boundaries once per word rather than
+        twice, defaults to False
+    in_word : bool
+        Flag to calculate non-local, non-ordered mutual information,
+        defaults to False
+    stop_check : callable or None
+        Optional function to check whether to gracefully terminate early
+    call_back : callable or None
+        Optional function to supply progress information during the function
+
+    Returns
+    -------
+    list
+        Tuples of segment pairs and their mutual information (as strings)
+    """
     mis = {}
-    total_calculations = ((len(corpus_context.inventory)**2)-len(corpus_context.inventory)/2)+1
-    ct = 1
-    t = time.time()
-    for s1 in corpus_context.inventory:
-        for s2 in corpus_context.inventory:
-                #print('Performing MI calculation {} out of {} possible'.format(str(ct), str(total_calculations)))
-                ct += 1
-                #print('Duration of last calculation: {}'.format(str(time.time() - t)))
-                t = time.time()
-                if type(s1) != str:
-                    s1 = s1.symbol
-                if type(s2) != str:
-                    s2 = s2.symbol
-                #print(s1,s2)
-                mi = pointwise_mi(corpus_context, (s1, s2), halve_edges = halve_edges, in_word = in_word)
-                mis[(s1,s2)] = mi
+    res = mi_matrix(corpus_context, halve_edges = halve_edges, in_word = in_word,
+                    stop_check = stop_check, call_back = call_back)
+    if res is None:
+        return
+    labels, matrix = res
+    for i, s1 in enumerate(labels):
+        for j, s2 in enumerate(labels):
+            if not np.isnan(matrix[i, j]):
+                mis[(s1,s2)] = float(matrix[i, j])
 
     ordered_mis = sorted([(pair, str(mis[pair])) for pair in mis], key=lambda p: p[1])
 
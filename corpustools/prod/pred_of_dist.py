@@ -2,19 +2,73 @@ from collections import defaultdict, OrderedDict
 from math import log2
 import os
 
+import numpy as np
+
 from corpustools.corpus.classes import EnvironmentFilter
 from corpustools.exceptions import ProdError, PCTError
 
-def check_envs(corpus_context, envs, stop_check, call_back):
+def _compile_env(env):
     """
-    Search for the specified segments in the specified environments in
-    the corpus.
-"""
+    Convert an EnvironmentFilter into a tuple of the filter, its middle
+    segments, the sets of segments on each side and the number of
+    segments on each side, for fast matching against many words.
+    """
+    lhs = tuple(env.lhs) if env.lhs is not None else ()
+    rhs = tuple(env.rhs) if env.rhs is not None else ()
+    return env, env._middle, lhs, rhs, len(lhs), len(rhs)
+
+def _find_envs(seq, positions, compiled):
+    """
+    Find the positions in a sequence (with word boundaries) that match a
+    compiled environment, giving the same results as ``Transcription.find``.
+    """
+    env, middle, lhs, rhs, lhs_num, rhs_num = compiled
+    candidates = set()
+    for m in middle:
+        candidates.update(positions.get(m, ()))
+    found = []
+    for pos in sorted(candidates):
+        if pos < lhs_num or pos + rhs_num >= len(seq):
+            continue
+        start = pos - lhs_num
+        if any(seq[start + i] not in s for i, s in enumerate(lhs)):
+            continue
+        if any(seq[pos + 1 + i] not in s for i, s in enumerate(rhs)):
+            continue
+        found.append((tuple(seq[start:pos]), pos, seq[pos], tuple(seq[pos + 1:pos + 1 + rhs_num])))
+    return found
+
+def check_envs_multiple(corpus_context, env_lists, stop_check = None, call_back = None):
+    """
+    Search for the specified segments in several sets of environments
+    with a single pass over the corpus.
+
+    Parameters
+    ----------
+    corpus_context : CorpusContext
+        Context manager for a corpus
+    env_lists : list
+        List of lists of EnvironmentFilters, each list sharing the same
+        middle segments
+    stop_check : callable, optional
+        Optional function to check whether to gracefully terminate early
+    call_back : callable, optional
+        Optional function to supply progress information during the function
 
-    env_matches = {env: {seg: 0 for seg in env.middle} for env in envs}
-    is_sets = not all(isinstance(x, str) for x in envs[0].middle)
-    missing_envs = defaultdict(set)
-    overlapping_envs = defaultdict(dict)
+    Returns
+    -------
+    list
+        For each list of environments, a tuple of the matches in each
+        environment, the environments that were missing and the
+        environments that overlapped, as returned by ``check_envs``
+    """
+    queries = []
+    for envs in env_lists:
+        env_matches = {env: {seg: 0 for seg in env.middle} for env in envs}
+        is_sets = not all(isinstance(x, str) for x in envs[0].middle)
+        compiled = [_compile_env(env) for env in envs]
+        queries.append((envs, compiled, is_sets, env_matches,
+                        defaultdict(set), defaultdict(dict)))
 
     if call_back is not None:
         call_back('Finding instances of environments...')
@@ -29,38 +83,55 @@ def check_envs(corpus_context, envs, stop_check, call_back):
                 call_back(cur)
 
         tier = getattr(word, corpus_context.sequence_type)
-        overlaps = defaultdict(list)
-        found_env = False
-        for env in envs:
-            a = env.is_applicable(tier.with_word_boundaries())
-            if not a:
-                continue
-            es = tier.find(env)
-            if es is not None:
-                found_env = True
-                for e in es:
-                    if is_sets:
-                        for x in env.middle:
-                            if e.middle in x:
-                                env_matches[env][x] += word.frequency
-                    else:
-                        env_matches[env][e.middle] += word.frequency
-                    overlaps[e].append(env)
-
-
-        if not found_env and any(m in tier for m in envs[0].middle):
-            actual_env = tier.find_nonmatch(envs[0])
-            missing_envs[str(actual_env)].update([str(word)])
-
-        for k,v in overlaps.items():
-            if len(v) > 1:
-                k = tuple(str(env) for env in v)
-                k2 = str(k)
-                if k2 not in overlapping_envs[k]:
-                    overlapping_envs[k][k2] = set()
-                overlapping_envs[k][k2].update([str(word)])
-
-    return env_matches, missing_envs, overlapping_envs
+        seq = tier.with_word_boundaries()
+        symbols = set(seq[1:-1])
+        positions = defaultdict(list)
+        for i, x in enumerate(seq):
+            positions[x].append(i)
+        for envs, compiled, is_sets, env_matches, missing_envs, overlapping_envs in queries:
+            overlaps = defaultdict(list)
+            found_env = False
+            for c in compiled:
+                env = c[0]
+                if len(seq) < c[4] + c[5] + 1:
+                    continue
+                if all(m not in symbols for m in c[1]):
+                    continue
+                es = _find_envs(seq, positions, c)
+                if es:
+                    found_env = True
+                    for e in es:
+                        if is_sets:
+                            for x in env.middle:
+                                if e[2] in x:
+                                    env_matches[env][x] += word.frequency
+                        else:
+                            env_matches[env][e[2]] += word.frequency
+                        overlaps[e].append(env)
+
+            if not found_env and any(m in tier for m in envs[0].middle):
+                actual_env = tier.find_nonmatch(envs[0])
+                missing_envs[str(actual_env)].update([str(word)])
+
+            for k,v in overlaps.items():
+                if len(v) > 1:
+                    k = tuple(str(env) for env in v)
+                    k2 = str(k)
+                    if k2 not in overlapping_envs[k]:
+                        overlapping_envs[k][k2] = set()
+                    overlapping_envs[k][k2].update([str(word)])
+
+    return [(q[3], q[4], q[5]) for q in queries]
+
+def check_envs(corpus_context, envs, stop_check, call_back):
+    """
+    Search for the specified segments in the specified environments in
+    the corpus.
+"""
+    returned = check_envs_multiple(corpus_context, [envs], stop_check, call_back)
+    if returned is None:
+        return
+    return returned[0]
 
 def calc_prod_all_envs(corpus_context, seg1, seg2, all_info = False, stop_check = None,
                 call_back = None):
@@ -118,6 +189,48 @@ def calc_prod_all_envs(corpus_context, seg1, seg2, all_info = False, stop_check
     return H
 
 
+def calc_prod_all_envs_matrix(corpus_context, segments = None,
+                            stop_check = None, call_back = None):
+    """
+    Calculate predictability of distribution, regardless of environment,
+    for every pair of segments at once.
+
+    Parameters
+    ----------
+    corpus_context : CorpusContext
+        Context manager for a corpus
+    segments : list, optional
+        Segments to compare, defaults to every segment in the inventory
+        other than word boundaries
+    stop_check : callable, optional
+        Optional function to check whether to gracefully terminate early
+    call_back : callable, optional
+        Optional function to supply progress information during the function
+
+    Returns
+    -------
+    list
+        Segment labels for the rows and columns of the array
+    array
+        Array where the value at row i and column j is the entropy that
+        ``calc_prod_all_envs`` gives for the ith and jth segments
+    """
+    freq_base  = corpus_context.get_frequency_base()
+    if stop_check is not None and stop_check():
+        return
+    if segments is None:
+        segments = [s.symbol for s in corpus_context.inventory if s.symbol != '#']
+    labels = [str(s) for s in segments]
+    counts = np.array([freq_base.get(s, 0) for s in labels], dtype = float)
+    totals = counts[:, np.newaxis] + counts[np.newaxis, :]
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        first = counts[:, np.newaxis] / totals
+        second = counts[np.newaxis, :] / totals
+        H = -1 * (first * np.log2(first) + second * np.log2(second))
+    H[~np.isfinite(H)] = 0.0
+    H[totals == 0] = 0.0
+    return labels, H + 0.0
+
 def calc_prod(corpus_context, envs, strict = True, all_info = False, stop_check = None,
                 call_back = None):
     """
@@ -164,6 +277,11 @@ def calc_prod(corpus_context, envs, strict = True, all_info = False, stop_check
         if strict:
             raise(ProdError(envs, miss_envs, overlap_envs))
 
+    return _calc_entropies(corpus_context, env_matches, seg_list, all_info,
+                            stop_check, call_back)
+
+def _calc_entropies(corpus_context, env_matches, seg_list, all_info = False,
+                    stop_check = None, call_back = None):
     H_dict = OrderedDict()
 
     #CALCULATE ENTROPY IN INDIVIDUAL ENVIRONMENTS FIRST
@@ -216,3 +334,57 @@ def calc_prod(corpus_context, envs, strict = True, all_info = False, stop_check
         for k,v in H_dict.items():
             H_dict[k] = v[0]
     return H_dict
+
+def calc_prod_multiple(corpus_context, queries, strict = True, all_info = False,
+                stop_check = None, call_back = None):
+    """
+    Calculate predictability of distribution for many segment pairs and
+    sets of environments, with a single pass over the corpus.
+
+    Parameters
+    ----------
+    corpus_context : CorpusContext
+        Context manager for a corpus
+    queries : list
+        List of tuples of a segment pair and a list of EnvironmentFilters.
+        The middle segments of the environments are replaced by the
+        segment pair.
+    strict : bool
+        If true, exceptions will be raised for non-exhausive environments
+        and non-unique environments.  If false, only warnings will be
+        shown.  Defaults to True.
+    all_info : bool
+        If true, all the intermediate numbers for calculating predictability
+        of distribution will be returned.  If false, only the final entropy
+        will be returned.  Defaults to False.
+    stop_check : callable, optional
+        Optional function to check whether to gracefully terminate early
+    call_back : callable, optional
+        Optional function to supply progress information during the function
+
+    Returns
+    -------
+    list of dict
+        For each query, the dictionary that ``calc_prod`` would return
+    """
+    env_lists = []
+    for segs, envs in queries:
+        new_envs = []
+        for env in envs:
+            new_env = EnvironmentFilter(set(segs), env.lhs, env.rhs)
+            new_env.lhs_string = env.lhs_string
+            new_env.rhs_string = env.rhs_string
+            new_envs.append(new_env)
+        env_lists.append(new_envs)
+
+    returned = check_envs_multiple(corpus_context, env_lists, stop_check, call_back)
+    if stop_check is not None and stop_check():
+        return
+    results = []
+    for envs, (env_matches, miss_envs, overlap_envs) in zip(env_lists, returned):
+        if miss_envs or overlap_envs:
+            if strict:
+                raise(ProdError(envs, miss_envs, overlap_envs))
+        results.append(_calc_entropies(corpus_context, env_matches,
+                                    envs[0].middle, all_info))
+    return results
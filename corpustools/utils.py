@@ -2,24 +2,193 @@ import random
 import copy
 
 
+from corpustools.corpus.classes.lexicon import Word, AliasTable
 from corpustools.corpus.classes.spontaneous import WordToken, Discourse
 
-def generate_discourse(corpus):
-    d = Discourse(name = '{} discourse'.format(corpus.name))
-    lookup_list = list()
-    for k in corpus.keys():
-        lookup_list.extend([k for x in range(int(corpus[k].frequency))])
-    random.shuffle(lookup_list)
-    end = None
-    for i, k in enumerate(lookup_list):
-        word = d.lexicon.get_or_create_word(spelling = corpus[k].spelling,
-                                            transcription = corpus[k].transcription)
+def _shuffled_indices(counts, rng):
+    """
+    Yield each index as many times as its count, in the order of a random
+    shuffle of the repeated indices, using a Fenwick tree of the remaining
+    counts so that memory is proportional to the number of indices rather
+    than to the total count
+    """
+    size = len(counts)
+    tree = [0] * (size + 1)
+    for i, c in enumerate(counts, 1):
+        tree[i] += c
+        parent = i + (i & -i)
+        if parent <= size:
+            tree[parent] += tree[i]
+    total = sum(counts)
+    top = 1
+    while top * 2 <= size:
+        top *= 2
+    while total > 0:
+        r = rng.randrange(total)
+        pos = 0
+        step = top
+        while step:
+            nxt = pos + step
+            if nxt <= size and tree[nxt] <= r:
+                pos = nxt
+                r -= tree[nxt]
+            step >>= 1
+        i = pos + 1
+        while i <= size:
+            tree[i] -= 1
+            i += i & -i
+        total -= 1
+        yield pos
+
+def generate_keys(corpus, length = None, seed = None, chunk_size = 10000):
+    """
+    Lazily generate a random sequence of Word keys from a Corpus, based
+    on the Words' frequencies
+
+    Parameters
+    ----------
+    corpus : Corpus
+        Corpus to generate keys from
+    length : int, optional
+        Number of keys to generate.  If None (default), every Word
+        appears exactly as many times as its (integer) frequency, in a
+        random order.  Otherwise, keys are drawn independently with
+        probability proportional to frequency using an alias table
+    seed : int or random.Random, optional
+        Seed for the random number generator, or a generator to use
+    chunk_size : int, optional
+        Number of keys drawn at a time when ``length`` is specified
+
+    Returns
+    -------
+    generator
+        Generator of Word keys
+    """
+    if isinstance(seed, random.Random):
+        rng = seed
+    else:
+        rng = random.Random(seed)
+    keys = list(corpus.keys())
+    if length is None:
+        counts = [int(corpus[k].frequency) for k in keys]
+        for i in _shuffled_indices(counts, rng):
+            yield keys[i]
+        return
+    keys = [k for k in keys if corpus[k].frequency > 0]
+    table = AliasTable([corpus[k].frequency for k in keys])
+    remaining = length
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        for i in table.sample(n, rng):
+            yield keys[i]
+        remaining -= n
+
+def generate_word_tokens(corpus, words, length = None, seed = None):
+    """
+    Lazily generate WordTokens for a random sequence of Words from a
+    Corpus, see ``generate_keys``
+
+    Parameters
+    ----------
+    corpus : Corpus
+        Corpus to generate tokens from
+    words : dict
+        Mapping of Corpus keys to the Words that the tokens should belong
+        to, whose frequencies and word tokens are updated as tokens are
+        generated
+    length : int, optional
+        Number of tokens to generate, defaults to the sum of the
+        frequencies in the Corpus
+    seed : int or random.Random, optional
+        Seed for the random number generator, or a generator to use
+
+    Returns
+    -------
+    generator
+        Generator of WordTokens with consecutive begin times
+    """
+    for i, k in enumerate(generate_keys(corpus, length, seed)):
+        word = words[k]
         word.frequency += 1
-        wordtoken = WordToken(word = word,begin = i)
-        d.lexicon[k].wordtokens.append(wordtoken)
-        d.add_word(wordtoken)
+        wordtoken = WordToken(word = word, begin = i)
+        word.wordtokens.append(wordtoken)
+        yield wordtoken
+
+def generate_discourse(corpus, length = None, seed = None):
+    """
+    Generate a Discourse from a Corpus by sampling tokens of its Words
+    according to their frequencies
 
+    Parameters
+    ----------
+    corpus : Corpus
+        Corpus to generate the Discourse from
+    length : int, optional
+        Number of tokens in the Discourse.  If None (default), every Word
+        appears exactly as many times as its (integer) frequency
+    seed : int or random.Random, optional
+        Seed for the random number generator, or a generator to use
 
+    Returns
+    -------
+    Discourse
+        Generated Discourse
+    """
+    d = Discourse(name = '{} discourse'.format(corpus.name))
+    words = {k: Word(spelling = corpus[k].spelling,
+                    transcription = corpus[k].transcription)
+            for k in corpus.keys()}
+    for wordtoken in generate_word_tokens(corpus, words, length, seed):
+        d.add_word(wordtoken)
+    d.lexicon.add_words(w for w in words.values() if w.frequency > 0)
     return d
 
+def write_generated_discourse(corpus, path, annotation_type = 'spelling',
+                            length = None, seed = None, trans_delim = '.',
+                            chunk_size = 10000):
+    """
+    Write a Discourse generated from a Corpus directly to a text file,
+    without building the Discourse in memory
+
+    The file has the same format as the output of
+    ``export_discourse_spelling`` or ``export_discourse_transcription``.
 
+    Parameters
+    ----------
+    corpus : Corpus
+        Corpus to generate the Discourse from
+    path : str
+        Path to write to
+    annotation_type : str, optional
+        Either 'spelling' (default) or the name of a tier
+    length : int, optional
+        Number of tokens to write, see ``generate_keys``
+    seed : int or random.Random, optional
+        Seed for the random number generator, or a generator to use
+    trans_delim : str, optional
+        Delimiter for segments in tiers, defaults to ``.``
+    chunk_size : int, optional
+        Number of tokens to write at a time
+    """
+    if annotation_type == 'spelling':
+        forms = {k: corpus[k].spelling for k in corpus.keys()}
+    else:
+        forms = {k: trans_delim.join(getattr(corpus[k], annotation_type))
+                for k in corpus.keys()}
+    with open(path, encoding='utf-8', mode='w') as f:
+        chunk = []
+        line = []
+        sep = ''
+        for k in generate_keys(corpus, length, seed, chunk_size):
+            line.append(forms[k])
+            if len(line) == 10:
+                chunk.append(' '.join(line))
+                line = []
+                if len(chunk) * 10 >= chunk_size:
+                    f.write(sep + '\n'.join(chunk))
+                    sep = '\n'
+                    chunk = []
+        if line:
+            chunk.append(' '.join(line))
+        if chunk:
+            f.write(sep + '\n'.join(chunk))
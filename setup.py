@@ -66,7 +66,8 @@ setup(name='corpustools',
                             'pct_mutualinfo=corpustools.command_line.pct_mutualinfo:main',
                             'pct_kl=corpustools.command_line.pct_kl:main',
                             'pct_search=corpustools.command_line.pct_search:main',
-                            'pct_visualize=corpustools.command_line.pct_visualize:main'],
+                            'pct_visualize=corpustools.command_line.pct_visualize:main',
+                            'pct_benchmark=corpustools.command_line.pct_benchmark:main'],
     },
     cmdclass={'test': PyTest},
     extras_require={
@@ -0,0 +1,195 @@
+import os
+
+import pytest
+import numpy as np
+from scipy.io import wavfile
+from scipy.spatial.distance import squareform
+
+from corpustools.acousticsim.main import (acoustic_similarity_mapping,
+                                        analyze_directory, pairwise_distances,
+                                        acoustic_similarity_tokens,
+                                        AcousticSimError)
+from corpustools.corpus.classes import Word, WordToken, Discourse
+from corpustools.acousticsim.cache import RepresentationCache
+from corpustools.acousticsim.distance_functions import dtw_distance
+from corpustools.acousticsim.representations import (to_powerspec, to_mfcc,
+                                                    dct_spectrum, dct_matrix)
+
+def make_wavs(directory, num_files = 4, sr = 16000):
+    paths = []
+    rng = np.random.RandomState(1234)
+    for i in range(num_files):
+        t = np.arange(int(sr * (0.2 + 0.05 * i))) / sr
+        sig = np.sin(2 * np.pi * (200 + 100 * i) * t) + 0.1 * rng.randn(len(t))
+        path = os.path.join(directory, 'test_{}.wav'.format(i))
+        wavfile.write(path, sr, (sig * 10000).astype(np.int16))
+        paths.append(path)
+    return paths
+
+def test_representation_cache(tmpdir):
+    paths = make_wavs(str(tmpdir.mkdir('wavs')))
+    cache_dir = str(tmpdir.join('cache'))
+    mapping = [(paths[0], paths[1]), (paths[1], paths[2]), (paths[0], paths[2])]
+
+    cache = RepresentationCache(cache_dir)
+    first = acoustic_similarity_mapping(mapping, cache = cache)
+    assert(cache.misses == 3)
+    assert(len(os.listdir(cache_dir)) == 3)
+
+    cache = RepresentationCache(cache_dir)
+    second = acoustic_similarity_mapping(mapping, cache = cache)
+    assert(cache.misses == 0)
+    assert(cache.hits == 3)
+    for k, v in first.items():
+        assert(abs(second[k] - v) < 1e-9)
+
+    cache = RepresentationCache(cache_dir)
+    acoustic_similarity_mapping(mapping, cache = cache, num_coeffs = 12)
+    assert(cache.misses == 3)
+
+    cache = RepresentationCache(cache_dir, max_size = 0)
+    acoustic_similarity_mapping(mapping, cache = cache, rep = 'envelopes')
+    assert(cache.size == 0)
+    assert(len([x for x in os.listdir(cache_dir) if x.endswith('.npy')]) == 0)
+
+    cache = RepresentationCache(max_size = 2 * np.ones((10, 12)).nbytes)
+    for p in paths[:3]:
+        cache.get(p, lambda x: np.ones((10, 12)), {})
+    assert(cache.misses == 3)
+    assert(cache.lookup(paths[0], {}) is None)
+    assert(cache.lookup(paths[1], {}) is not None)
+    cache.get(paths[3], lambda x: np.ones((10, 12)), {})
+    assert(cache.lookup(paths[1], {}) is not None)
+    assert(cache.lookup(paths[2], {}) is None)
+
+def naive_dtw(source, target):
+    sLen, tLen = len(source), len(target)
+    d = np.array([[np.sqrt(((s - t) ** 2).sum()) for t in target] for s in source])
+    total = np.zeros((sLen, tLen))
+    total[0, 0] = d[0, 0]
+    for i in range(1, sLen):
+        total[i, 0] = total[i - 1, 0] + d[i, 0]
+    for j in range(1, tLen):
+        total[0, j] = total[0, j - 1] + d[0, j]
+    for i in range(1, sLen):
+        for j in range(1, tLen):
+            total[i, j] = min(total[i - 1, j - 1] + 2 * d[i, j],
+                            total[i - 1, j] + d[i, j],
+                            total[i, j - 1] + d[i, j])
+    return total[-1, -1] / (sLen + tLen)
+
+def test_dtw():
+    rng = np.random.RandomState(1)
+    for s, t in [(1, 1), (1, 6), (7, 1), (20, 33), (41, 12)]:
+        one = rng.rand(s, 12)
+        two = rng.rand(t, 12)
+        full = dtw_distance(one, two)
+        assert(abs(full - naive_dtw(one, two)) < 1e-9)
+        assert(dtw_distance(one, two, band = max(s, t)) == full)
+        for band in [0, 2, 5]:
+            banded = dtw_distance(one, two, band = band)
+            assert(np.isfinite(banded))
+            assert(banded >= full - 1e-9)
+
+def test_multiprocessing(tmpdir):
+    paths = make_wavs(str(tmpdir.mkdir('wavs')), num_files = 5)
+    mapping = [(x, y) for x in paths for y in paths if x != y]
+    serial = acoustic_similarity_mapping(mapping, num_cores = 1)
+    parallel = acoustic_similarity_mapping(mapping, num_cores = 2)
+    assert(list(serial.keys()) == list(parallel.keys()))
+    for k, v in serial.items():
+        assert(abs(parallel[k] - v) < 1e-9)
+
+    progress = []
+    def call_back(*args):
+        progress.append(args)
+    acoustic_similarity_mapping(mapping, num_cores = 2, call_back = call_back)
+    assert(('Calculating acoustic similarity...',) in progress)
+    assert(progress[-1] == (len(mapping),))
+
+    assert(acoustic_similarity_mapping(mapping, num_cores = 2,
+                                        stop_check = lambda: True) is None)
+
+def test_powerspec():
+    sr = 16000
+    x = np.random.RandomState(2).randn(sr)
+    pspec = to_powerspec(x, sr, 0.025, 0.01)
+    nperseg, nperstep = 400, 160
+    window = np.hanning(nperseg + 2)[1:-1]
+    starts = range(0, len(x) - nperseg + 1, nperstep)
+    assert(pspec.shape == (len(starts), 257))
+    for i, start in enumerate(starts):
+        frame = x[start:start + nperseg] * window
+        expected = np.abs(np.fft.fft(frame, n = 512)[:257]) ** 2
+        assert(np.allclose(pspec[i], expected))
+
+def test_mfcc(tmpdir):
+    path = make_wavs(str(tmpdir.mkdir('wavs')), num_files = 1)[0]
+    mfccs, pspec, aspec = to_mfcc(path, (80, 7800), 12, 0.025, 0.01,
+                                    debug = True)
+    assert(mfccs.shape == (pspec.shape[0], 12))
+    with_power = to_mfcc(path, (80, 7800), 12, 0.025, 0.01, use_power = True)
+    assert(np.allclose(with_power[:, 1:], mfccs[:, :11]))
+    assert(np.allclose(dct_spectrum(aspec[3]), dct_spectrum(aspec)[3]))
+
+    dctm = dct_matrix(26)
+    with pytest.raises(ValueError):
+        dctm *= 2
+    assert(np.allclose(to_mfcc(path, (80, 7800), 12, 0.025, 0.01), mfccs))
+
+def test_pairwise_distances(tmpdir):
+    directory = str(tmpdir.mkdir('wavs'))
+    paths = sorted(make_wavs(directory, num_files = 4))
+    matrix = pairwise_distances(paths)
+    assert(matrix.shape == (4, 4))
+    assert((matrix == matrix.T).all())
+    assert((np.diag(matrix) == 0).all())
+    for i, x in enumerate(paths):
+        for j, y in enumerate(paths):
+            if i == j:
+                continue
+            expected = acoustic_similarity_mapping([(x, y)])
+            assert(abs(list(expected.values())[0] - matrix[i, j]) < 1e-9)
+
+    condensed = pairwise_distances(paths, output = 'condensed', num_cores = 2)
+    assert(np.allclose(squareform(condensed), matrix))
+
+    banded = pairwise_distances(paths, band = 2)
+    assert(banded.shape == (4, 4))
+    with pytest.raises(AcousticSimError):
+        pairwise_distances(paths, output = 'condensed', band = 2)
+
+    mapping = analyze_directory(directory)
+    assert(len(mapping) == 12)
+    files, condensed = analyze_directory(directory, output = 'condensed')
+    assert(len(condensed) == 6)
+
+    single = str(tmpdir.mkdir('single'))
+    make_wavs(single, num_files = 1)
+    with pytest.raises(AcousticSimError):
+        analyze_directory(single)
+
+def test_token_similarity(tmpdir):
+    path = make_wavs(str(tmpdir.mkdir('wavs')), num_files = 1)[0]
+    sr, data = wavfile.read(path)
+    d = Discourse(name = 'test', wav_path = path)
+    times = [(0, 0.05), (0.05, 0.1), (0.1, 0.18)]
+    for i, (begin, end) in enumerate(times):
+        w = Word(spelling = 'w{}'.format(i), transcription = ['a'])
+        d.add_word(WordToken(word = w, begin = begin, end = end))
+
+    sr, signals = d.extract_token_audio(d.keys())
+    assert(sr == 16000)
+    for (begin, end), signal in zip(times, signals):
+        assert((signal == data[int(begin * sr):int(end * sr)]).all())
+
+    output_dir = str(tmpdir.mkdir('tokens'))
+    filenames = d._extract_tokens(d.keys(), output_dir)
+    token_paths = []
+    for f, signal in zip(filenames, signals):
+        assert((wavfile.read(f)[1] == signal).all())
+        token_paths.append(f)
+
+    matrix = acoustic_similarity_tokens(d, d.keys())
+    expected = pairwise_distances(token_paths)
+    assert(np.allclose(matrix, expected))
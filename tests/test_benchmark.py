@@ -0,0 +1,38 @@
+
+import pytest
+
+from corpustools.benchmark import (BENCHMARKS, run_benchmarks, compare_to_baseline,
+                                save_results, load_results, make_corpus)
+
+def test_run_benchmarks(tmpdir):
+    names = ['string_similarity_phono_edit_distance', 'deltah_fl',
+            'phonological_search', 'load_binary', 'all_pairwise_fls']
+    results = run_benchmarks(names, sizes = [20, 200], repeat = 1)
+    assert(list(results['results'].keys()) == names)
+    assert(list(results['results']['deltah_fl'].keys()) == ['20', '200'])
+    assert(list(results['results']['all_pairwise_fls'].keys()) == ['20'])
+    assert(all(t >= 0 for v in results['results'].values() for t in v.values()))
+
+    path = str(tmpdir.join('test_benchmark.json'))
+    save_results(results, path)
+    baseline = load_results(path)
+    assert(baseline == results)
+    assert(compare_to_baseline(results, baseline) == [])
+
+    baseline['results']['deltah_fl']['200'] = results['results']['deltah_fl']['200'] / 2
+    del baseline['results']['load_binary']
+    regressions = compare_to_baseline(results, baseline, tolerance = 0.5)
+    assert([(x[0], x[1]) for x in regressions] == [('deltah_fl', 200)])
+
+    baseline['platform'] = 'elsewhere'
+    with pytest.warns(UserWarning):
+        regressions = compare_to_baseline(results, baseline, tolerance = 0.5)
+    assert([(x[0], x[1]) for x in regressions] == [('deltah_fl', 200)])
+
+def test_make_corpus():
+    corpus = make_corpus(50)
+    assert(len(corpus) == 50)
+    assert(corpus.specifier is not None)
+    for seg in corpus.inventory:
+        if seg.symbol != '#':
+            assert(seg.features)
@@ -75,6 +75,65 @@ def test_corpus_model(qtbot, specified_test_corpus, settings):
     w = model.wordObject(0)
     assert(w.spelling == 'atema')
 
+def test_corpus_model_incremental(qtbot, specified_test_corpus, settings):
+    model = CorpusModel(specified_test_corpus, settings)
+    def expected_rows():
+        rows = sorted(model.corpus.words,
+                    key = lambda x: (model.corpus[x].frequency, x),
+                    reverse = True)
+        if model.nonLexHidden:
+            rows = [x for x in rows if str(model.corpus[x].transcription) != '']
+        return rows
+    model.sort(2, Qt.DescendingOrder)
+    assert(model.rows == expected_rows())
+    assert(model.data(model.index(0,2), Qt.DisplayRole) == str(model.wordObject(0).frequency))
+
+    model.addWord(Word(spelling = 'zzz', transcription = ['s','i'], frequency = 500))
+    assert(model.rows == expected_rows())
+    assert(model.rows[0] == 'zzz')
+    assert(model.data(model.index(0,0), Qt.DisplayRole) == 'zzz')
+
+    model.hideNonLexical(True)
+    model.addWord(Word(spelling = 'yyy', transcription = [], frequency = 1))
+    assert(model.rows == expected_rows())
+    assert('yyy' not in model.rows and 'yyy' in model.allData)
+    model.removeWord('yyy')
+    model.hideNonLexical(False)
+    assert(model.rows == expected_rows())
+
+    row = model.rows.index('zzz')
+    model.replaceWord(row, Word(spelling = 'zzz', transcription = ['s','i'], frequency = 0.5))
+    assert(model.rows == expected_rows())
+    assert(model.data(model.index(model.rows.index('zzz'), 2), Qt.DisplayRole) == '0.5')
+    model.removeWord('zzz')
+    assert(model.rows == expected_rows())
+
+    a = Attribute('test','numeric','Test')
+    model.addCountColumn(a, 'transcription', ['t','m'])
+    model.sort(3, Qt.AscendingOrder)
+    counts = [model.wordObject(i).test for i in range(len(model.rows))]
+    assert(counts == sorted(counts))
+    model.removeAttributes(['Test'])
+    assert(model.rows == sorted(model.corpus.words))
+
+
+def test_corpus_model_search(qtbot, unspecified_test_corpus, settings):
+    model = CorpusModel(unspecified_test_corpus, settings)
+    assert(model.search('MA') == 0)
+    assert(model.search('ma', 1) == 2)
+    assert(model.search('ʃ.o') == 2)
+    assert(model.search('ʃ.o', 3) == model.rows.index('shushoma'))
+    assert(model.search('atema', 1) == 0)
+    assert(model.search('zzz') is None)
+    assert(model.search('') is None)
+
+    model.sort(2, Qt.DescendingOrder)
+    assert(model.search('sasi') == 0)
+    model.removeWord('sasi')
+    assert(model.search('sasi') is None)
+    model.addWord(Word(spelling = 'sasi', transcription = ['s','ɑ','s','i'], frequency = 139.0))
+    assert(model.search('sasi') == 0)
+    assert(model.wordRow(model.corpus['tusa']) == model.rows.index('tusa'))
 
 #def test_discourse_model(qtbot):
     #model = DiscourseModel()
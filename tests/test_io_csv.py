@@ -91,3 +91,21 @@ def test_stressed(csv_test_dir):
     assert(c.inventory['uw'].symbol == 'uw')
     assert(c.inventory.stresses == {'1': set(['uw','iy']),
                                     '0': set(['uw','iy','ah'])})
+
+def test_corpus_csv_chunks(csv_test_dir, unspecified_test_corpus):
+    example_path = os.path.join(csv_test_dir, 'example.txt')
+    progress = []
+    def call_back(*args):
+        progress.append(args)
+    c = load_corpus_csv('example', example_path, delimiter = ',',
+                        chunk_size = 3, call_back = call_back)
+    assert(c == unspecified_test_corpus)
+    assert(progress[0] == ('Reading file...',))
+
+    c = load_corpus_csv('example', example_path, delimiter = ',',
+                        chunk_size = 3, num_cores = 2)
+    assert(c == unspecified_test_corpus)
+    assert(set(c.inventory.keys()) == set(unspecified_test_corpus.inventory.keys()))
+    for a in c.attributes:
+        b = [x for x in unspecified_test_corpus.attributes if x.name == a.name][0]
+        assert(a.range == b.range)
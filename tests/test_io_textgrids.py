@@ -1,13 +1,16 @@
 
 import pytest
 import os
+import shutil
+
+from textgrid import TextGrid, IntervalTier
 
 from corpustools.corpus.classes import Speaker
 
 from corpustools.corpus.io.helper import AnnotationType, Annotation, BaseAnnotation
 
 from corpustools.corpus.io.textgrid import (textgrid_to_data,load_textgrid,
-                                            guess_tiers)
+                                            guess_tiers, load_directory_textgrid)
 
 #def test_guess_tiers(textgrid_test_dir):
 #    tg = load_textgrid(os.path.join(textgrid_test_dir,'phone_word.TextGrid'))
@@ -72,3 +75,51 @@ def test_two_speakers(textgrid_test_dir):
                         {'label':'d', 'begin': 0.7, 'end': 0.8},
                         {'label':'e', 'begin': 0.8, 'end': 0.9},
                         {'label':'', 'begin': 0.9, 'end': 1}])
+
+def test_load_directory_parallel(textgrid_test_dir, tmpdir):
+    for name in ['phone_word', 'phone_word_silence', 'phone_word_sp_phone',
+                'phone_word_sp_word', 'word_phone']:
+        shutil.copy(os.path.join(textgrid_test_dir, name + '.TextGrid'),
+                    str(tmpdir))
+    def annotation_types():
+        return [AnnotationType('word','phone',None, anchor=True),
+                AnnotationType('phone',None,None, base=True)]
+    serial = load_directory_textgrid('test', str(tmpdir), annotation_types())
+    progress = []
+    parallel = load_directory_textgrid('test', str(tmpdir), annotation_types(),
+                                    num_cores = 2,
+                                    call_back = lambda *args: progress.append(args))
+    assert(list(serial.discourses.keys()) == list(parallel.discourses.keys()))
+    assert(list(serial.lexicon.keys()) == list(parallel.lexicon.keys()))
+    for k in serial.lexicon.keys():
+        w = serial.lexicon[k]
+        assert(str(w.transcription) == str(parallel.lexicon[k].transcription))
+        assert(w.frequency == parallel.lexicon[k].frequency)
+    for name, d in serial.discourses.items():
+        assert([str(wt) for wt in d] == [str(wt) for wt in parallel.discourses[name]])
+    assert(progress[-1] == (len(serial.discourses),))
+
+def test_alignment(tmpdir):
+    tg = TextGrid(maxTime = 3)
+    words = IntervalTier('word', 0, 3)
+    phones = IntervalTier('phone', 0, 3)
+    notes = IntervalTier('notes', 0, 3)
+    for i, (spelling, segs) in enumerate([('ab', 'ab'), ('c', 'c'), ('da', 'da')]):
+        words.add(i, i + 1, spelling)
+        notes.add(i, i + 1, 'n{}'.format(i))
+        step = 1 / len(segs)
+        for j, s in enumerate(segs):
+            phones.add(round(i + j * step, 5), round(i + (j + 1) * step, 5), s)
+    tg.append(words)
+    tg.append(phones)
+    tg.append(notes)
+    path = os.path.join(str(tmpdir), 'aligned.TextGrid')
+    tg.write(path)
+    data = textgrid_to_data(path, [AnnotationType('word','phone',None, anchor=True),
+                                AnnotationType('phone',None,None, base=True),
+                                AnnotationType('notes',None,'word', token=True)])
+    words = data['word']._list
+    assert([w.label for w in words] == ['ab', 'c', 'da'])
+    assert([(w.begins, w.ends) for w in words] == [([0],[2]), ([2],[3]), ([3],[5])])
+    assert([w.token['notes'] for w in words] == ['n0', 'n1', 'n2'])
+    assert([p.label for p in data['phone']._list] == ['a','b','c','d','a'])
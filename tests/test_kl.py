@@ -2,7 +2,7 @@ import pytest
 import sys
 import os
 
-from corpustools.kl.kl import KullbackLeibler as KL
+from corpustools.kl.kl import KullbackLeibler as KL, KullbackLeiblerAllPairs
 from corpustools.contextmanagers import (CanonicalVariantContext,
                                         MostFrequentVariantContext,
                                         WeightedVariantContext)
@@ -48,3 +48,20 @@ def test_error(specified_test_corpus):
             KL(c, 's', '!','')
 
 
+
+def test_all_pairs(specified_test_corpus):
+    with CanonicalVariantContext(specified_test_corpus, 'transcription', 'type') as c:
+        results = KullbackLeiblerAllPairs(c, 'b', segments = ['s', 'ʃ', 'm'])
+        assert(len(results) == 3)
+        for seg1, seg2, seg1_entropy, seg2_entropy, distance, ur, is_spurious in results:
+            expected = KL(c, seg1, seg2, 'b')
+            assert(abs(seg1_entropy - expected[0]) < 0.001)
+            assert(abs(seg2_entropy - expected[1]) < 0.001)
+            assert(abs(distance - expected[2]) < 0.001)
+            assert(ur == expected[3][0])
+            assert(is_spurious == expected[4])
+
+def test_all_pairs_error(specified_test_corpus):
+    with pytest.raises(ValueError):
+        with CanonicalVariantContext(specified_test_corpus, 'transcription', 'type') as c:
+            KullbackLeiblerAllPairs(c, 'b', segments = ['s', '!'])
@@ -0,0 +1,42 @@
+
+from corpustools.lemurian import (generate_words, generate_corpus, decode_word,
+                                num_codes, write_csv, write_binary, vowels)
+
+from corpustools.corpus.io.csv import load_corpus_csv
+from corpustools.corpus.io.binary import load_binary
+
+def test_generate_words():
+    words = list(generate_words(2000, seed = 1))
+    assert(words == list(generate_words(2000, seed = 1)))
+    assert(len(set(tuple(w[1]) for w in words)) == 2000)
+    assert(max(w[2] for w in words) == 100000)
+
+    words = list(generate_words(1000, seed = 2, syllable_weights = [1]))
+    lengths = [len([s for s in w[1] if s in vowels]) for w in words]
+    assert(lengths.count(1) == num_codes(1))
+    assert(lengths.count(2) == 1000 - num_codes(1))
+
+    words = list(generate_words(2000, seed = 3, syllable_weights = [0, 0, 1],
+                                homograph_rate = 0.5))
+    assert(len(set(w[0] for w in words)) < 1500)
+
+def test_decode_word():
+    transcriptions = set(tuple(decode_word(c, 1)[1]) for c in range(num_codes(1)))
+    assert(len(transcriptions) == num_codes(1))
+    spelling, segments = decode_word(0, 1)
+    assert(segments == ['i'])
+
+def test_write_corpus(tmpdir):
+    csv_path = str(tmpdir.join('test_lemurian.txt'))
+    binary_path = str(tmpdir.join('test_lemurian.corpus'))
+    write_csv(csv_path, 300, seed = 4)
+    write_binary(binary_path, 300, seed = 4)
+
+    corpus = generate_corpus(300, seed = 4)
+    csv_corpus = load_corpus_csv('test', csv_path, ',', '.')
+    binary_corpus = load_binary(binary_path)
+    for c in [csv_corpus, binary_corpus]:
+        assert(len(c) == 300)
+        for k in corpus.keys():
+            assert(c[k].transcription == corpus[k].transcription)
+            assert(c[k].frequency == corpus[k].frequency)
@@ -2,10 +2,14 @@
 import unittest
 import os
 import sys
+import pickle
+import operator
+import random
 
 from corpustools.corpus.classes import (Word, Corpus, FeatureMatrix, Segment,
-                                        Environment, EnvironmentFilter, Transcription,
+                                        Attribute, Environment, EnvironmentFilter, Transcription,
                                         WordToken, Discourse)
+from corpustools.corpus.classes.lexicon import AliasTable
 
 
 class CorpusTest(unittest.TestCase):
@@ -48,6 +52,150 @@ class CorpusTest(unittest.TestCase):
         #Error, should find return an iterable of homographs?
         self.assertEqual([x.spelling for x in corpus.find('a')],['a','a'])
 
+    def test_add_words(self):
+        corpus = Corpus('test')
+        for w in self.homograph_info:
+            corpus.add_word(Word(**w))
+
+        bulk = Corpus('test')
+        bulk.add_words(Word(**w) for w in self.homograph_info)
+        self.assertEqual(sorted(bulk.wordlist.keys()), ['a', 'a (1)', 'c', 'd'])
+        self.assertEqual(bulk, corpus)
+        self.assertEqual(bulk.inventory._data, corpus.inventory._data)
+        for a, b in zip(bulk.attributes, corpus.attributes):
+            self.assertEqual(a.name, b.name)
+            self.assertEqual(a.range, b.range)
+
+        bulk.remove_word('a (1)')
+        bulk.add_words([Word(**self.homograph_info[0])])
+        bulk.add_words([Word(**self.homograph_info[0])], allow_duplicates = False)
+        self.assertEqual(sorted(bulk.wordlist.keys()), ['a', 'a (1)', 'c', 'd'])
+
+    def test_homograph_index(self):
+        corpus = Corpus('test')
+        corpus.add_words(Word(**w) for w in self.homograph_info)
+        homographs = corpus.find_all('a')
+        self.assertEqual([str(x.transcription) for x in homographs], ['a.b', 'a.c'])
+        self.assertEqual(corpus.key(homographs[1]), 'a (1)')
+        self.assertEqual(corpus.find_all('e'), [])
+
+        word = corpus.get_or_create_word(spelling = 'a', transcription = ['a','c'])
+        self.assertTrue(word is homographs[1])
+        word = corpus.get_or_create_word(spelling = 'a', transcription = ['a','d'])
+        self.assertEqual(corpus.key(word), 'a (2)')
+        self.assertEqual(len(corpus.find_all('a')), 3)
+
+        corpus.remove_word('a (1)')
+        self.assertEqual(corpus.find_word(spelling = 'a', transcription = ['a','c']), None)
+        self.assertEqual(len(corpus.find_all('a')), 2)
+
+        loaded = pickle.loads(pickle.dumps(corpus))
+        self.assertEqual([str(x.transcription) for x in loaded.find_all('a')], ['a.b', 'a.d'])
+        loaded.add_word(Word(**self.homograph_info[1]))
+        self.assertEqual(sorted(loaded.wordlist.keys()), ['a', 'a (1)', 'a (2)', 'c', 'd'])
+        loaded.remove_word('a')
+        loaded.add_word(Word(**self.homograph_info[1]))
+        self.assertEqual(sorted(loaded.wordlist.keys()), ['a (1)', 'a (2)', 'a (3)', 'c', 'd'])
+
+    def test_legacy_transcriptions(self):
+        corpus = Corpus('test')
+        corpus.add_words(Word(**w) for w in self.homograph_info)
+        #Older corpora stored transcriptions as plain lists
+        for w in corpus:
+            w.transcription = list(w.transcription)
+        loaded = pickle.loads(pickle.dumps(corpus))
+        word = loaded.find_word(spelling = 'a', transcription = ['a','c'])
+        self.assertEqual(loaded.key(word), 'a (1)')
+        word = loaded.get_or_create_word(spelling = 'a', transcription = ['a','b'])
+        self.assertEqual(loaded.key(word), 'a')
+        self.assertEqual(sorted(loaded.wordlist.keys()), ['a', 'a (1)', 'c', 'd'])
+
+    def test_subset(self):
+        corpus = Corpus('test')
+        freqs = [5.0, 1.0, float('nan'), 3.0, 5.0, 2.0, 8.0, 3.0]
+        for i, f in enumerate(freqs):
+            corpus.add_word(Word(spelling = 'w{}'.format(i), transcription = ['a'],
+                                frequency = f, pos = 'N' if i % 3 else 'V'))
+        freq = corpus.attributes[2]
+        pos = [a for a in corpus.attributes if a.name == 'pos'][0]
+
+        def scan(filters):
+            keys = []
+            for k, w in corpus.wordlist.items():
+                for f in filters:
+                    if f[0].att_type == 'numeric':
+                        if not f[1](getattr(w, f[0].name), f[2]):
+                            break
+                    elif getattr(w, f[0].name) not in f[1]:
+                        break
+                else:
+                    keys.append(k)
+            return keys
+
+        for op in [operator.eq, operator.ne, operator.gt, operator.ge,
+                    operator.lt, operator.le]:
+            for value in [0, 1.0, 3, 4.5, 5.0, 8.0, 10]:
+                self.assertEqual(corpus.subset_keys([(freq, op, value)]),
+                                scan([(freq, op, value)]))
+        filters = [(freq, operator.ge, 3.0), (pos, set(['N']))]
+        self.assertEqual(corpus.subset_keys(filters), ['w4', 'w7'])
+        self.assertEqual(corpus.subset_keys([(pos, set(['X']))]), [])
+
+        subset = corpus.subset(filters)
+        self.assertEqual(sorted(subset.wordlist.keys()), ['w4', 'w7'])
+
+        corpus.add_word(Word(spelling = 'w8', transcription = ['a'],
+                            frequency = 9.0, pos = 'N'))
+        self.assertEqual(corpus.subset_keys(filters), ['w4', 'w7', 'w8'])
+        corpus.remove_word('w4')
+        self.assertEqual(corpus.subset_keys(filters), ['w7', 'w8'])
+
+        length = Attribute('length', 'numeric')
+        corpus.add_count_attribute(length, 'transcription', ['a'])
+        self.assertEqual(len(corpus.subset_keys([(length, operator.eq, 1)])), len(corpus))
+        corpus.wordlist['w7'].frequency = 0.0
+        corpus.invalidate_attribute_indexes('frequency')
+        self.assertEqual(corpus.subset_keys(filters), ['w8'])
+
+        #Values set directly on Words are picked up without invalidating
+        corpus.wordlist['w7'].frequency += 5.0
+        self.assertEqual(sorted(corpus.subset(filters).wordlist.keys()), ['w7', 'w8'])
+        corpus.wordlist['w8'].add_attribute('pos', 'V')
+        self.assertEqual(sorted(corpus.subset(filters).wordlist.keys()), ['w7'])
+
+    def test_sampling(self):
+        corpus = Corpus('test')
+        for i in range(30):
+            corpus.add_word(Word(spelling = 'w{}'.format(i), transcription = ['a'],
+                                frequency = float(i % 10), pos = 'NVA'[i % 3]))
+
+        keys = corpus.sample_keys(10, seed = 2)
+        self.assertEqual(len(set(keys)), 10)
+        self.assertEqual(keys, corpus.sample_keys(10, seed = 2))
+        self.assertRaises(ValueError, corpus.sample_keys, 31)
+
+        keys = corpus.sample_keys(27, weight = 'frequency', seed = 2)
+        self.assertEqual(len(set(keys)), 27)
+        self.assertTrue(all(corpus[k].frequency > 0 for k in keys))
+        self.assertRaises(ValueError, corpus.sample_keys, 28, weight = 'frequency')
+
+        keys = corpus.sample_keys(12, stratify = 'pos', seed = 2)
+        self.assertEqual(sorted(corpus[k].pos for k in keys), ['A'] * 4 + ['N'] * 4 + ['V'] * 4)
+        keys = corpus.sample_keys(9, weight = 'frequency', stratify = 'pos', seed = 2)
+        self.assertEqual(sorted(corpus[k].pos for k in keys), ['A'] * 3 + ['N'] * 3 + ['V'] * 3)
+
+        subset = corpus.get_random_subset(12, seed = 2)
+        self.assertEqual(len(subset), 12)
+
+    def test_alias_table(self):
+        table = AliasTable([1, 0, 3])
+        counts = [0, 0, 0]
+        for i in table.sample(20000, random.Random(1)):
+            counts[i] += 1
+        self.assertEqual(counts[1], 0)
+        self.assertTrue(0.7 < counts[0] / 5000.0 < 1.3)
+        self.assertRaises(ValueError, AliasTable, [0, 0])
+
 
 
 class WordTest(unittest.TestCase):
@@ -160,6 +308,34 @@ class WordTest(unittest.TestCase):
 
         self.assertRaises(AttributeError,getattr,t,'tier1')
 
+    def test_variants(self):
+        t = Word(**self.basic)
+        for i, trans in enumerate([['a','b'], ['a','c'], ['a','b']]):
+            t.wordtokens.append(WordToken(word = t, begin = i, end = i + 1,
+                                            transcription = trans))
+        v = t.variants()
+        self.assertEqual(v[Transcription(['a','b'])], 2)
+        self.assertEqual(v[Transcription(['a','c'])], 1)
+
+        v[Transcription(['a','b'])] = 10
+        self.assertEqual(t.variants()[Transcription(['a','b'])], 2)
+
+        t.wordtokens.append(WordToken(word = t, begin = 3, end = 4,
+                                        transcription = ['a','c']))
+        self.assertEqual(t.variants()[Transcription(['a','c'])], 2)
+
+        t.add_tier('tier1', ['b','c'])
+        self.assertEqual(t.variants('tier1'), {Transcription(['b']): 2,
+                                                Transcription(['c']): 2})
+        t.add_tier('tier1', ['b'])
+        self.assertEqual(t.variants('tier1'), {Transcription(['b']): 2,
+                                                Transcription([]): 2})
+
+        c = Corpus('test')
+        c.add_word(t)
+        table = c.variant_table()
+        self.assertEqual(table[c.key(t)], t.variants())
+
 class FeatureMatrixTest(unittest.TestCase):
     def setUp(self):
         self.basic_info = [{'symbol':'a','feature1':'+','feature2':'+'},
@@ -2,7 +2,8 @@
 import sys
 import os
 
-from corpustools.mutualinfo.mutual_information import pointwise_mi, all_mis
+from corpustools.mutualinfo.mutual_information import (pointwise_mi, pointwise_mis,
+                                                    all_mis, mi_matrix)
 from corpustools.contextmanagers import (CanonicalVariantContext,
                                         MostFrequentVariantContext,
                                         WeightedVariantContext)
@@ -28,3 +29,40 @@ def test_pointwise_mi(unspecified_test_corpus):
     #with CanonicalVariantContext(unspecified_test_corpus, 'spelling', 'type') as c:
     #   result = pointwise_mi(c, query = ('t', 'a'))
     #   assert(result == 0)
+
+def test_mi_matrix(unspecified_test_corpus):
+    with CanonicalVariantContext(unspecified_test_corpus, 'transcription', 'type') as c:
+        for halve_edges in [False, True]:
+            labels, mis = mi_matrix(c, halve_edges = halve_edges)
+            for query in [('e', 'm'), ('#', 'm'), ('ɑ', '#')]:
+                expected = pointwise_mi(c, query, halve_edges = halve_edges)
+                result = mis[labels.index(query[0]), labels.index(query[1])]
+                assert(abs(result - expected) < 0.0001)
+
+def test_pointwise_mis(unspecified_test_corpus):
+    with CanonicalVariantContext(unspecified_test_corpus, 'transcription', 'type') as c:
+        results = pointwise_mis(c, [('e', 'm'), ('m', 'ɑ')])
+        for query, result in zip([('e', 'm'), ('m', 'ɑ')], results):
+            assert(abs(result - pointwise_mi(c, query)) < 0.0001)
+        results = pointwise_mis(c, [('t', 'n')], in_word = True)
+        assert(abs(results[0] - 0.5849625007211564) < 0.0001)
+
+def test_all_mis(unspecified_test_corpus):
+    with CanonicalVariantContext(unspecified_test_corpus, 'transcription', 'type') as c:
+        results = dict(all_mis(c))
+        assert(abs(float(results[('e', 'm')]) - 2.7319821866519507) < 0.0001)
+        assert(('#', '#') not in results)
+
+def test_in_word_mi_matrix(unspecified_test_corpus):
+    with CanonicalVariantContext(unspecified_test_corpus, 'transcription', 'type') as c:
+        labels, mis = mi_matrix(c, in_word = True)
+        for query in [('t', 'n'), ('n', 't'), ('e', 'm')]:
+            expected = pointwise_mi(c, query, in_word = True)
+            result = mis[labels.index(query[0]), labels.index(query[1])]
+            assert(abs(result - expected) < 0.0001)
+        segments, unigrams, cooccurrence = c.get_in_word_cooccurrence()
+        assert((cooccurrence == cooccurrence.T).all())
+
+    with CanonicalVariantContext(unspecified_test_corpus, 'transcription', 'type') as c:
+        c.get_in_word_cooccurrence()
+        assert(c.length is None)
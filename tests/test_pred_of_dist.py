@@ -4,6 +4,8 @@ import os
 import pytest
 
 from corpustools.prod.pred_of_dist import (check_envs, calc_prod,
+                                        calc_prod_multiple, calc_prod_all_envs,
+                                        calc_prod_all_envs_matrix,
                                         EnvironmentFilter)
 
 from corpustools.contextmanagers import (CanonicalVariantContext,
@@ -11,7 +13,11 @@ from corpustools.contextmanagers import (CanonicalVariantContext,
                                         WeightedVariantContext)
 
 def test_prod_allenvs(specified_test_corpus):
-    return
+    with CanonicalVariantContext(specified_test_corpus, 'transcription', 'token') as c:
+        labels, H = calc_prod_all_envs_matrix(c)
+        for seg1, seg2 in [('s', 'ʃ'), ('t', 'n'), ('ɑ', 'i')]:
+            expected = calc_prod_all_envs(c, seg1, seg2)
+            assert(abs(H[labels.index(seg1), labels.index(seg2)] - expected) < 0.001)
 
 def test_prod_token(specified_test_corpus):
     seg1 = 's'
@@ -38,6 +44,23 @@ def test_prod_token(specified_test_corpus):
     for k,v in result.items():
         assert(expected_envs[k]-v < 0.001)
 
+def test_prod_multiple(specified_test_corpus):
+    env_list = []
+    for k in ["-voc", "+voc,+high", "+voc,-high", "#"]:
+        if k != '#':
+            segs = specified_test_corpus.features_to_segments(k)
+        else:
+            segs = k
+        env_list.append(EnvironmentFilter(['s', 'ʃ'], None, [segs]))
+    with CanonicalVariantContext(specified_test_corpus, 'transcription', 'token') as c:
+        results = calc_prod_multiple(c, [(('s', 'ʃ'), env_list), (('t', 'n'), env_list)],
+                                    strict = False)
+        for pair, result in zip([('s', 'ʃ'), ('t', 'n')], results):
+            for env in env_list:
+                env.middle = set(pair)
+            expected = calc_prod(c, env_list, strict = False)
+            assert(list(result.values()) == list(expected.values()))
+
 def test_prod_type(specified_test_corpus):
     seg1 = 's'
     seg2 = 'ʃ'
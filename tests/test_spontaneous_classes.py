@@ -2,6 +2,7 @@
 import pytest
 import os
 import sys
+import pickle
 
 from corpustools.corpus.classes import (Word, Corpus, FeatureMatrix,
                                         Environment, EnvironmentFilter, Transcription,
@@ -61,3 +62,89 @@ def test_init():
 
     assert(d[0].wordtype.frequency == 2)
     assert(d[1].wordtype.frequency == 1)
+
+def test_time_index():
+    a = Word(spelling = 'a', transcription = ['a','b'])
+    c = Word(spelling = 'c', transcription = ['c','a','b'])
+    d = Discourse()
+    for begin, word in [(2.0, a), (0.0, a), (3.0, c), (1.0, c), (4.0, a), (5.0, c)]:
+        d.add_word(WordToken(begin = begin, end = begin + 0.5, word = word))
+
+    assert(d.keys() == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0])
+    assert([x.begin for x in d] == d.keys())
+    assert(d[2.0].begin == 2.0)
+    assert(d[1.2].begin == 2.0)
+    with pytest.raises(KeyError):
+        d[5.5]
+    assert(d.token_at(1.2).begin == 1.0)
+    assert(d.token_at(1.7) is None)
+    assert([x.begin for x in d.tokens_between(1.0, 3.0)] == [1.0, 2.0])
+
+    assert([x.begin for x in d.find_wordtype(a)] == [0.0, 2.0, 4.0])
+    assert(d._calc_frequency(a) == 3)
+    assert(d._calc_frequency((a, c)) == 3)
+    assert(d._calc_frequency((c, a)) == 2)
+    assert(d._calc_frequency((a, a)) == 0)
+    assert(d._calc_frequency((a, c, a)) == 2)
+
+    d.add_word(WordToken(begin = 6.0, end = 6.5, word = a))
+    assert(d._calc_frequency((c, a)) == 3)
+
+    d = pickle.loads(pickle.dumps(d))
+    assert(d.keys() == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+    assert(d._calc_frequency(d[0.0].wordtype) == 4)
+
+def test_merge_lexicons():
+    words = [('a', ['a','b']), ('c', ['c','a','b']), ('a', ['a','b']),
+                ('d', ['a','d']), ('a', ['a','d']), ('c', ['c','a','b'])]
+
+    def make_discourse(name, tokens):
+        d = Discourse(name = name)
+        for i, (spelling, transcription) in enumerate(tokens):
+            w = d.lexicon.get_or_create_word(spelling = spelling,
+                                            transcription = transcription)
+            w.frequency += 1
+            wt = WordToken(begin = i, end = i + 1, word = w)
+            w.wordtokens.append(wt)
+            d.add_word(wt)
+        return d
+
+    whole = make_discourse('whole', words + words)
+    halves = [make_discourse('one', words), make_discourse('two', words)]
+
+    lexicon = Corpus('merged')
+    for d in halves:
+        lexicon.merge(d.lexicon)
+    assert(list(lexicon.keys()) == list(whole.lexicon.keys()))
+    for k in whole.lexicon.keys():
+        assert(lexicon[k].frequency == whole.lexicon[k].frequency)
+        assert(str(lexicon[k].transcription) == str(whole.lexicon[k].transcription))
+        assert(len(lexicon[k].wordtokens) == lexicon[k].frequency)
+        assert(all(t.wordtype is lexicon[k] for t in lexicon[k].wordtokens))
+
+    built = whole.create_lexicon()
+    assert(list(built.keys()) == list(whole.lexicon.keys()))
+    assert([w.frequency for w in built] == [w.frequency for w in whole.lexicon])
+    assert(whole[0].wordtype is whole.lexicon['a'])
+
+    halves = [make_discourse('one', words), make_discourse('two', words)]
+    corpus = SpontaneousSpeechCorpus('', '')
+    for d in halves:
+        corpus.add_discourse(d)
+    corpus.add_discourse(halves[0])
+    assert(list(corpus.lexicon.keys()) == list(whole.lexicon.keys()))
+    assert([w.frequency for w in corpus.lexicon] == [w.frequency for w in whole.lexicon])
+    assert(corpus.discourses['two'][0].wordtype is corpus.lexicon['a'])
+
+def test_add_discourse_lexicon():
+    d = Discourse(name = 'test')
+    for i, spelling in enumerate(['a', 'b', 'a']):
+        w = d.lexicon.get_or_create_word(spelling = spelling,
+                                        transcription = [spelling])
+        w.frequency += 1
+        d.add_word(WordToken(begin = i, end = i + 1, word = w))
+    corpus = SpontaneousSpeechCorpus('', '')
+    corpus.add_discourse(d)
+    assert(len(d.lexicon) == 2)
+    assert(d.lexicon.find('a') is d[0].wordtype)
+    assert(d.lexicon['a'].frequency == 2)
@@ -1,8 +1,44 @@
 
-from corpustools.utils import generate_discourse
+from corpustools.utils import (generate_discourse, generate_keys,
+                                write_generated_discourse)
 
 from corpustools.corpus.classes import Discourse
 
+from corpustools.corpus.io.text_spelling import load_discourse_spelling
+
 def test_discourse_generate(unspecified_test_corpus):
     d = generate_discourse(unspecified_test_corpus)
     assert(isinstance(d, Discourse))
+
+def test_discourse_generate_frequencies(unspecified_test_corpus):
+    d = generate_discourse(unspecified_test_corpus, seed = 1)
+    total = sum(int(w.frequency) for w in unspecified_test_corpus)
+    assert(len(d) == total)
+    for k in unspecified_test_corpus.keys():
+        word = unspecified_test_corpus[k]
+        if int(word.frequency) == 0:
+            continue
+        w = d.lexicon.find_word(spelling = word.spelling,
+                                transcription = word.transcription)
+        assert(w.frequency == int(word.frequency))
+        assert(len(w.wordtokens) == w.frequency)
+    assert(all(any(t.wordtype is w for w in d.lexicon) for t in d))
+
+    keys = list(generate_keys(unspecified_test_corpus, seed = 1))
+    assert(keys == list(generate_keys(unspecified_test_corpus, seed = 1)))
+    assert([t.wordtype.spelling for t in d] ==
+            [unspecified_test_corpus[k].spelling for k in keys])
+
+def test_discourse_generate_length(unspecified_test_corpus):
+    d = generate_discourse(unspecified_test_corpus, length = 25, seed = 2)
+    assert(len(d) == 25)
+    assert(sum(w.frequency for w in d.lexicon) == 25)
+
+def test_write_generated_discourse(tmpdir, unspecified_test_corpus):
+    export_path = str(tmpdir.join('test_write_generated.txt'))
+    write_generated_discourse(unspecified_test_corpus, export_path,
+                            seed = 3, chunk_size = 20)
+
+    d = load_discourse_spelling('test', export_path)
+    for k in unspecified_test_corpus.keys():
+        assert(d.lexicon[k].frequency == unspecified_test_corpus[k].frequency)